@@ -0,0 +1,63 @@
+"""Add composite indexes for the cotizaciones listing filters
+
+Revision ID: 1159fa256ddf
+Revises: 55890ec5c2c4
+Create Date: 2026-10-18 13:40:52.367140
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '1159fa256ddf'
+down_revision = '55890ec5c2c4'
+branch_labels = None
+depends_on = None
+
+# convenio (+ sucursal) ya lo cubre ix_cotizacionobjeto_convenio_id_sucursal_id_distribuidor_id.
+INDEXES = (
+    (
+        'ix_cotizacionobjeto_distribuidor_id_sucursal_id',
+        'cotizacionobjeto',
+        ['distribuidor_id', 'sucursal_id'],
+        {},
+    ),
+    (
+        'ix_cotizacion_plan_comercial_cotizacion_objeto_id',
+        'cotizacion',
+        ['plan_comercial', 'cotizacion_objeto_id'],
+        {},
+    ),
+    (
+        'ix_detsolicitud_plan_paquete_ini_vig_reportada',
+        'detsolicitud',
+        ['plan', 'paquete', 'ini_vig_reportada'],
+        {'postgresql_include': ['cotizacion_id']},
+    ),
+)
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, kw in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kw,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,65 @@
+"""Add certificadodetalle.id_convenio and the unique identificacion index
+
+Revision ID: 180475d38d12
+Revises: d52374c341f0
+Create Date: 2026-10-18 22:05:31.662209
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '180475d38d12'
+down_revision = 'd52374c341f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('certificadodetalle', sa.Column('id_convenio', sa.Uuid(), nullable=True))
+    op.add_column(
+        'emisionjob',
+        sa.Column('certificados_duplicados', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Solo la primera fila de cada (convenio, identificación) recibe el
+    # convenio. Los duplicados que ya existían quedan con NULL: el índice
+    # único no los considera iguales entre sí y se conservan tal cual.
+    op.execute(
+        '''
+        UPDATE certificadodetalle c
+        SET id_convenio = primeros.id_convenio
+        FROM (
+            SELECT DISTINCT ON (e.id_convenio, c.tipo_identificacion, c.numero_identificacion)
+                c.id, e.id_convenio
+            FROM certificadodetalle c
+            JOIN emision e ON e.id = c.emision_id
+            ORDER BY e.id_convenio, c.tipo_identificacion, c.numero_identificacion, c.id
+        ) primeros
+        WHERE c.id = primeros.id
+        '''
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_certificadodetalle_id_convenio_identificacion',
+            'certificadodetalle',
+            ['id_convenio', 'tipo_identificacion', 'numero_identificacion'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_certificadodetalle_id_convenio_identificacion',
+            table_name='certificadodetalle',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('emisionjob', 'certificados_duplicados')
+    op.drop_column('certificadodetalle', 'id_convenio')
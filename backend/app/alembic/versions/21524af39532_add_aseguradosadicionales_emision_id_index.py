@@ -0,0 +1,39 @@
+"""Add the aseguradosadicionales foreign key index used by GET /emision
+
+Revision ID: 21524af39532
+Revises: 9d01966cb072
+Create Date: 2026-10-18 20:31:05.127644
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '21524af39532'
+down_revision = '9d01966cb072'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # include=asegurados carga la colección con WHERE emision_id IN (...)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_aseguradosadicionales_emision_id',
+            'aseguradosadicionales',
+            ['emision_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_aseguradosadicionales_emision_id',
+            table_name='aseguradosadicionales',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
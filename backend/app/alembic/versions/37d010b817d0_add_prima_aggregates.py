@@ -0,0 +1,189 @@
+"""Add stored prima aggregates to cotizacion and detsolicitud, kept by triggers
+
+Revision ID: 37d010b817d0
+Revises: 043b406fabc0
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = '37d010b817d0'
+down_revision = '043b406fabc0'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+AGGREGATE_COLUMNS = ('prima_neta', 'iva_total', 'prima_total')
+
+# Triggers por sentencia con tablas de transición, como los del snapshot
+# (f4b1e07c93d2): cualquier escritura sobre cobertura recalcula las primas de
+# sus det_solicitudes, y cualquier cambio de primas en detsolicitud las de sus
+# cotizaciones. Se recalcula desde los hijos en lugar de sumar diferencias,
+# así que el resultado no depende del orden ni de escrituras repetidas.
+#
+# La tasa de IVA es app.iva_rate, que app/core/db.py define al conectar con
+# settings.IVA_RATE; sin ella el trigger falla en lugar de guardar un IVA
+# inventado.
+COBERTURA_SYNC = '''
+CREATE FUNCTION cobertura_sync_primas() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    iva_rate float8 := nullif(current_setting('app.iva_rate', true), '')::float8;
+    ids int[];
+BEGIN
+    IF iva_rate IS NULL THEN
+        RAISE EXCEPTION 'app.iva_rate no está definido (settings.IVA_RATE)';
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        ids := ARRAY(SELECT DISTINCT det_solicitud_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        ids := ARRAY(SELECT DISTINCT det_solicitud_id FROM old_rows);
+    ELSE
+        ids := ARRAY(
+            SELECT det_solicitud_id FROM old_rows
+            UNION SELECT det_solicitud_id FROM new_rows
+        );
+    END IF;
+    UPDATE detsolicitud d
+    SET prima_neta = s.prima_neta,
+        iva_total = s.prima_neta * iva_rate,
+        prima_total = s.prima_neta * (1 + iva_rate)
+    FROM (
+        SELECT ds.id, coalesce(sum(c.prima), 0) AS prima_neta
+        FROM detsolicitud ds
+        LEFT JOIN cobertura c ON c.det_solicitud_id = ds.id
+        WHERE ds.id = ANY(ids)
+        GROUP BY ds.id
+    ) s
+    WHERE d.id = s.id
+      AND (d.prima_neta, d.iva_total, d.prima_total)
+          IS DISTINCT FROM (s.prima_neta, s.prima_neta * iva_rate, s.prima_neta * (1 + iva_rate));
+    RETURN NULL;
+END
+$$
+'''
+
+# En UPDATE solo cuentan las filas que cambiaron de primas o de cotización;
+# así el backfill de otras columnas de detsolicitud no recalcula cotizaciones.
+DETSOLICITUD_SYNC = '''
+CREATE FUNCTION detsolicitud_sync_primas() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    ids int[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        ids := ARRAY(SELECT DISTINCT cotizacion_id FROM new_rows);
+    ELSIF TG_OP = 'DELETE' THEN
+        ids := ARRAY(SELECT DISTINCT cotizacion_id FROM old_rows);
+    ELSE
+        ids := ARRAY(
+            SELECT DISTINCT unnest(ARRAY[o.cotizacion_id, n.cotizacion_id])
+            FROM old_rows o
+            JOIN new_rows n ON n.id = o.id
+            WHERE (o.cotizacion_id, o.prima_neta, o.iva_total, o.prima_total)
+                IS DISTINCT FROM (n.cotizacion_id, n.prima_neta, n.iva_total, n.prima_total)
+        );
+    END IF;
+    IF cardinality(ids) = 0 THEN
+        RETURN NULL;
+    END IF;
+    UPDATE cotizacion ct
+    SET prima_neta = s.prima_neta,
+        iva_total = s.iva_total,
+        prima_total = s.prima_total
+    FROM (
+        SELECT c.id,
+               coalesce(sum(ds.prima_neta), 0) AS prima_neta,
+               coalesce(sum(ds.iva_total), 0) AS iva_total,
+               coalesce(sum(ds.prima_total), 0) AS prima_total
+        FROM cotizacion c
+        LEFT JOIN detsolicitud ds ON ds.cotizacion_id = c.id
+        WHERE c.id = ANY(ids)
+        GROUP BY c.id
+    ) s
+    WHERE ct.id = s.id
+      AND (ct.prima_neta, ct.iva_total, ct.prima_total)
+          IS DISTINCT FROM (s.prima_neta, s.iva_total, s.prima_total);
+    RETURN NULL;
+END
+$$
+'''
+
+SYNC_TRIGGERS = {
+    'cobertura': COBERTURA_SYNC,
+    'detsolicitud': DETSOLICITUD_SYNC,
+}
+
+TRANSITION_TABLES = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def _backfill(conn):
+    # Recalcula las primas de cada det_solicitud desde sus coberturas por
+    # rangos de id, cada lote confirmado por separado. Como se asigna el total
+    # en lugar de sumarlo, volver a correrlo tras una falla no duplica nada;
+    # el trigger de detsolicitud actualiza las cotizaciones de cada lote.
+    max_id = conn.execute(sa.text('SELECT coalesce(max(id), 0) FROM detsolicitud')).scalar()
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        conn.execute(
+            sa.text(
+                '''
+                UPDATE detsolicitud d
+                SET prima_neta = s.prima_neta,
+                    iva_total = s.prima_neta * :iva_rate,
+                    prima_total = s.prima_neta * (1 + :iva_rate)
+                FROM (
+                    SELECT ds.id, coalesce(sum(c.prima), 0) AS prima_neta
+                    FROM detsolicitud ds
+                    LEFT JOIN cobertura c ON c.det_solicitud_id = ds.id
+                    WHERE ds.id >= :start AND ds.id < :end
+                    GROUP BY ds.id
+                ) s
+                WHERE d.id = s.id
+                '''
+            ),
+            {'iva_rate': settings.IVA_RATE, 'start': start, 'end': start + BATCH_SIZE},
+        )
+
+
+def upgrade():
+    for table in ('detsolicitud', 'cotizacion'):
+        for column in AGGREGATE_COLUMNS:
+            op.add_column(table, sa.Column(column, sa.Float(), nullable=False, server_default='0'))
+
+    # Los triggers van antes del backfill: lo que se escriba mientras corre
+    # ya queda al día y el backfill solo recalcula lo anterior.
+    for table, function in SYNC_TRIGGERS.items():
+        op.execute(function)
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            op.execute(
+                f'''
+                CREATE TRIGGER {table}_sync_primas_{event.lower()}
+                AFTER {event} ON {table}
+                {TRANSITION_TABLES[event]}
+                FOR EACH STATEMENT EXECUTE FUNCTION {table}_sync_primas()
+                '''
+            )
+
+    with op.get_context().autocommit_block():
+        _backfill(op.get_bind())
+
+
+def downgrade():
+    for table in SYNC_TRIGGERS:
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            op.execute(f'DROP TRIGGER {table}_sync_primas_{event.lower()} ON {table}')
+        op.execute(f'DROP FUNCTION {table}_sync_primas()')
+    for table in ('cotizacion', 'detsolicitud'):
+        for column in reversed(AGGREGATE_COLUMNS):
+            op.drop_column(table, column)
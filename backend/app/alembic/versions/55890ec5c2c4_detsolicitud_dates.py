@@ -0,0 +1,70 @@
+"""Store detsolicitud vigencias and fecha_nacimiento as DATE
+
+Revision ID: 55890ec5c2c4
+Revises: bb8d474d9e02
+Create Date: 2026-10-18 12:21:05.802316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '55890ec5c2c4'
+down_revision = 'bb8d474d9e02'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 10_000
+
+DATE_COLUMNS = ('fecha_nacimiento', 'ini_vig_reportada', 'fin_vig_reportada')
+
+_SET_DATES = ', '.join(
+    f"{column}_date = NULLIF({column}, '')::date" for column in DATE_COLUMNS
+)
+
+
+def upgrade():
+    for column in DATE_COLUMNS:
+        op.add_column('detsolicitud', sa.Column(f'{column}_date', sa.Date(), nullable=True))
+
+    # Se copian las fechas por rangos de id, confirmando cada lote, para no
+    # reescribir la tabla completa en una sola transacción.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        max_id = conn.execute(sa.text('SELECT coalesce(max(id), 0) FROM detsolicitud')).scalar()
+        for start in range(0, max_id + 1, BATCH_SIZE):
+            conn.execute(
+                sa.text(f'UPDATE detsolicitud SET {_SET_DATES} WHERE id >= :start AND id < :end'),
+                {'start': start, 'end': start + BATCH_SIZE},
+            )
+
+    # Filas insertadas durante el backfill; el lock evita nuevas escrituras
+    # hasta que las columnas se intercambian.
+    op.execute('LOCK TABLE detsolicitud IN EXCLUSIVE MODE')
+    op.execute(f'UPDATE detsolicitud SET {_SET_DATES} WHERE ini_vig_reportada_date IS NULL')
+    for column in DATE_COLUMNS:
+        op.drop_column('detsolicitud', column)
+        op.alter_column('detsolicitud', f'{column}_date', new_column_name=column)
+    op.alter_column('detsolicitud', 'ini_vig_reportada', nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_detsolicitud_ini_vig_reportada',
+            'detsolicitud',
+            ['ini_vig_reportada'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    op.drop_index('ix_detsolicitud_ini_vig_reportada', table_name='detsolicitud')
+    for column in DATE_COLUMNS:
+        op.alter_column(
+            'detsolicitud',
+            column,
+            type_=sqlmodel.sql.sqltypes.AutoString(),
+            postgresql_using=f"to_char({column}, 'YYYY-MM-DD')",
+        )
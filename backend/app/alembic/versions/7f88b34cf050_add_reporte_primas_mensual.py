@@ -0,0 +1,56 @@
+"""Add reporte_primas_mensual materialized view
+
+Revision ID: 7f88b34cf050
+Revises: 1159fa256ddf
+Create Date: 2026-10-18 14:52:19.630844
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '7f88b34cf050'
+down_revision = '1159fa256ddf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Prima escrita por sucursal, distribuidor y mes de inicio de vigencia. La
+    # clave y el nombre se copian para que los reportes no toquen otras tablas.
+    op.execute(
+        '''
+        CREATE MATERIALIZED VIEW reporte_primas_mensual AS
+        SELECT
+            s.id AS sucursal_id,
+            s.clave AS suc_clave,
+            s.nombre AS suc_nombre,
+            d.id AS distribuidor_id,
+            d.clave AS distribuidor_clave,
+            d.nombre AS distribuidor_nombre,
+            date_trunc('month', ds.ini_vig_reportada)::date AS mes,
+            count(*) AS coberturas,
+            sum(c.prima) AS prima_neta
+        FROM cobertura c
+        JOIN detsolicitud ds ON ds.id = c.det_solicitud_id
+        JOIN cotizacion ct ON ct.id = ds.cotizacion_id
+        JOIN cotizacionobjeto co ON co.id = ct.cotizacion_objeto_id
+        JOIN sucursal s ON s.id = co.sucursal_id
+        JOIN distribuidor d ON d.id = co.distribuidor_id
+        GROUP BY s.id, d.id, date_trunc('month', ds.ini_vig_reportada)
+        '''
+    )
+    # REFRESH ... CONCURRENTLY necesita un índice único sobre la vista
+    op.create_index(
+        'ix_reporte_primas_mensual_sucursal_id_distribuidor_id_mes',
+        'reporte_primas_mensual',
+        ['sucursal_id', 'distribuidor_id', 'mes'],
+        unique=True,
+    )
+    op.create_index('ix_reporte_primas_mensual_mes', 'reporte_primas_mensual', ['mes'])
+
+
+def downgrade():
+    op.execute('DROP MATERIALIZED VIEW reporte_primas_mensual')
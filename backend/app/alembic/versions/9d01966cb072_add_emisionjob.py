@@ -0,0 +1,47 @@
+"""Add emisionjob, the queue of asynchronous emisiones
+
+Revision ID: 9d01966cb072
+Revises: f4b1e07c93d2
+Create Date: 2026-10-18 19:42:10.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9d01966cb072'
+down_revision = 'f4b1e07c93d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('emisionjob',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('estado', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('total_certificados', sa.Integer(), nullable=False),
+    sa.Column('certificados_procesados', sa.Integer(), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('emision_id', sa.Uuid(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['emision_id'], ['emision.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Solo los trabajos sin terminar: el índice no crece con el historial
+    op.create_index(
+        'ix_emisionjob_creado_en_sin_terminar',
+        'emisionjob',
+        ['creado_en'],
+        postgresql_where=sa.text("estado IN ('pendiente', 'procesando')"),
+    )
+
+
+def downgrade():
+    op.drop_index('ix_emisionjob_creado_en_sin_terminar', table_name='emisionjob')
+    op.drop_table('emisionjob')
@@ -0,0 +1,58 @@
+"""Add indexes for claves, the cotizacion objeto lookup and foreign keys
+
+Revision ID: bb8d474d9e02
+Revises: 37d010b817d0
+Create Date: 2026-10-18 11:03:27.514930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'bb8d474d9e02'
+down_revision = '37d010b817d0'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_sucursal_clave', 'sucursal', ['clave']),
+    ('ix_distribuidor_clave', 'distribuidor', ['clave']),
+    (
+        'ix_cotizacionobjeto_convenio_id_sucursal_id_distribuidor_id',
+        'cotizacionobjeto',
+        ['convenio_id', 'sucursal_id', 'distribuidor_id'],
+    ),
+    ('ix_cotizacion_cotizacion_objeto_id', 'cotizacion', ['cotizacion_objeto_id']),
+    ('ix_detsolicitud_cotizacion_id', 'detsolicitud', ['cotizacion_id']),
+    ('ix_cobertura_det_solicitud_id', 'cobertura', ['det_solicitud_id']),
+    ('ix_certificadodetalle_emision_id', 'certificadodetalle', ['emision_id']),
+    ('ix_item_owner_id', 'item', ['owner_id']),
+)
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY no bloquea escrituras pero no puede correr dentro
+    # de una transacción. Si una construcción falla queda un índice INVALID que
+    # hay que borrar a mano antes de reintentar.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
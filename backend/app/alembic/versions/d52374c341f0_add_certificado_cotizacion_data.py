@@ -0,0 +1,60 @@
+"""Add the cotizacion data copied into certificados and certificadocobertura
+
+Revision ID: d52374c341f0
+Revises: 21524af39532
+Create Date: 2026-10-18 21:12:48.903117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'd52374c341f0'
+down_revision = '21524af39532'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Columnas nullable sin default: en Postgres solo cambian el catálogo y no
+    # reescriben certificadodetalle.
+    op.add_column('certificadodetalle', sa.Column('det_solicitud_id', sa.Integer(), nullable=True))
+    op.add_column('certificadodetalle', sa.Column('plan', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('certificadodetalle', sa.Column('paquete', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('certificadodetalle', sa.Column('ini_vig', sa.Date(), nullable=True))
+    op.add_column('certificadodetalle', sa.Column('fin_vig', sa.Date(), nullable=True))
+    op.add_column('certificadodetalle', sa.Column('prima_neta', sa.Float(), nullable=True))
+    op.add_column('certificadodetalle', sa.Column('iva_total', sa.Float(), nullable=True))
+    op.add_column('certificadodetalle', sa.Column('prima_total', sa.Float(), nullable=True))
+    # Un certificado emitido sobrevive a la cotización de la que salió: al
+    # borrarla solo se pierde el vínculo, los datos ya están copiados.
+    op.create_foreign_key(
+        'certificadodetalle_det_solicitud_id_fkey',
+        'certificadodetalle',
+        'detsolicitud',
+        ['det_solicitud_id'],
+        ['id'],
+        ondelete='SET NULL',
+    )
+
+    op.create_table('certificadocobertura',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('clave_cobertura', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('prima_neta', sa.Float(), nullable=False),
+    sa.Column('iva_total', sa.Float(), nullable=False),
+    sa.Column('prima_total', sa.Float(), nullable=False),
+    sa.Column('certificado_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['certificado_id'], ['certificadodetalle.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_certificadocobertura_certificado_id'), 'certificadocobertura', ['certificado_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_certificadocobertura_certificado_id'), table_name='certificadocobertura')
+    op.drop_table('certificadocobertura')
+    op.drop_constraint('certificadodetalle_det_solicitud_id_fkey', 'certificadodetalle', type_='foreignkey')
+    for column in ('prima_total', 'iva_total', 'prima_neta', 'fin_vig', 'ini_vig', 'paquete', 'plan', 'det_solicitud_id'):
+        op.drop_column('certificadodetalle', column)
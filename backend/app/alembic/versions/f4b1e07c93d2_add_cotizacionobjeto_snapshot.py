@@ -0,0 +1,126 @@
+"""Add cotizacionobjeto snapshot and the triggers that invalidate it
+
+Revision ID: f4b1e07c93d2
+Revises: 7f88b34cf050
+Create Date: 2026-10-18 16:07:44.291573
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b1e07c93d2'
+down_revision = '7f88b34cf050'
+branch_labels = None
+depends_on = None
+
+# Condición sobre cotizacionobjeto que identifica las filas afectadas por las
+# filas de la tabla de transición {rows}, y los eventos que la disparan.
+STALE_CONDITIONS = {
+    'cotizacion': (
+        'id IN (SELECT cotizacion_objeto_id FROM {rows})',
+        ('INSERT', 'UPDATE', 'DELETE'),
+    ),
+    'detsolicitud': (
+        '''id IN (
+            SELECT ct.cotizacion_objeto_id
+            FROM {rows} r JOIN cotizacion ct ON ct.id = r.cotizacion_id
+        )''',
+        ('INSERT', 'UPDATE', 'DELETE'),
+    ),
+    'cobertura': (
+        '''id IN (
+            SELECT ct.cotizacion_objeto_id
+            FROM {rows} r
+            JOIN detsolicitud ds ON ds.id = r.det_solicitud_id
+            JOIN cotizacion ct ON ct.id = ds.cotizacion_id
+        )''',
+        ('INSERT', 'UPDATE', 'DELETE'),
+    ),
+    'sucursal': ('sucursal_id IN (SELECT id FROM {rows})', ('UPDATE',)),
+    'distribuidor': ('distribuidor_id IN (SELECT id FROM {rows})', ('UPDATE',)),
+}
+
+TRANSITION_TABLES = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def upgrade():
+    op.add_column(
+        'cotizacionobjeto',
+        sa.Column('snapshot', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+    # Triggers por sentencia con tablas de transición: un INSERT multi-fila
+    # invalida cada cotización objeto una sola vez. Cada evento declara solo
+    # las tablas de transición que tiene, así que hay un trigger por evento y
+    # la función lee únicamente las que existen según TG_OP.
+    for table, (condition, events) in STALE_CONDITIONS.items():
+        op.execute(
+            f'''
+            CREATE FUNCTION {table}_invalidate_snapshot() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP <> 'INSERT' THEN
+                    UPDATE cotizacionobjeto SET snapshot = NULL
+                    WHERE snapshot IS NOT NULL AND {condition.format(rows='old_rows')};
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    UPDATE cotizacionobjeto SET snapshot = NULL
+                    WHERE snapshot IS NOT NULL AND {condition.format(rows='new_rows')};
+                END IF;
+                RETURN NULL;
+            END
+            $$
+            '''
+        )
+        for event in events:
+            op.execute(
+                f'''
+                CREATE TRIGGER {table}_invalidate_snapshot_{event.lower()}
+                AFTER {event} ON {table}
+                {TRANSITION_TABLES[event]}
+                FOR EACH STATEMENT EXECUTE FUNCTION {table}_invalidate_snapshot()
+                '''
+            )
+
+    # Cambiar convenio, sucursal o distribuidor de la propia fila también
+    # invalida el snapshot.
+    op.execute(
+        '''
+        CREATE FUNCTION cotizacionobjeto_invalidate_snapshot() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF (NEW.convenio_id, NEW.sucursal_id, NEW.distribuidor_id)
+                IS DISTINCT FROM (OLD.convenio_id, OLD.sucursal_id, OLD.distribuidor_id)
+            THEN
+                NEW.snapshot := NULL;
+            END IF;
+            RETURN NEW;
+        END
+        $$
+        '''
+    )
+    op.execute(
+        '''
+        CREATE TRIGGER cotizacionobjeto_invalidate_snapshot
+        BEFORE UPDATE ON cotizacionobjeto
+        FOR EACH ROW EXECUTE FUNCTION cotizacionobjeto_invalidate_snapshot()
+        '''
+    )
+
+
+def downgrade():
+    op.execute('DROP TRIGGER cotizacionobjeto_invalidate_snapshot ON cotizacionobjeto')
+    op.execute('DROP FUNCTION cotizacionobjeto_invalidate_snapshot()')
+    for table, (_, events) in STALE_CONDITIONS.items():
+        for event in events:
+            op.execute(f'DROP TRIGGER {table}_invalidate_snapshot_{event.lower()} ON {table}')
+        op.execute(f'DROP FUNCTION {table}_invalidate_snapshot()')
+    op.drop_column('cotizacionobjeto', 'snapshot')
@@ -1,5 +1,5 @@
-from collections.abc import Generator
-from typing import Annotated
+from collections.abc import AsyncGenerator, Awaitable, Callable, Generator
+from typing import Annotated, Any
 
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -7,10 +7,12 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import async_engine, engine
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -27,6 +29,39 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+RunDb = Callable[..., Awaitable[Any]]
+
+
+async def get_run_db(session: SessionDep) -> AsyncGenerator[RunDb, None]:
+    """
+    Yield ``run_db(fn, *args, **kwargs)``, which awaits ``fn(session, *args,
+    **kwargs)`` without blocking the event loop.
+
+    With ``ASYNC_DATABASE`` the sync code runs on the async engine through
+    ``AsyncSession.run_sync``, so waiting on Postgres does not hold a thread;
+    otherwise it runs on the request's sync session in the threadpool.
+    """
+    if settings.ASYNC_DATABASE:
+        async with AsyncSession(async_engine) as async_session:
+            yield async_session.run_sync
+        return
+
+    async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await run_in_threadpool(fn, session, *args, **kwargs)
+
+    yield run_db
+
+
+RunDbDep = Annotated[RunDb, Depends(get_run_db)]
+
+
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
         payload = jwt.decode(
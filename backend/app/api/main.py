@@ -1,6 +1,16 @@
 from fastapi import APIRouter
 
-from app.api.routes import items, login, users, utils, cotizaciones, emision, plans
+from app.api.routes import (
+    items,
+    login,
+    users,
+    utils,
+    cotizaciones,
+    emision,
+    plans,
+    reportes,
+    tarifas,
+)
 
 api_router = APIRouter()
 api_router.include_router(login.router, tags=["login"])
@@ -12,3 +22,5 @@ api_router.include_router(
 )
 api_router.include_router(emision.router, prefix="/emision", tags=["emision"])
 api_router.include_router(plans.router, prefix="/plans", tags=["plans"])
+api_router.include_router(reportes.router, prefix="/reportes", tags=["reportes"])
+api_router.include_router(tarifas.router, prefix="/tarifas", tags=["tarifas"])
@@ -1,17 +1,140 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
-from typing import List
-from app.schemas import CotizacionResponse
-from app.api.deps import get_db
-from app.services.cotizaciones import get_all_cotizaciones
+from typing import Any, Dict, List, Optional
+from app.assemblers.cotizaciones import CotizacionAssembler, CotizacionObjetoAssembler
+from app.schemas import (
+    CotizacionBatchResult,
+    CotizacionFilterParams,
+    CotizacionObjetoCreate,
+    CotizacionResponse,
+    SimulacionCreate,
+    SimulacionRead,
+)
+from app.api.deps import RunDb, get_db, get_run_db
+from app.core.config import settings
+from app.core.counting import CountMode
+from app.services.cotizaciones import (
+    CotizacionObjetoService,
+    CotizacionService,
+    DistribuidorService,
+    SucursalService,
+    count_cotizaciones,
+    export_cotizaciones,
+    get_all_cotizaciones_json_agg,
+    get_all_cotizaciones_projection,
+    get_all_cotizaciones_snapshot,
+    get_cotizacion_json_agg,
+    get_cotizacion_projection,
+    get_cotizacion_snapshot,
+    rate_cotizaciones_batch,
+    simular_primas,
+)
 
 router = APIRouter()
 
+_LISTING_READERS = {
+    "projection": get_all_cotizaciones_projection,
+    "snapshot": get_all_cotizaciones_snapshot,
+    "json_agg": get_all_cotizaciones_json_agg,
+}
+_DETAIL_READERS = {
+    "projection": get_cotizacion_projection,
+    "snapshot": get_cotizacion_snapshot,
+    "json_agg": get_cotizacion_json_agg,
+}
+
 
 @router.get("/", response_model=List[CotizacionResponse])
-def get_emisiones(
-    db: Session = Depends(get_db),
-    page: int = Query(1, alias="page"),
-    limit: int = Query(10, alias="limit"),
+async def get_emisiones(
+    run_db: RunDb = Depends(get_run_db),
+    page: int = Query(1, alias="page", ge=1),
+    limit: int = Query(10, alias="limit", ge=1),
+    cursor: Optional[str] = Query(None, alias="cursor"),
+    filters: CotizacionFilterParams = Depends(),
+    count_mode: CountMode = Query(CountMode.none, alias="count_mode"),
+):
+    content, next_cursor = await run_db(
+        _LISTING_READERS[settings.COTIZACIONES_READ_PATH],
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        filters=filters,
+    )
+    response = Response(content=content, media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    total = await run_db(count_cotizaciones, filters, count_mode)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    return response
+
+
+@router.get("/export")
+def export_all_cotizaciones(filters: CotizacionFilterParams = Depends()):
+    return StreamingResponse(
+        export_cotizaciones(filters=filters), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/{cotizacion_objeto_id}", response_model=CotizacionResponse)
+async def get_cotizacion(
+    cotizacion_objeto_id: int, run_db: RunDb = Depends(get_run_db)
+):
+    content = await run_db(
+        _DETAIL_READERS[settings.COTIZACIONES_READ_PATH], cotizacion_objeto_id
+    )
+    return Response(content=content, media_type="application/json")
+
+
+def _create_cotizacion(
+    db: Session, cotizacion_objeto_in: CotizacionObjetoCreate
+) -> CotizacionResponse:
+    sucursal = SucursalService.get_sucursal_by_clave(db, cotizacion_objeto_in.suc_clave)
+    distribuidor = DistribuidorService.get_distribuidor_by_clave(
+        db, cotizacion_objeto_in.distribuidor_clave
+    )
+    cotizacion_objeto_db = CotizacionObjetoService.create_cotizacion_objeto(
+        db, cotizacion_objeto_in, sucursal, distribuidor
+    )
+    cotizaciones = [
+        CotizacionAssembler.assemble_cotizacion(cotizacion_db)
+        for cotizacion_db in CotizacionService.get_cotizaciones_by_objeto_id(
+            db, cotizacion_objeto_db.id
+        )
+    ]
+    return CotizacionResponse(
+        response_body=CotizacionObjetoAssembler.assemble_cotizacion_objeto(
+            cotizacion_objeto_db,
+            sucursal,
+            distribuidor,
+            cotizaciones,
+            cotizacion_objeto_in,
+        ),
+        es_dato_valido=True,
+        message_error=None,
+    )
+
+
+@router.post("/", response_model=CotizacionResponse)
+async def create_cotizacion(
+    cotizacion_objeto_in: CotizacionObjetoCreate, run_db: RunDb = Depends(get_run_db)
+):
+    return await run_db(_create_cotizacion, cotizacion_objeto_in)
+
+
+@router.post("/simulacion", response_model=SimulacionRead)
+def simular_cotizacion(simulacion_in: SimulacionCreate):
+    # 100x100 sumas/edades son 30.000 floats: se serializan con pydantic en
+    # lugar de pasar por la validación del response_model y json.dumps
+    return Response(
+        content=simular_primas(simulacion_in).model_dump_json(),
+        media_type="application/json",
+    )
+
+
+@router.post("/batch", response_model=List[CotizacionBatchResult])
+def create_cotizaciones_batch(
+    payloads: List[Dict[str, Any]], db: Session = Depends(get_db)
 ):
-    return get_all_cotizaciones(db, page=page, limit=limit)
+    return rate_cotizaciones_batch(db, payloads)
@@ -1,94 +1,86 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.models import Emision, CertificadoDetalle, AseguradosAdicionales
+import uuid
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import JSONResponse
 from app.schemas import (
+    EmisionDesdeCotizacionRequest,
+    EmisionJobRead,
+    EmisionRead,
     EmisionRequest,
     EmisionResponse,
-    CertificadoResponse,
 )
-from app.api.deps import get_db
+from app.api.deps import RunDb, get_run_db
+from app.services import emision as emision_service
 
 router = APIRouter()
 
 
-@router.post("/", response_model=EmisionResponse)
-def create_emision(emision_request: EmisionRequest, db: Session = Depends(get_db)):
-    # Crear la emisión
-    emision = Emision(
-        id_convenio=emision_request.idConvenio,
-        suc_clave=emision_request.sucClave,
-        suc_nombre=emision_request.sucNombre,
-        distribuidor_clave=emision_request.distribuidorClave,
-        distribuidor_nombre=emision_request.distribuidorNombre,
-        distribuidor_email=emision_request.distribuidorEmail,
+@router.get("/", response_model=List[EmisionRead])
+async def get_emisiones(
+    run_db: RunDb = Depends(get_run_db),
+    limit: int = Query(10, alias="limit", ge=1, le=1000),
+    cursor: Optional[str] = Query(None, alias="cursor"),
+    include: Optional[str] = Query(
+        None,
+        alias="include",
+        description="Colecciones a expandir, separadas por coma: "
+        "certificados, asegurados",
+    ),
+):
+    content, next_cursor = await run_db(
+        emision_service.get_all_emisiones,
+        limit=limit,
+        cursor=cursor,
+        include=emision_service.parse_include(include),
     )
+    response = Response(content=content, media_type="application/json")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
-    # Agregar certificados
-    certificados = []
-    for cert in emision_request.certificados:
-        certificado = CertificadoDetalle(
-            tipo=cert.tipo,
-            tipo_identificacion=cert.tipoIdentificacion,
-            numero_identificacion=cert.numeroIdentificacion,
-            nombre=cert.nombre,
-            sexo=cert.sexo,
-            etiqueta_adicional1=cert.etiquetaAdicional1,
-            data_adicional1=cert.dataAdicional1,
-            etiqueta_adicional2=cert.etiquetaAdicional2,
-            data_adicional2=cert.dataAdicional2,
-            etiqueta_adicional3=cert.etiquetaAdicional3,
-            data_adicional3=cert.dataAdicional3,
-            emision=emision,
-        )
-        db.add(certificado)
-        certificados.append(certificado)
-
-    # Agregar asegurados adicionales
-    if emision_request.aseguradosAdicionales:
-        for aseg in emision_request.aseguradosAdicionales:
-            asegurado = AseguradosAdicionales(
-                parentesco=aseg.parentesco,
-                tipo_identificacion=aseg.tipoIdentificacion,
-                numero_identificacion=aseg.numeroIdentificacion,
-                nombre=aseg.nombre,
-                fecha_nacimiento=aseg.fechaNacimiento,
-                sexo=aseg.sexo,
-                edad=aseg.edad,
-                emision=emision,
-            )
-            db.add(asegurado)
 
-    db.add(emision)
-    db.commit()
-    db.refresh(emision)
-
-    # Crear la respuesta
-    certificados_response = []
-    for cert in certificados:
-        certificado_response = CertificadoResponse(
-            identificador=str(cert.id),
-            primaNeta=0.0,  # Estos valores deben ser calculados
-            ivaTotal=0.0,  # según la lógica de negocio
-            primaTotal=0.0,  # aquí van los valores reales
-            vigenciaInicial="",  # valores de ejemplo
-            vigenciaFinal="",
-            planCertificado="",
-            paquete="",
-            coberturas=[],  # Este debe contener los datos reales de coberturas
+@router.post(
+    "/",
+    response_model=EmisionResponse,
+    responses={202: {"model": EmisionJobRead}},
+)
+async def create_emision(
+    emision_request: EmisionRequest,
+    asincrona: bool = False,
+    run_db: RunDb = Depends(get_run_db),
+):
+    if asincrona:
+        # Solo se guarda el payload; app/emision_worker.py inserta la emisión
+        # y el cliente consulta el avance en /emision/jobs/{id}
+        job = await run_db(emision_service.encolar_emision, emision_request)
+        return JSONResponse(
+            status_code=202,
+            content=job.model_dump(mode="json"),
+            headers={"Location": f"jobs/{job.id}"},
         )
-        certificados_response.append(certificado_response)
+    emision_response = await run_db(emision_service.create_emision, emision_request)
+    # Una emisión colectiva responde con decenas de miles de certificados: se
+    # serializa con pydantic en lugar de pasar por el response_model
+    return Response(
+        content=emision_response.model_dump_json(), media_type="application/json"
+    )
+
 
-    emision_response = EmisionResponse(
-        identificador=str(emision.id),
-        mensajeError=None,
-        confirmacionEmitida=None,
-        idConvenio=emision.id_convenio,
-        sucClave=emision.suc_clave,
-        sucNombre=emision.suc_nombre,
-        distribuidorClave=emision.distribuidor_clave,
-        distribuidorNombre=emision.distribuidor_nombre,
-        distribuidorEmail=emision.distribuidor_email,
-        certificados=certificados_response,
+@router.post("/from-cotizacion/{cotizacion_id}", response_model=EmisionResponse)
+async def create_emision_from_cotizacion(
+    cotizacion_id: int,
+    emision_request: EmisionDesdeCotizacionRequest,
+    run_db: RunDb = Depends(get_run_db),
+):
+    emision_response = await run_db(
+        emision_service.create_emision_from_cotizacion, cotizacion_id, emision_request
     )
+    return Response(
+        content=emision_response.model_dump_json(), media_type="application/json"
+    )
+
 
-    return emision_response
+@router.get("/jobs/{job_id}", response_model=EmisionJobRead)
+async def read_emision_job(job_id: uuid.UUID, run_db: RunDb = Depends(get_run_db)):
+    return await run_db(emision_service.get_emision_job, job_id)
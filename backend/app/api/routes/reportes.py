@@ -0,0 +1,31 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from app.api.deps import get_current_user, get_db
+from app.schemas import ReportePrimasFilterParams, ReportePrimasRead
+from app.services.reportes import get_reporte_primas
+
+router = APIRouter(dependencies=[Depends(get_current_user)])
+
+
+@router.get("/primas/sucursales", response_model=List[ReportePrimasRead])
+def read_primas_por_sucursal(
+    db: Session = Depends(get_db), filters: ReportePrimasFilterParams = Depends()
+):
+    return get_reporte_primas(db, ["sucursal"], filters)
+
+
+@router.get("/primas/distribuidores", response_model=List[ReportePrimasRead])
+def read_primas_por_distribuidor(
+    db: Session = Depends(get_db), filters: ReportePrimasFilterParams = Depends()
+):
+    return get_reporte_primas(db, ["distribuidor"], filters)
+
+
+@router.get("/primas/mensual", response_model=List[ReportePrimasRead])
+def read_primas_mensual(
+    db: Session = Depends(get_db), filters: ReportePrimasFilterParams = Depends()
+):
+    return get_reporte_primas(db, ["sucursal", "distribuidor", "mes"], filters)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_active_superuser
+from app.schemas import TarifasRead
+from app.services.tarifas import get_estado_tarifas, get_tarifas, reload_tarifas
+
+router = APIRouter(dependencies=[Depends(get_current_active_superuser)])
+
+
+@router.get("/", response_model=TarifasRead)
+def read_tarifas():
+    return get_estado_tarifas()
+
+
+@router.post("/reload", response_model=TarifasRead)
+def recargar_tarifas():
+    # Recarga solo el worker que atiende la petición; los demás toman la
+    # versión nueva en su siguiente revisión de TARIFF_PATH.
+    if get_tarifas() is not None:
+        reload_tarifas()
+    return get_estado_tarifas()
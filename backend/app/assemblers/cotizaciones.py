@@ -1,5 +1,6 @@
 from typing import List
 from app.models import Cotizacion, CotizacionObjeto, Sucursal, Distribuidor
+from app.services.rating import rate_tree
 from app.schemas import (
     CoberturaRead,
     CotizacionRead,
@@ -12,16 +13,27 @@ from app.schemas import (
 class CotizacionAssembler:
     @staticmethod
     def assemble_cotizacion(cotizacion_db: Cotizacion) -> CotizacionRead:
+        rating = rate_tree(
+            [
+                [
+                    [cobertura.prima for cobertura in det_solicitud.coberturas]
+                    for det_solicitud in cotizacion_db.det_solicitudes
+                ]
+            ]
+        )
+        primas = zip(*(values.tolist() for values in rating.coberturas))
         det_solicitudes = []
         for det_solicitud in cotizacion_db.det_solicitudes:
             coberturas = [
                 CoberturaRead(
                     id_cobertura=str(cobertura.id),
-                    prima_neta=cobertura.prima,
-                    iva_notal=cobertura.prima * 0.16,
-                    prima_total=cobertura.prima * 1.16,
+                    prima_neta=prima_neta,
+                    iva_notal=iva,
+                    prima_total=prima_total,
+                )
+                for cobertura, (prima_neta, iva, prima_total) in zip(
+                    det_solicitud.coberturas, primas
                 )
-                for cobertura in det_solicitud.coberturas
             ]
             det_solicitudes.append(
                 DetSolicitudRead(
@@ -44,9 +56,9 @@ class CotizacionAssembler:
         return CotizacionRead(
             id=str(cotizacion_db.id),
             plan_comercial=cotizacion_db.plan_comercial,
-            prima_neta=sum(c.prima_neta for c in det_solicitudes[0].coberturas),
-            iva_notal=sum(c.iva_notal for c in det_solicitudes[0].coberturas),
-            prima_total=sum(c.prima_total for c in det_solicitudes[0].coberturas),
+            prima_neta=float(rating.cotizaciones.prima_neta[0]),
+            iva_notal=float(rating.cotizaciones.iva[0]),
+            prima_total=float(rating.cotizaciones.prima_total[0]),
             det_solicitudes=det_solicitudes,
         )
 
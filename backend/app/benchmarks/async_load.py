@@ -0,0 +1,122 @@
+"""
+Peticiones por segundo de un solo worker: sesión síncrona en el threadpool
+contra el engine async (ASYNC_DATABASE=true).
+
+Uso, desde ./backend y con la base de datos levantada:
+
+    python -m app.benchmarks.async_load --concurrency 64 --seconds 20
+
+Levanta ``uvicorn app.main:app --workers 1`` una vez por modo y lo satura con
+``--concurrency`` clientes httpx que alternan GET /cotizaciones y
+GET /cotizaciones/{id} sobre cotizaciones sembradas. Con la sesión síncrona
+las peticiones en vuelo quedan limitadas por los hilos del threadpool.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from sqlmodel import Session
+
+from app.benchmarks.seed import seed_cotizaciones
+from app.core.config import settings
+from app.core.db import engine
+
+
+async def _client(
+    http: httpx.AsyncClient, paths: list[str], offset: int, deadline: float
+) -> list[float]:
+    latencies = []
+    i = offset
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await http.get(paths[i % len(paths)])
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        i += 1
+    return latencies
+
+
+async def _load(
+    base_url: str, paths: list[str], concurrency: int, seconds: float
+) -> list[float]:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        deadline = time.perf_counter() + seconds
+        results = await asyncio.gather(
+            *(_client(http, paths, i, deadline) for i in range(concurrency))
+        )
+    return [latency for latencies in results for latency in latencies]
+
+
+def _wait_ready(base_url: str, path: str, server: subprocess.Popen) -> None:
+    for _ in range(100):
+        if server.poll() is not None:
+            raise RuntimeError("uvicorn terminó antes de responder")
+        try:
+            httpx.get(base_url + path).raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("uvicorn no respondió")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quotes", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        ids = seed_cotizaciones(session, args.quotes)
+    prefix = f"{settings.API_V1_STR}/cotizaciones"
+    paths = [
+        path
+        for objeto_id in ids
+        for path in (f"{prefix}/?limit={args.limit}", f"{prefix}/{objeto_id}")
+    ]
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"1 worker, {args.concurrency} clientes, {args.seconds:.0f} s")
+    print("                req/s      p50      p99")
+    for name, async_database in (("threadpool", "false"), ("async", "true")):
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--workers",
+                "1",
+                "--port",
+                str(args.port),
+                "--log-level",
+                "warning",
+            ],
+            env={**os.environ, "ASYNC_DATABASE": async_database},
+        )
+        try:
+            _wait_ready(base_url, paths[0], server)
+            latencies = asyncio.run(
+                _load(base_url, paths, args.concurrency, args.seconds)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{name:<12} {len(latencies) / args.seconds:8.0f} "
+            f"{percentiles[49]:8.1f} {percentiles[98]:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+CPU por petición y latencia p99 con concurrencia: ruta ORM contra json_agg.
+
+Uso, desde ./backend y con la base de datos levantada:
+
+    python -m app.benchmarks.cotizaciones_json_agg --quotes 1000 --workers 8
+
+Cada hilo abre su propia sesión y pide páginas de ``--limit`` cotizaciones.
+"ORM" hidrata los modelos y valida las respuestas como hace FastAPI;
+"json_agg" es ``get_all_cotizaciones_json_agg``, donde Postgres arma el JSON
+y Python solo concatena bytes. La CPU se mide por hilo con
+``time.thread_time``, así que solo cuenta el trabajo del proceso de la API.
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlmodel import Session
+
+from app.benchmarks.seed import seed_cotizaciones
+from app.core.db import engine
+from app.core.pagination import encode_cursor
+from app.services.cotizaciones import (
+    _COTIZACION_RESPONSES,
+    get_all_cotizaciones,
+    get_all_cotizaciones_json_agg,
+)
+
+
+def _orm(session: Session, limit: int, cursor: str) -> bytes:
+    responses, _ = get_all_cotizaciones(session, limit=limit, cursor=cursor)
+    validated = _COTIZACION_RESPONSES.validate_python(responses)
+    return _COTIZACION_RESPONSES.dump_json(validated)
+
+
+def _json_agg(session: Session, limit: int, cursor: str) -> bytes:
+    content, _ = get_all_cotizaciones_json_agg(session, limit=limit, cursor=cursor)
+    return content
+
+
+def _worker(fn, limit: int, cursors: list[str]) -> list[tuple[float, float]]:
+    samples = []
+    with Session(engine) as session:
+        for cursor in cursors:
+            session.expunge_all()
+            cpu_start, wall_start = time.thread_time(), time.perf_counter()
+            fn(session, limit, cursor)
+            samples.append(
+                (
+                    (time.thread_time() - cpu_start) * 1000,
+                    (time.perf_counter() - wall_start) * 1000,
+                )
+            )
+    return samples
+
+
+def measure(fn, limit: int, cursors: list[str], workers: int, requests: int):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                _worker,
+                fn,
+                limit,
+                [cursors[(w + i) % len(cursors)] for i in range(requests)],
+            )
+            for w in range(workers)
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    cpu = [sample[0] for sample in samples]
+    wall = [sample[1] for sample in samples]
+    percentiles = statistics.quantiles(wall, n=100)
+    return statistics.median(cpu), percentiles[49], percentiles[98]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quotes", type=int, default=1000)
+    parser.add_argument("--det-solicitudes", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        ids = seed_cotizaciones(session, args.quotes, args.det_solicitudes)
+    cursors = [
+        encode_cursor(ids[start] - 1) for start in range(0, len(ids), args.limit)
+    ]
+
+    print(f"{args.workers} hilos, {args.requests} peticiones de {args.limit} c/u")
+    print("             CPU/petición      p50      p99")
+    for name, fn in (("ORM", _orm), ("json_agg", _json_agg)):
+        cpu_ms, p50_ms, p99_ms = measure(
+            fn, args.limit, cursors, args.workers, args.requests
+        )
+        print(f"{name:<10} {cpu_ms:10.1f} ms {p50_ms:8.1f} {p99_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
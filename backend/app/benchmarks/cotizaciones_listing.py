@@ -0,0 +1,69 @@
+"""
+CPU por cada 1.000 cotizaciones del listado: ruta ORM contra proyección.
+
+Uso, desde ./backend y con la base de datos levantada:
+
+    python -m app.benchmarks.cotizaciones_listing --quotes 1000 --det-solicitudes 5
+
+"ORM" hidrata los modelos, construye las respuestas validándolas y repite la
+validación del ``response_model`` como hace FastAPI antes de serializar.
+"proyección" es ``get_all_cotizaciones_projection``.
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlmodel import Session
+
+from app.benchmarks.seed import seed_cotizaciones
+from app.core.db import engine
+from app.core.pagination import encode_cursor
+from app.services.cotizaciones import (
+    _COTIZACION_RESPONSES,
+    get_all_cotizaciones,
+    get_all_cotizaciones_projection,
+)
+
+
+def _orm(session: Session, limit: int, cursor: str) -> bytes:
+    responses, _ = get_all_cotizaciones(session, limit=limit, cursor=cursor)
+    validated = _COTIZACION_RESPONSES.validate_python(responses)
+    return _COTIZACION_RESPONSES.dump_json(validated)
+
+
+def _projection(session: Session, limit: int, cursor: str) -> bytes:
+    content, _ = get_all_cotizaciones_projection(session, limit=limit, cursor=cursor)
+    return content
+
+
+def measure(session: Session, fn, limit: int, cursor: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        session.expunge_all()
+        start = time.process_time()
+        fn(session, limit, cursor)
+        samples.append((time.process_time() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quotes", type=int, default=1000)
+    parser.add_argument("--det-solicitudes", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        ids = seed_cotizaciones(session, args.quotes, args.det_solicitudes)
+        cursor = encode_cursor(ids[0] - 1)
+        orm_ms = measure(session, _orm, args.quotes, cursor, args.repeat)
+        projection_ms = measure(session, _projection, args.quotes, cursor, args.repeat)
+
+    scale = 1000 / args.quotes
+    print(f"ORM         {orm_ms * scale:8.1f} ms CPU / 1.000 cotizaciones")
+    print(f"proyección  {projection_ms * scale:8.1f} ms CPU / 1.000 cotizaciones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Carga del árbol de cotización: joinedload encadenado contra selectinload.
+
+Uso, desde ./backend y con la base de datos levantada:
+
+    python -m app.benchmarks.cotizaciones_loading --det-solicitudes 50 --coberturas 10
+
+Con joinedload una página de cotizaciones anchas trae
+det_solicitudes × coberturas filas por cotización y ``.unique()`` las deduplica
+en Python; con selectinload se emite una consulta por nivel.
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import Session, select
+
+from app.benchmarks.seed import seed_cotizaciones
+from app.core.db import engine
+from app.models import Cotizacion, CotizacionObjeto, DetSolicitud
+
+STRATEGIES = {
+    "joinedload": joinedload(CotizacionObjeto.cotizaciones)
+    .joinedload(Cotizacion.det_solicitudes)
+    .joinedload(DetSolicitud.coberturas),
+    "selectinload": selectinload(CotizacionObjeto.cotizaciones)
+    .selectinload(Cotizacion.det_solicitudes)
+    .selectinload(DetSolicitud.coberturas),
+}
+
+
+def _load_page(session: Session, ids: list[int], loader) -> int:
+    objetos = (
+        session.exec(
+            select(CotizacionObjeto)
+            .where(CotizacionObjeto.id.in_(ids))
+            .options(loader)
+            .order_by(CotizacionObjeto.id)
+        )
+        .unique()
+        .all()
+    )
+    session.expunge_all()
+    return len(objetos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--det-solicitudes", type=int, default=50)
+    parser.add_argument("--coberturas", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        ids = seed_cotizaciones(
+            session, args.limit, args.det_solicitudes, args.coberturas
+        )
+        for name, loader in STRATEGIES.items():
+            statements = []
+
+            def before_cursor_execute(*params, statements=statements) -> None:
+                statements.append(params[2])
+
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+            samples = []
+            for _ in range(args.repeat):
+                statements.clear()
+                start = time.perf_counter()
+                _load_page(session, ids, loader)
+                samples.append((time.perf_counter() - start) * 1000)
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+            print(
+                f"{name:<14} {statistics.median(samples):8.2f} ms "
+                f"{len(statements)} consultas por página"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Paginación de GET /cotizaciones: page/limit (OFFSET) contra cursor (keyset).
+
+Uso, desde ./backend y con la base de datos levantada:
+
+    python -m app.benchmarks.cotizaciones_pagination --page 10000 --limit 10
+
+Con cursor la página 1 y la página 10.000 deben costar lo mismo; con OFFSET el
+costo crece con la profundidad de la página.
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlmodel import Session, func, select
+
+from app.benchmarks.seed import seed_cotizaciones
+from app.core.db import engine
+from app.core.pagination import encode_cursor
+from app.models import CotizacionObjeto
+from app.services.cotizaciones import get_all_cotizaciones
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        needed = args.page * args.limit
+        existing = session.exec(
+            select(func.count()).select_from(CotizacionObjeto)
+        ).one()
+        if existing < needed:
+            seed_cotizaciones(session, needed - existing)
+
+        # Cursor equivalente a la página pedida, calculado fuera de la medición.
+        previous_id = session.exec(
+            select(CotizacionObjeto.id)
+            .order_by(CotizacionObjeto.id)
+            .offset((args.page - 1) * args.limit - 1)
+            .limit(1)
+        ).one()
+        deep_cursor = encode_cursor(previous_id)
+
+        results = {
+            "offset page 1": _median_ms(
+                lambda: get_all_cotizaciones(session, page=1, limit=args.limit),
+                args.repeat,
+            ),
+            f"offset page {args.page}": _median_ms(
+                lambda: get_all_cotizaciones(session, page=args.page, limit=args.limit),
+                args.repeat,
+            ),
+            "cursor page 1": _median_ms(
+                lambda: get_all_cotizaciones(
+                    session, limit=args.limit, cursor=encode_cursor(0)
+                ),
+                args.repeat,
+            ),
+            f"cursor page {args.page}": _median_ms(
+                lambda: get_all_cotizaciones(
+                    session, limit=args.limit, cursor=deep_cursor
+                ),
+                args.repeat,
+            ),
+        }
+
+    for name, elapsed in results.items():
+        print(f"{name:<24} {elapsed:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
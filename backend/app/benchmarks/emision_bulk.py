@@ -0,0 +1,147 @@
+"""
+Tiempo y memoria de una emisión colectiva: INSERT multi-fila contra COPY, y
+el costo de reenviar la misma emisión.
+
+Uso, desde ./backend y con la base de datos levantada:
+
+    python -m app.benchmarks.emision_bulk --certificados 1000 10000 100000
+
+Para cada tamaño inserta la misma emisión con ``_insert_emision`` forzando
+INSERT multi-fila o COPY (vía ``EMISION_COPY_THRESHOLD``). "reenvío" la
+inserta con COPY y la vuelve a enviar: se mide el segundo envío, donde todos
+los certificados chocan con el índice único y se reportan como duplicados.
+Las emisiones se borran al terminar. ``--memoria`` repite cada corrida con
+tracemalloc para reportar el pico de memoria de Python; va aparte porque
+tracemalloc distorsiona los tiempos.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import AseguradosAdicionales, CertificadoDetalle, Emision
+from app.schemas import EmisionRequest
+from app.services.emision import _insert_emision
+
+
+def emision_request(certificados: int, asegurados: int) -> EmisionRequest:
+    return EmisionRequest(
+        idConvenio=uuid.uuid4(),
+        sucClave="bench",
+        sucNombre="benchmark",
+        distribuidorClave="bench",
+        distribuidorNombre="benchmark",
+        distribuidorEmail="benchmark@example.com",
+        certificados=[
+            {
+                "tipo": "titular",
+                "tipoIdentificacion": "CC",
+                "numeroIdentificacion": f"{i:010d}",
+                "nombre": f"Asegurado {i}",
+                "sexo": "F" if i % 2 else "M",
+                "etiquetaAdicional1": "poliza",
+                "dataAdicional1": str(i),
+            }
+            for i in range(certificados)
+        ],
+        aseguradosAdicionales=[
+            {
+                "parentesco": "hijo",
+                "tipoIdentificacion": "TI",
+                "numeroIdentificacion": f"{i:010d}",
+                "nombre": f"Adicional {i}",
+                "fechaNacimiento": "2010-05-01",
+                "sexo": "M",
+                "edad": 16,
+            }
+            for i in range(asegurados)
+        ],
+    )
+
+
+def _borrar(emision_ids: list[uuid.UUID]) -> None:
+    with Session(engine) as session:
+        session.execute(
+            delete(CertificadoDetalle).where(
+                CertificadoDetalle.emision_id.in_(emision_ids)
+            )
+        )
+        session.execute(
+            delete(AseguradosAdicionales).where(
+                AseguradosAdicionales.emision_id.in_(emision_ids)
+            )
+        )
+        session.execute(delete(Emision).where(Emision.id.in_(emision_ids)))
+        session.commit()
+
+
+def _run(request: EmisionRequest, reenvio: bool) -> tuple[float, list[uuid.UUID]]:
+    emision_ids = []
+    if reenvio:
+        with Session(engine) as session:
+            emision_ids.append(_insert_emision(session, request)[0])
+    with Session(engine) as session:
+        start = time.perf_counter()
+        emision_id, certificados = _insert_emision(session, request)
+        seconds = time.perf_counter() - start
+    emision_ids.append(emision_id)
+    assert all(nuevo != reenvio for _, nuevo in certificados)
+    return seconds, emision_ids
+
+
+def measure(
+    request: EmisionRequest, reenvio: bool, memoria: bool
+) -> tuple[float, float]:
+    seconds, emision_ids = _run(request, reenvio)
+    _borrar(emision_ids)
+    if not memoria:
+        return seconds, float("nan")
+    tracemalloc.start()
+    _, emision_ids = _run(request, reenvio)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    _borrar(emision_ids)
+    return seconds, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--certificados", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument(
+        "--asegurados",
+        type=float,
+        default=0.5,
+        help="asegurados adicionales por certificado",
+    )
+    parser.add_argument("--memoria", action="store_true")
+    args = parser.parse_args()
+
+    modos = (
+        ("INSERT", sys.maxsize, False),
+        ("COPY", 0, False),
+        ("reenvío", 0, True),
+    )
+    print("certificados  camino     segundos   filas/s   pico MB")
+    for certificados in args.certificados:
+        request = emision_request(certificados, int(certificados * args.asegurados))
+        filas = certificados + len(request.aseguradosAdicionales or ())
+        for name, copy_threshold, reenvio in modos:
+            settings.EMISION_COPY_THRESHOLD = copy_threshold
+            seconds, peak_mb = measure(request, reenvio, args.memoria)
+            print(
+                f"{certificados:>12}  {name:<8} {seconds:10.2f} "
+                f"{filas / seconds:9.0f} {peak_mb:9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
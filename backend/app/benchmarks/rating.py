@@ -0,0 +1,76 @@
+"""
+Motor de tarificación vectorizado contra el cálculo cobertura por cobertura.
+
+Uso, desde ./backend:
+
+    python -m app.benchmarks.rating
+
+No necesita base de datos: compara ``app.services.rating.rate`` con el ciclo
+que usaba ``CotizacionAssembler`` sobre 1k, 100k y 1M coberturas.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.rating import rate
+
+COBERTURAS_POR_DET_SOLICITUD = 10
+DET_SOLICITUDES_POR_COTIZACION = 50
+
+
+def _per_object_loop(cotizaciones: list[list[list[float]]]) -> list[float]:
+    totales = []
+    for cotizacion in cotizaciones:
+        total = 0.0
+        for det_solicitud in cotizacion:
+            for prima in det_solicitud:
+                iva = prima * 0.16
+                total += prima + iva
+        totales.append(total)
+    return totales
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        primas = rng.uniform(100, 5000, size=size)
+        det_solicitud_index = np.arange(size) // COBERTURAS_POR_DET_SOLICITUD
+        det_solicitudes = int(det_solicitud_index[-1]) + 1
+        cotizacion_index = np.arange(det_solicitudes) // DET_SOLICITUDES_POR_COTIZACION
+        per_cotizacion = COBERTURAS_POR_DET_SOLICITUD * DET_SOLICITUDES_POR_COTIZACION
+        nested = [
+            [
+                primas[det : det + COBERTURAS_POR_DET_SOLICITUD].tolist()
+                for det in range(
+                    cot,
+                    min(cot + per_cotizacion, size),
+                    COBERTURAS_POR_DET_SOLICITUD,
+                )
+            ]
+            for cot in range(0, size, per_cotizacion)
+        ]
+
+        start = time.perf_counter()
+        _per_object_loop(nested)
+        loop_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        rate(primas, det_solicitud_index, cotizacion_index, iva_rate=0.16)
+        vectorized_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"{size:>9} coberturas  loop {loop_ms:9.2f} ms  "
+            f"vectorizado {vectorized_ms:8.2f} ms  x{loop_ms / vectorized_ms:6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
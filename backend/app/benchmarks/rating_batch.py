@@ -0,0 +1,62 @@
+"""
+Throughput de POST /cotizaciones/batch según el número de procesos de tarificación.
+
+Uso, desde ./backend:
+
+    python -m app.benchmarks.rating_batch --items 20000 --workers 1 2 4 8
+
+No necesita base de datos: mide ``rate_batch`` sobre cotizaciones objeto
+sintéticas con el mismo pool de procesos (spawn) que usa el servidor.
+"""
+
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.services.rating import rate_batch
+
+
+def _items(count: int, det_solicitudes: int, coberturas: int) -> list:
+    rng = np.random.default_rng(0)
+    return [
+        [rng.uniform(100, 5000, size=(det_solicitudes, coberturas)).tolist()]
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--det-solicitudes", type=int, default=20)
+    parser.add_argument("--coberturas", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    items = _items(args.items, args.det_solicitudes, args.coberturas)
+    for workers in args.workers:
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            # Arranca los procesos antes de medir.
+            rate_batch(
+                items[: args.chunk_size * workers], executor, chunk_size=args.chunk_size
+            )
+        start = time.perf_counter()
+        rate_batch(items, executor, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        if executor:
+            executor.shutdown()
+        print(
+            f"{workers:>2} procesos  {elapsed * 1000:9.1f} ms  "
+            f"{args.items / elapsed:10.0f} cotizaciones/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Datos sintéticos para los benchmarks.
+
+Los árboles de cotización se insertan por nivel con INSERT multi-fila para que
+sembrar cientos de miles de filas tome segundos y no minutos.
+"""
+
+import uuid
+from datetime import date
+from typing import List
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.models import (
+    Cobertura,
+    Convenio,
+    Cotizacion,
+    CotizacionObjeto,
+    DetSolicitud,
+    Distribuidor,
+    Sucursal,
+)
+
+BATCH_SIZE = 5_000
+
+
+def _insert_returning_ids(session: Session, model, rows: List[dict]) -> List[int]:
+    ids: List[int] = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        result = session.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows[start : start + BATCH_SIZE],
+        )
+        ids.extend(result.scalars().all())
+    return ids
+
+
+def seed_cotizaciones(
+    session: Session, objetos: int, det_solicitudes: int = 1, coberturas: int = 1
+) -> List[int]:
+    """
+    Inserta ``objetos`` cotizaciones objeto, cada una con una cotización de
+    ``det_solicitudes`` × ``coberturas`` y devuelve sus ids.
+    """
+    convenio = Convenio(id=uuid.uuid4(), name="benchmark")
+    sucursal = Sucursal(clave=f"bench-{uuid.uuid4().hex[:8]}", nombre="benchmark")
+    distribuidor = Distribuidor(
+        clave=f"bench-{uuid.uuid4().hex[:8]}",
+        nombre="benchmark",
+        email="benchmark@example.com",
+    )
+    session.add_all([convenio, sucursal, distribuidor])
+    session.flush()
+
+    objeto_ids = _insert_returning_ids(
+        session,
+        CotizacionObjeto,
+        [
+            {
+                "convenio_id": convenio.id,
+                "sucursal_id": sucursal.id,
+                "distribuidor_id": distribuidor.id,
+            }
+            for _ in range(objetos)
+        ],
+    )
+    cotizacion_ids = _insert_returning_ids(
+        session,
+        Cotizacion,
+        [
+            {"plan_comercial": "benchmark", "cotizacion_objeto_id": objeto_id}
+            for objeto_id in objeto_ids
+        ],
+    )
+    det_solicitud_ids = _insert_returning_ids(
+        session,
+        DetSolicitud,
+        [
+            {
+                "plan": "2208",
+                "renovacion": 0,
+                "tipo": "P",
+                "paquete": "1",
+                "fecha_nacimiento": date(2000, 2, 1),
+                "ini_vig_reportada": date(2023, 5, 15),
+                "fin_vig_reportada": date(2024, 5, 15),
+                "plazo_reportado": 1,
+                "tipo_vig": 1,
+                "sum_aseg_4": 300000.0,
+                "cotizacion_id": cotizacion_id,
+            }
+            for cotizacion_id in cotizacion_ids
+            for _ in range(det_solicitudes)
+        ],
+    )
+    cobertura_rows = [
+        {
+            "clave_cobertura": f"COB.{n}",
+            "prima": 1000.0,
+            "det_solicitud_id": det_solicitud_id,
+        }
+        for det_solicitud_id in det_solicitud_ids
+        for n in range(coberturas)
+    ]
+    for start in range(0, len(cobertura_rows), BATCH_SIZE):
+        session.execute(insert(Cobertura), cobertura_rows[start : start + BATCH_SIZE])
+    session.commit()
+    return objeto_ids
@@ -0,0 +1,82 @@
+import argparse
+import csv
+import logging
+from datetime import date
+
+from app.services.tarifas import Tarifa
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("plan", "paquete", "clave_cobertura", "edad_desde", "suma_desde", "prima")
+
+
+def compile_tariff(
+    source: str,
+    output: str,
+    vigente_desde: date,
+    vigente_hasta: date | None = None,
+) -> Tarifa:
+    with open(source, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = set(COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+        tarifa = Tarifa.from_rows(
+            (
+                (
+                    row["plan"],
+                    row["paquete"],
+                    row["clave_cobertura"],
+                    int(row["edad_desde"]),
+                    float(row["suma_desde"]),
+                    float(row["prima"]),
+                )
+                for row in reader
+            ),
+            vigente_desde,
+            vigente_hasta,
+        )
+    tarifa.save(output)
+    return tarifa
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compile a tariff CSV into the memory-mapped format read by "
+        "the API (TARIFF_PATH)"
+    )
+    parser.add_argument("source", help=f"CSV with columns {', '.join(COLUMNS)}")
+    parser.add_argument(
+        "output",
+        help="new version directory, e.g. $TARIFF_PATH/2026-01; running workers "
+        "pick it up on their next reload",
+    )
+    parser.add_argument(
+        "--vigente-desde",
+        type=date.fromisoformat,
+        required=True,
+        help="first ini_vig_reportada rated with this version",
+    )
+    parser.add_argument(
+        "--vigente-hasta",
+        type=date.fromisoformat,
+        help="exclusive end date; by default the version applies until the next one",
+    )
+    args = parser.parse_args()
+
+    tarifa = compile_tariff(
+        args.source, args.output, args.vigente_desde, args.vigente_hasta
+    )
+    logger.info(
+        "Compiled %d coverages x %d age bands x %d sum bands (%.1f MB) into %s",
+        len(tarifa.claves),
+        len(tarifa.edades),
+        len(tarifa.sumas),
+        tarifa.primas.nbytes / 1e6,
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
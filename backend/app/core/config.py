@@ -97,6 +97,53 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
+    # Tasa de IVA aplicada por el motor de tarificación
+    IVA_RATE: float = 0.16
+    # Procesos para tarificar lotes en POST /cotizaciones/batch; con 1 se
+    # tarifica en el proceso del servidor
+    RATING_POOL_WORKERS: int = os.cpu_count() or 1
+
+    # Caché en proceso de sucursales y distribuidores por clave
+    CATALOG_CACHE_MAXSIZE: int = 1024
+    CATALOG_CACHE_TTL_SECONDS: float = 300
+
+    # Conteos exactos reutilizados por los listados con count_mode=cached
+    COUNT_CACHE_MAXSIZE: int = 1024
+    COUNT_CACHE_TTL_SECONDS: float = 30
+
+    # Origen de GET /cotizaciones: columnas sueltas, el snapshot JSONB o el
+    # JSON armado por Postgres con json_agg
+    COTIZACIONES_READ_PATH: Literal["projection", "snapshot", "json_agg"] = "snapshot"
+
+    # Directorio con una subcarpeta por versión de la tarifa, compiladas con
+    # app/compile_tariff.py; sin él se usan las primas que envía el cliente
+    TARIFF_PATH: str | None = None
+    # Cada cuánto cada worker busca versiones nuevas en TARIFF_PATH (0 apaga
+    # la recarga en caliente)
+    TARIFF_RELOAD_INTERVAL_SECONDS: float = 30
+
+    # Recargo compuesto de la prima por cada año de edad en las simulaciones
+    SIMULATION_AGE_LOADING: float = 0.03
+
+    # Las rutas async usan el engine async (psycopg) en lugar de ejecutar la
+    # sesión síncrona en el threadpool
+    ASYNC_DATABASE: bool = False
+
+    # Desde cuántos certificados una emisión se inserta con COPY en lugar de
+    # un objeto ORM por fila
+    EMISION_COPY_THRESHOLD: int = 1000
+    # Certificados por transacción en app/emision_worker.py; el avance del
+    # trabajo se guarda con cada lote
+    EMISION_JOB_CHUNK_SIZE: int = 5000
+    # Espera del worker cuando la cola está vacía
+    EMISION_JOB_POLL_SECONDS: float = 1
+    # Un trabajo en "procesando" sin avance por este tiempo se da por
+    # abandonado (worker caído) y otro worker lo retoma donde quedó
+    EMISION_JOB_STALE_SECONDS: float = 300
+
+    # Cada cuánto app/refresh_reports.py refresca las vistas de reportes
+    REPORTS_REFRESH_INTERVAL_SECONDS: float = 300
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def emails_enabled(self) -> bool:
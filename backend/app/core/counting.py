@@ -0,0 +1,72 @@
+from enum import Enum
+from typing import Any
+
+from sqlalchemy.sql import Select
+from sqlmodel import Session, func, select
+
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+
+
+class CountMode(str, Enum):
+    """
+    How a paginated listing computes its total.
+
+    ``exact`` runs ``count(*)``, ``cached`` reuses an exact count for
+    ``COUNT_CACHE_TTL_SECONDS``, ``estimated`` takes the planner's row
+    estimate and ``none`` skips the total.
+    """
+
+    exact = "exact"
+    cached = "cached"
+    estimated = "estimated"
+    none = "none"
+
+
+count_cache = TTLCache(
+    maxsize=settings.COUNT_CACHE_MAXSIZE, ttl=settings.COUNT_CACHE_TTL_SECONDS
+)
+
+
+def _exact_count(session: Session, statement: Select) -> int:
+    count_statement = select(func.count()).select_from(
+        statement.order_by(None).subquery()
+    )
+    return session.exec(count_statement).one()
+
+
+def _estimated_count(session: Session, statement: Select) -> int:
+    # EXPLAIN does not run the query; the top node's "Plan Rows" comes from
+    # pg_class.reltuples and the column statistics, so it also accounts for
+    # the WHERE clause.
+    connection = session.connection()
+    compiled = statement.compile(
+        connection, compile_kwargs={"render_postcompile": True}
+    )
+    [[plan]] = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).all()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(session: Session, statement: Select, mode: CountMode) -> int | None:
+    """
+    Count the rows ``statement`` would return (without limit/offset) using
+    ``mode``; ``None`` when ``mode`` is ``none``.
+    """
+    if mode is CountMode.none:
+        return None
+    if mode is CountMode.estimated:
+        return _estimated_count(session, statement)
+    if mode is CountMode.exact:
+        return _exact_count(session, statement)
+
+    compiled = statement.compile(
+        session.connection(), compile_kwargs={"render_postcompile": True}
+    )
+    key: Any = (str(compiled), repr(sorted(compiled.params.items())))
+    count = count_cache.get(key)
+    if count is MISSING:
+        count = _exact_count(session, statement)
+        count_cache.set(key, count)
+    return count
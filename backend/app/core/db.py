@@ -1,10 +1,21 @@
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# The triggers that keep detsolicitud's prima aggregates current (migration
+# 37d010b817d0) read the IVA rate from this setting, so the database and the
+# rating engine always use the same rate.
+CONNECT_ARGS = {"options": f"-c app.iva_rate={settings.IVA_RATE}"}
+
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), connect_args=CONNECT_ARGS)
+# Only used when ASYNC_DATABASE is enabled; psycopg picks its async driver
+# from the same URL.
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), connect_args=CONNECT_ARGS
+)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,59 @@
+import argparse
+import logging
+import time
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.services.emision import procesar_emision_job, reclamar_emision_job
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def process_next() -> bool:
+    """Process one queued emision job; returns False when the queue is empty."""
+    with Session(engine) as session:
+        job = reclamar_emision_job(session)
+        if job is None:
+            return False
+        job_id, total = job.id, job.total_certificados
+        started = time.monotonic()
+        try:
+            procesar_emision_job(session, job)
+            logger.info(
+                "Emision job %s: %d certificados in %.1fs",
+                job_id,
+                total,
+                time.monotonic() - started,
+            )
+        except Exception:
+            logger.exception("Emision job %s failed", job_id)
+        return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Insert the emisiones queued with POST /emision?asincrona=true"
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="drain the queue once and exit"
+    )
+    args = parser.parse_args()
+
+    while True:
+        try:
+            if process_next():
+                continue
+        except Exception:
+            if args.once:
+                raise
+            logger.exception("Could not read the emision queue")
+        if args.once:
+            break
+        time.sleep(settings.EMISION_JOB_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
+from datetime import date, datetime, timezone
 from typing import List, Optional
 import uuid
 
 from pydantic import EmailStr
+from sqlalchemy import JSON, Column, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -54,7 +57,7 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None
 
 
 # Shared properties
@@ -78,7 +81,7 @@ class Item(ItemBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str = Field(max_length=255)
     owner_id: uuid.UUID = Field(
-        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+        foreign_key="user.id", nullable=False, ondelete="CASCADE", index=True
     )
     owner: User | None = Relationship(back_populates="items")
 
@@ -91,7 +94,7 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    count: int | None
 
 
 # Generic message
@@ -124,14 +127,14 @@ class Convenio(SQLModel, table=True):
 
 class Sucursal(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    clave: str
+    clave: str = Field(index=True)
     nombre: str
     cotizaciones: List["CotizacionObjeto"] = Relationship(back_populates="sucursal")
 
 
 class Distribuidor(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    clave: str
+    clave: str = Field(index=True)
     nombre: str
     email: str
     cotizaciones: List["CotizacionObjeto"] = Relationship(back_populates="distribuidor")
@@ -141,38 +144,76 @@ class Cobertura(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
     clave_cobertura: str
     prima: float
-    det_solicitud_id: int = Field(foreign_key="detsolicitud.id")
+    det_solicitud_id: int = Field(foreign_key="detsolicitud.id", index=True)
     det_solicitud: "DetSolicitud" = Relationship(back_populates="coberturas")
 
 
 class DetSolicitud(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_detsolicitud_plan_paquete_ini_vig_reportada",
+            "plan",
+            "paquete",
+            "ini_vig_reportada",
+            postgresql_include=["cotizacion_id"],
+        ),
+    )
+
     id: int = Field(default=None, primary_key=True)
     plan: str
     renovacion: int
     tipo: str
     paquete: str
-    fecha_nacimiento: Optional[str] = None
-    ini_vig_reportada: str
-    fin_vig_reportada: Optional[str] = None
+    fecha_nacimiento: Optional[date] = None
+    ini_vig_reportada: date = Field(index=True)
+    fin_vig_reportada: Optional[date] = None
     plazo_reportado: int
     tipo_vig: int
     sum_aseg_4: float
     sum_aseg_5: Optional[float] = None
     sum_aseg_6: Optional[float] = None
-    cotizacion_id: int = Field(foreign_key="cotizacion.id")
+    prima_neta: float = 0.0
+    iva_total: float = 0.0
+    prima_total: float = 0.0
+    cotizacion_id: int = Field(foreign_key="cotizacion.id", index=True)
     cotizacion: "Cotizacion" = Relationship(back_populates="det_solicitudes")
     coberturas: List[Cobertura] = Relationship(back_populates="det_solicitud")
 
 
 class Cotizacion(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_cotizacion_plan_comercial_cotizacion_objeto_id",
+            "plan_comercial",
+            "cotizacion_objeto_id",
+        ),
+    )
+
     id: int = Field(default=None, primary_key=True)
     plan_comercial: str
-    cotizacion_objeto_id: int = Field(foreign_key="cotizacionobjeto.id")
+    prima_neta: float = 0.0
+    iva_total: float = 0.0
+    prima_total: float = 0.0
+    cotizacion_objeto_id: int = Field(foreign_key="cotizacionobjeto.id", index=True)
     cotizacion_objeto: "CotizacionObjeto" = Relationship(back_populates="cotizaciones")
     det_solicitudes: List[DetSolicitud] = Relationship(back_populates="cotizacion")
 
 
 class CotizacionObjeto(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_cotizacionobjeto_convenio_id_sucursal_id_distribuidor_id",
+            "convenio_id",
+            "sucursal_id",
+            "distribuidor_id",
+        ),
+        Index(
+            "ix_cotizacionobjeto_distribuidor_id_sucursal_id",
+            "distribuidor_id",
+            "sucursal_id",
+        ),
+    )
+
     id: int = Field(default=None, primary_key=True)
     convenio_id: uuid.UUID = Field(foreign_key="convenio.id")
     convenio: Convenio = Relationship(back_populates="cotizaciones")
@@ -180,10 +221,37 @@ class CotizacionObjeto(SQLModel, table=True):
     sucursal: Sucursal = Relationship(back_populates="cotizaciones")
     distribuidor_id: int = Field(foreign_key="distribuidor.id")
     distribuidor: Distribuidor = Relationship(back_populates="cotizaciones")
+    # CotizacionObjetoRead serializado; los triggers de la migración
+    # f4b1e07c93d2 lo ponen en NULL cuando cambia algún hijo.
+    snapshot: Optional[dict] = Field(
+        default=None, sa_column=Column(JSON().with_variant(JSONB(), "postgresql"))
+    )
     cotizaciones: List[Cotizacion] = Relationship(back_populates="cotizacion_objeto")
 
 
+class CertificadoCobertura(SQLModel, table=True):
+    id: int = Field(default=None, primary_key=True)
+    clave_cobertura: str
+    prima_neta: float
+    iva_total: float
+    prima_total: float
+    certificado_id: uuid.UUID = Field(foreign_key="certificadodetalle.id", index=True)
+    certificado: "CertificadoDetalle" = Relationship(back_populates="coberturas")
+
+
 class CertificadoDetalle(SQLModel, table=True):
+    __table_args__ = (
+        # Un convenio no emite dos veces a la misma persona; los reenvíos
+        # insertan con ON CONFLICT DO NOTHING sobre este índice
+        Index(
+            "ix_certificadodetalle_id_convenio_identificacion",
+            "id_convenio",
+            "tipo_identificacion",
+            "numero_identificacion",
+            unique=True,
+        ),
+    )
+
     id: Optional[uuid.UUID] = Field(default_factory=uuid.uuid4, primary_key=True)
     tipo: str
     tipo_identificacion: str
@@ -196,8 +264,26 @@ class CertificadoDetalle(SQLModel, table=True):
     data_adicional2: Optional[str] = None
     etiqueta_adicional3: Optional[str] = None
     data_adicional3: Optional[str] = None
-    emision_id: Optional[uuid.UUID] = Field(default=None, foreign_key="emision.id")
+    emision_id: Optional[uuid.UUID] = Field(
+        default=None, foreign_key="emision.id", index=True
+    )
     emision: "Emision" = Relationship(back_populates="certificados")
+    # Copia de emision.id_convenio para el índice único; NULL en los
+    # duplicados que ya existían al crear el índice
+    id_convenio: Optional[uuid.UUID] = None
+    # Copiados de la det_solicitud cuando la emisión viene de una cotización
+    # (POST /emision/from-cotizacion/{id}); vacíos en las demás emisiones
+    det_solicitud_id: Optional[int] = Field(
+        default=None, foreign_key="detsolicitud.id", ondelete="SET NULL"
+    )
+    plan: Optional[str] = None
+    paquete: Optional[str] = None
+    ini_vig: Optional[date] = None
+    fin_vig: Optional[date] = None
+    prima_neta: Optional[float] = None
+    iva_total: Optional[float] = None
+    prima_total: Optional[float] = None
+    coberturas: List[CertificadoCobertura] = Relationship(back_populates="certificado")
 
 
 class AseguradosAdicionales(SQLModel, table=True):
@@ -209,7 +295,9 @@ class AseguradosAdicionales(SQLModel, table=True):
     fecha_nacimiento: Optional[str] = None
     sexo: Optional[str] = None
     edad: Optional[int] = None
-    emision_id: Optional[uuid.UUID] = Field(default=None, foreign_key="emision.id")
+    emision_id: Optional[uuid.UUID] = Field(
+        default=None, foreign_key="emision.id", index=True
+    )
     emision: "Emision" = Relationship(back_populates="asegurados_adicionales")
 
 
@@ -227,6 +315,47 @@ class Emision(SQLModel, table=True):
     )
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class EmisionJob(SQLModel, table=True):
+    """
+    Emisión recibida con ``asincrona=true``, pendiente de que
+    app/emision_worker.py la inserte por lotes.
+    """
+
+    __table_args__ = (
+        # La cola: el worker solo recorre los trabajos sin terminar
+        Index(
+            "ix_emisionjob_creado_en_sin_terminar",
+            "creado_en",
+            postgresql_where=text("estado IN ('pendiente', 'procesando')"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # pendiente -> procesando -> completada | error
+    estado: str = "pendiente"
+    # EmisionRequest validado, tal como lo recibió POST /emision
+    payload: dict = Field(
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    )
+    total_certificados: int
+    certificados_procesados: int = 0
+    # Certificados que el convenio ya tenía y no se volvieron a insertar
+    certificados_duplicados: int = 0
+    intentos: int = 0
+    error: Optional[str] = None
+    emision_id: Optional[uuid.UUID] = Field(default=None, foreign_key="emision.id")
+    creado_en: datetime = Field(
+        default_factory=_utcnow, sa_type=DateTime(timezone=True)
+    )
+    actualizado_en: datetime = Field(
+        default_factory=_utcnow, sa_type=DateTime(timezone=True)
+    )
+
+
 class Plan(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     nombre: str
@@ -0,0 +1,40 @@
+import argparse
+import logging
+import time
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.services.reportes import refresh_reportes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def refresh() -> None:
+    with Session(engine) as session:
+        refresh_reportes(session)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh the reporting views")
+    parser.add_argument("--once", action="store_true", help="refresh once and exit")
+    args = parser.parse_args()
+
+    while True:
+        started = time.monotonic()
+        try:
+            refresh()
+            logger.info("Reports refreshed in %.1fs", time.monotonic() - started)
+        except Exception:
+            if args.once:
+                raise
+            logger.exception("Reports refresh failed")
+        if args.once:
+            break
+        time.sleep(settings.REPORTS_REFRESH_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
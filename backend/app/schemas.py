@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from datetime import date, datetime
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from uuid import UUID
 
@@ -28,9 +29,9 @@ class DetSolicitudCreate(BaseModel):
     renovacion: int
     tipo: str
     paquete: str
-    fecha_nacimiento: Optional[str]
-    ini_vig_reportada: str
-    fin_vig_reportada: Optional[str]
+    fecha_nacimiento: Optional[date]
+    ini_vig_reportada: date
+    fin_vig_reportada: Optional[date]
     plazo_reportado: int
     tipo_vig: int
     sum_aseg_4: float
@@ -67,9 +68,9 @@ class DetSolicitudRead(BaseModel):
     renovacion: int
     tipo: str
     paquete: str
-    fecha_nacimiento: Optional[str]
-    ini_vig_reportada: str
-    fin_vig_reportada: Optional[str]
+    fecha_nacimiento: Optional[date]
+    ini_vig_reportada: date
+    fin_vig_reportada: Optional[date]
     plazo_reportado: int
     tipo_vig: int
     sum_aseg_4: float
@@ -103,6 +104,20 @@ class CotizacionResponse(BaseModel):
     es_dato_valido: bool
 
 
+class CotizacionPrimasRead(BaseModel):
+    plan_comercial: str
+    prima_neta: float
+    iva_notal: float
+    prima_total: float
+
+
+class CotizacionBatchResult(BaseModel):
+    index: int
+    es_dato_valido: bool
+    message_error: Optional[str] = None
+    cotizaciones: List[CotizacionPrimasRead] = []
+
+
 class CertificadoDetalle(BaseModel):
     tipo: str
     tipoIdentificacion: str
@@ -138,7 +153,49 @@ class EmisionRequest(BaseModel):
     aseguradosAdicionales: Optional[List[AseguradosAdicionales]]
 
 
+class EmisionDesdeCotizacionRequest(BaseModel):
+    # Un certificado por det_solicitud de la cotización, en orden de id
+    certificados: List[CertificadoDetalle] = Field(min_length=1)
+    aseguradosAdicionales: Optional[List[AseguradosAdicionales]] = None
+
+
+class CertificadoRead(CertificadoDetalle):
+    identificador: UUID
+
+
+class AseguradoAdicionalRead(AseguradosAdicionales):
+    identificador: UUID
+
+
+class EmisionRead(BaseModel):
+    identificador: UUID
+    idConvenio: UUID
+    sucClave: str
+    sucNombre: str
+    distribuidorClave: str
+    distribuidorNombre: str
+    distribuidorEmail: str
+    # Solo con include=certificados / include=asegurados; None si no se pidió
+    certificados: Optional[List[CertificadoRead]] = None
+    aseguradosAdicionales: Optional[List[AseguradoAdicionalRead]] = None
+
+
+class EmisionJobRead(BaseModel):
+    id: UUID
+    estado: str
+    total_certificados: int
+    certificados_procesados: int
+    certificados_duplicados: int
+    intentos: int
+    error: Optional[str]
+    # Se asigna con el primer lote; los certificados se consultan con ella
+    emision_id: Optional[UUID]
+    creado_en: datetime
+    actualizado_en: datetime
+
+
 class CoberturaResponse(BaseModel):
+    claveCobertura: Optional[str] = None
     primaNeta: float
     ivaTotal: float
     primaTotal: float
@@ -146,6 +203,9 @@ class CoberturaResponse(BaseModel):
 
 class CertificadoResponse(BaseModel):
     identificador: str
+    # "nuevo", o "duplicado" si el convenio ya tenía un certificado con esa
+    # identificación (el identificador es entonces el del existente)
+    estado: str = "nuevo"
     primaNeta: float
     ivaTotal: float
     primaTotal: float
@@ -166,6 +226,8 @@ class EmisionResponse(BaseModel):
     distribuidorClave: str
     distribuidorNombre: str
     distribuidorEmail: str
+    certificadosNuevos: int = 0
+    certificadosDuplicados: int = 0
     certificados: List[CertificadoResponse]
 
 
@@ -189,6 +251,71 @@ class PlanRead(PlanBase):
     id: UUID
 
 
+class CotizacionFilterParams(BaseModel):
+    convenio_id: Optional[UUID] = None
+    suc_clave: Optional[str] = None
+    distribuidor_clave: Optional[str] = None
+    plan_comercial: Optional[str] = None
+    plan: Optional[str] = None
+    paquete: Optional[str] = None
+    vigencia_desde: Optional[date] = None
+    vigencia_hasta: Optional[date] = None
+
+
+class ReportePrimasFilterParams(BaseModel):
+    suc_clave: Optional[str] = None
+    distribuidor_clave: Optional[str] = None
+    desde: Optional[date] = None
+    hasta: Optional[date] = None
+
+
+class ReportePrimasRead(BaseModel):
+    suc_clave: Optional[str] = None
+    suc_nombre: Optional[str] = None
+    distribuidor_clave: Optional[str] = None
+    distribuidor_nombre: Optional[str] = None
+    mes: Optional[date] = None
+    coberturas: int
+    prima_neta: float
+    iva_total: float
+    prima_total: float
+
+
+class SimulacionCreate(BaseModel):
+    det_solicitud: DetSolicitudCreate
+    sum_aseg_4: List[float] = Field(min_length=1, max_length=1000)
+    edades: List[int] = Field(min_length=1, max_length=1000)
+
+
+class SimulacionRead(BaseModel):
+    sum_aseg_4: List[float]
+    edades: List[int]
+    # Filas por suma asegurada, columnas por edad
+    prima_neta: List[List[float]]
+    iva_total: List[List[float]]
+    prima_total: List[List[float]]
+
+
+class TarifaVersionRead(BaseModel):
+    version: str
+    vigente_desde: date
+    vigente_hasta: Optional[date]
+    coberturas: int
+    bandas_edad: int
+    bandas_suma: int
+    # Tamaño del arreglo mapeado; lo comparten todos los workers del host
+    bytes: int
+
+
+class TarifasRead(BaseModel):
+    # Versión que tarifica hoy las cotizaciones que empiezan hoy
+    version_activa: Optional[str]
+    cargada_en: datetime
+    segundos_carga: float
+    bytes: int
+    versiones: List[TarifaVersionRead]
+
+
 class PaginationParams(BaseModel):
     page: int = 1
     limit: int = 10
@@ -1,43 +1,129 @@
-from typing import List
-from sqlalchemy import UUID
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import (
+    UUID,
+    Text,
+    bindparam,
+    cast,
+    event,
+    func,
+    insert,
+    literal_column,
+    null,
+    true,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlmodel import Session, select
 from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
 
+from app.core.cache import MISSING, TTLCache
+from app.core.config import settings
+from app.core.counting import CountMode, count_rows
+from app.core.db import engine
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models import (
+    Cobertura,
+    Convenio,
     DetSolicitud,
     Sucursal,
     Distribuidor,
     CotizacionObjeto,
     Cotizacion,
 )
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import defer, joinedload, selectinload
 
+from app.services.rating import (
+    Primas,
+    get_rating_pool,
+    rate_batch,
+    rate_tree,
+    simulate,
+    with_iva,
+)
+from app.services.tarifas import get_tarifas
 from app.schemas import (
+    CotizacionBatchResult,
+    CotizacionFilterParams,
+    CotizacionObjetoCreate,
     CotizacionObjetoRead,
+    CotizacionPrimasRead,
     CotizacionRead,
     CotizacionResponse,
+    DetSolicitudCreate,
     DetSolicitudRead,
+    SimulacionCreate,
+    SimulacionRead,
 )
 
 
+# Sucursales y distribuidores cambian muy poco; se guardan por clave, incluidas
+# las claves inexistentes (como None), y se invalidan al confirmar cualquier
+# escritura sobre esas tablas.
+sucursal_cache = TTLCache(
+    maxsize=settings.CATALOG_CACHE_MAXSIZE, ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+distribuidor_cache = TTLCache(
+    maxsize=settings.CATALOG_CACHE_MAXSIZE, ttl=settings.CATALOG_CACHE_TTL_SECONDS
+)
+_CATALOG_CACHES = {Sucursal: sucursal_cache, Distribuidor: distribuidor_cache}
+
+
+def invalidate_catalog_cache() -> None:
+    """
+    Vacía la caché de catálogos; necesario tras escrituras fuera del ORM.
+    """
+    for cache in _CATALOG_CACHES.values():
+        cache.invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_catalog_writes(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if type(obj) in _CATALOG_CACHES:
+            session.info.setdefault("catalog_writes", set()).add(type(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_catalog_writes(session: Session) -> None:
+    for model in session.info.pop("catalog_writes", ()):
+        _CATALOG_CACHES[model].invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_writes(session: Session) -> None:
+    session.info.pop("catalog_writes", None)
+
+
 class SucursalService:
     @staticmethod
     def get_sucursal_by_clave(db: Session, suc_clave: str) -> Sucursal:
-        sucursal = db.exec(select(Sucursal).where(Sucursal.clave == suc_clave)).first()
-        if not sucursal:
+        data = sucursal_cache.get(suc_clave)
+        if data is MISSING:
+            sucursal = db.exec(
+                select(Sucursal).where(Sucursal.clave == suc_clave)
+            ).first()
+            data = sucursal.model_dump() if sucursal else None
+            sucursal_cache.set(suc_clave, data)
+        if data is None:
             raise HTTPException(status_code=404, detail="Sucursal no encontrada")
-        return sucursal
+        return Sucursal.model_validate(data)
 
 
 class DistribuidorService:
     @staticmethod
     def get_distribuidor_by_clave(db: Session, distribuidor_clave: str) -> Distribuidor:
-        distribuidor = db.exec(
-            select(Distribuidor).where(Distribuidor.clave == distribuidor_clave)
-        ).first()
-        if not distribuidor:
+        data = distribuidor_cache.get(distribuidor_clave)
+        if data is MISSING:
+            distribuidor = db.exec(
+                select(Distribuidor).where(Distribuidor.clave == distribuidor_clave)
+            ).first()
+            data = distribuidor.model_dump() if distribuidor else None
+            distribuidor_cache.set(distribuidor_clave, data)
+        if data is None:
             raise HTTPException(status_code=404, detail="Distribuidor no encontrado")
-        return distribuidor
+        return Distribuidor.model_validate(data)
 
 
 class CotizacionObjetoService:
@@ -68,108 +154,920 @@ class CotizacionObjetoService:
             )
         return cotizacion_objeto
 
+    @staticmethod
+    def create_cotizacion_objeto(
+        db: Session,
+        cotizacion_objeto_in: CotizacionObjetoCreate,
+        sucursal: Sucursal,
+        distribuidor: Distribuidor,
+    ) -> CotizacionObjeto:
+        # Cada nivel del árbol se escribe con un INSERT multi-fila con
+        # RETURNING (sort_by_parameter_order conserva el orden de entrada), en
+        # lugar de un flush del ORM por objeto.
+        if not db.get(Convenio, cotizacion_objeto_in.id_convenio):
+            raise HTTPException(status_code=404, detail="Convenio no encontrado")
+        _aplicar_tarifa(cotizacion_objeto_in)
+        _validate_coberturas(cotizacion_objeto_in)
+
+        # Los totales de prima de cotizacion y detsolicitud los mantienen los
+        # triggers de la migración 37d010b817d0 con cada escritura sobre
+        # cobertura; aquí se insertan ya calculados para armar el snapshot
+        # sin volver a leerlos.
+        rating = rate_tree(_primas_tree(cotizacion_objeto_in))
+
+        cotizacion_objeto_id = db.execute(
+            insert(CotizacionObjeto).returning(CotizacionObjeto.id),
+            {
+                "convenio_id": cotizacion_objeto_in.id_convenio,
+                "sucursal_id": sucursal.id,
+                "distribuidor_id": distribuidor.id,
+            },
+        ).scalar_one()
+
+        cotizacion_ids = _bulk_insert_returning_ids(
+            db,
+            Cotizacion,
+            [
+                {
+                    "plan_comercial": cotizacion.plan_comercial,
+                    "cotizacion_objeto_id": cotizacion_objeto_id,
+                    **_primas_row(rating.cotizaciones, position),
+                }
+                for position, cotizacion in enumerate(cotizacion_objeto_in.cotizaciones)
+            ],
+        )
+
+        det_solicitudes_in = [
+            (cotizacion_id, det_solicitud)
+            for cotizacion_id, cotizacion in zip(
+                cotizacion_ids, cotizacion_objeto_in.cotizaciones
+            )
+            for det_solicitud in cotizacion.det_solicitudes
+        ]
+        det_solicitud_ids = _bulk_insert_returning_ids(
+            db,
+            DetSolicitud,
+            [
+                {
+                    **det_solicitud.model_dump(exclude={"coberturas_prima_neta"}),
+                    "cotizacion_id": cotizacion_id,
+                    **_primas_row(rating.det_solicitudes, position),
+                }
+                for position, (cotizacion_id, det_solicitud) in enumerate(
+                    det_solicitudes_in
+                )
+            ],
+        )
+
+        coberturas = [
+            {
+                "clave_cobertura": cobertura.clave_cobertura,
+                "prima": cobertura.prima,
+                "det_solicitud_id": det_solicitud_id,
+            }
+            for det_solicitud_id, (_, det_solicitud) in zip(
+                det_solicitud_ids, det_solicitudes_in
+            )
+            for cobertura in det_solicitud.coberturas_prima_neta or []
+        ]
+        if coberturas:
+            db.execute(insert(Cobertura), coberturas)
+
+        # El snapshot se escribe después de los hijos: los triggers de
+        # invalidación corren al final de cada INSERT y lo dejarían en NULL.
+        snapshot = CotizacionObjetoRead.model_construct(
+            id_convenio=cotizacion_objeto_in.id_convenio,
+            suc_clave=sucursal.clave,
+            suc_nombre=sucursal.nombre,
+            distribuidor_clave=distribuidor.clave,
+            distribuidor_nombre=distribuidor.nombre,
+            distribuidor_email=distribuidor.email,
+            cotizaciones=[
+                CotizacionRead.model_construct(
+                    id=str(cotizacion_id),
+                    plan_comercial=cotizacion.plan_comercial,
+                    prima_neta=float(rating.cotizaciones.prima_neta[position]),
+                    iva_notal=float(rating.cotizaciones.iva[position]),
+                    prima_total=float(rating.cotizaciones.prima_total[position]),
+                    det_solicitudes=[],
+                )
+                for position, (cotizacion_id, cotizacion) in enumerate(
+                    zip(cotizacion_ids, cotizacion_objeto_in.cotizaciones)
+                )
+            ],
+        )
+        cotizaciones_read = {
+            cotizacion_read.id: cotizacion_read
+            for cotizacion_read in snapshot.cotizaciones
+        }
+        for det_solicitud_id, (cotizacion_id, det_solicitud) in zip(
+            det_solicitud_ids, det_solicitudes_in
+        ):
+            cotizaciones_read[str(cotizacion_id)].det_solicitudes.append(
+                DetSolicitudRead.model_construct(
+                    id=str(det_solicitud_id),
+                    coberturas=[],
+                    **det_solicitud.model_dump(
+                        include=set(_DET_SOLICITUD_READ_COLUMNS)
+                    ),
+                )
+            )
+        _store_snapshots(
+            db, {cotizacion_objeto_id: _COTIZACION_OBJETO_READ.dump_json(snapshot)}
+        )
+
+        db.commit()
+        return db.get(CotizacionObjeto, cotizacion_objeto_id)
+
 
 class CotizacionService:
     @staticmethod
     def get_cotizaciones_by_objeto_id(
         db: Session, cotizacion_objeto_id: int
     ) -> List[Cotizacion]:
-        return (
-            db.exec(
-                select(Cotizacion)
-                .where(Cotizacion.cotizacion_objeto_id == cotizacion_objeto_id)
-                .options(
-                    joinedload(Cotizacion.det_solicitudes).joinedload(
-                        DetSolicitud.coberturas
-                    )
+        return db.exec(
+            select(Cotizacion)
+            .where(Cotizacion.cotizacion_objeto_id == cotizacion_objeto_id)
+            .order_by(Cotizacion.id)
+            .options(
+                selectinload(Cotizacion.det_solicitudes).selectinload(
+                    DetSolicitud.coberturas
                 )
             )
-            .unique()
-            .all()
+        ).all()
+
+
+def _validate_det_solicitud_coberturas(det_solicitud: DetSolicitudCreate) -> None:
+    for cobertura in det_solicitud.coberturas_prima_neta or []:
+        if cobertura.clave_cobertura is None or cobertura.prima is None:
+            raise HTTPException(
+                status_code=422,
+                detail="Cobertura sin clave_cobertura o prima",
+            )
+
+
+def _validate_coberturas(cotizacion_objeto_in: CotizacionObjetoCreate) -> None:
+    for cotizacion in cotizacion_objeto_in.cotizaciones:
+        for det_solicitud in cotizacion.det_solicitudes:
+            _validate_det_solicitud_coberturas(det_solicitud)
+
+
+def _claves_cobertura(det_solicitud: DetSolicitudCreate) -> List[str]:
+    claves = [
+        cobertura.clave_cobertura
+        for cobertura in det_solicitud.coberturas_prima_neta or []
+    ]
+    if None in claves:
+        raise HTTPException(status_code=422, detail="Cobertura sin clave_cobertura")
+    return claves
+
+
+def _edad_al_inicio(det_solicitud: DetSolicitudCreate) -> int:
+    # Edad cumplida al inicio de vigencia
+    nacimiento = det_solicitud.fecha_nacimiento
+    if nacimiento is None:
+        raise HTTPException(
+            status_code=422, detail="Se requiere fecha_nacimiento para calcular la edad"
         )
+    inicio = det_solicitud.ini_vig_reportada
+    return (
+        inicio.year
+        - nacimiento.year
+        - ((inicio.month, inicio.day) < (nacimiento.month, nacimiento.day))
+    )
 
 
-def get_all_cotizaciones(
-    db: Session, page: int = 1, limit: int = 10
-) -> List[CotizacionResponse]:
-    offset = (page - 1) * limit
-    cotizaciones = (
-        db.exec(
-            select(CotizacionObjeto)
-            .options(
-                joinedload(CotizacionObjeto.cotizaciones),
-                joinedload(CotizacionObjeto.convenio),
-                joinedload(CotizacionObjeto.distribuidor),
-                joinedload(CotizacionObjeto.sucursal),
+def _aplicar_tarifa(cotizacion_objeto_in: CotizacionObjetoCreate) -> None:
+    # Con TARIFF_PATH la prima de cada cobertura sale de la versión de la
+    # tarifa vigente al inicio de vigencia y reemplaza la que envía el cliente.
+    tarifas = get_tarifas()
+    if tarifas is None:
+        return
+    for cotizacion in cotizacion_objeto_in.cotizaciones:
+        for det_solicitud in cotizacion.det_solicitudes:
+            coberturas = det_solicitud.coberturas_prima_neta or []
+            if not coberturas:
+                continue
+            tarifa = tarifas.para(det_solicitud.ini_vig_reportada)
+            primas = tarifa.lookup(
+                det_solicitud.plan,
+                det_solicitud.paquete,
+                _claves_cobertura(det_solicitud),
+                _edad_al_inicio(det_solicitud),
+                det_solicitud.sum_aseg_4,
             )
-            .offset(offset)
-            .limit(limit)
+            for cobertura, prima in zip(coberturas, primas.tolist()):
+                cobertura.prima = prima
+
+
+def _primas_tree(
+    cotizacion_objeto_in: CotizacionObjetoCreate,
+) -> List[List[List[float]]]:
+    return [
+        [
+            [cobertura.prima for cobertura in det_solicitud.coberturas_prima_neta or []]
+            for det_solicitud in cotizacion.det_solicitudes
+        ]
+        for cotizacion in cotizacion_objeto_in.cotizaciones
+    ]
+
+
+def _primas_row(primas: Primas, position: int) -> dict:
+    return {
+        "prima_neta": float(primas.prima_neta[position]),
+        "iva_total": float(primas.iva[position]),
+        "prima_total": float(primas.prima_total[position]),
+    }
+
+
+def _bulk_insert_returning_ids(db: Session, model, rows: List[dict]) -> List[int]:
+    if not rows:
+        return []
+    return (
+        db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True), rows
         )
-        .unique()
+        .scalars()
         .all()
     )
 
-    if not cotizaciones:
+
+def _decode_cotizacion_objeto_cursor(cursor: str) -> int:
+    try:
+        return int(decode_cursor(cursor))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+# Las relaciones muchos-a-uno van en el mismo JOIN; las colecciones se cargan
+# con selectinload (una consulta IN por nivel), así el LIMIT aplica a
+# cotizaciones objeto y no a filas del producto cartesiano.
+_LISTING_OPTIONS = (
+    defer(CotizacionObjeto.snapshot),
+    joinedload(CotizacionObjeto.convenio),
+    joinedload(CotizacionObjeto.distribuidor),
+    joinedload(CotizacionObjeto.sucursal),
+    selectinload(CotizacionObjeto.cotizaciones).selectinload(
+        Cotizacion.det_solicitudes
+    ),
+)
+
+
+def _build_cotizacion_objeto_read(cotizacion: CotizacionObjeto) -> CotizacionObjetoRead:
+    return CotizacionObjetoRead(
+        id_convenio=cotizacion.convenio_id,
+        suc_clave=cotizacion.sucursal.clave if cotizacion.sucursal else None,
+        suc_nombre=cotizacion.sucursal.nombre if cotizacion.sucursal else None,
+        distribuidor_clave=(
+            cotizacion.distribuidor.clave if cotizacion.distribuidor else None
+        ),
+        distribuidor_nombre=(
+            cotizacion.distribuidor.nombre if cotizacion.distribuidor else None
+        ),
+        distribuidor_email=(
+            cotizacion.distribuidor.email if cotizacion.distribuidor else None
+        ),
+        cotizaciones=[
+            CotizacionRead(
+                id=str(cot_det.id),
+                plan_comercial=cot_det.plan_comercial,
+                prima_neta=cot_det.prima_neta,
+                iva_notal=cot_det.iva_total,
+                prima_total=cot_det.prima_total,
+                det_solicitudes=[
+                    DetSolicitudRead(
+                        id=str(det_solicitud.id),
+                        plan=det_solicitud.plan,
+                        renovacion=det_solicitud.renovacion,
+                        tipo=det_solicitud.tipo,
+                        paquete=det_solicitud.paquete,
+                        fecha_nacimiento=det_solicitud.fecha_nacimiento,
+                        ini_vig_reportada=det_solicitud.ini_vig_reportada,
+                        fin_vig_reportada=det_solicitud.fin_vig_reportada,
+                        plazo_reportado=det_solicitud.plazo_reportado,
+                        tipo_vig=det_solicitud.tipo_vig,
+                        sum_aseg_4=det_solicitud.sum_aseg_4,
+                        sum_aseg_5=det_solicitud.sum_aseg_5,
+                        sum_aseg_6=det_solicitud.sum_aseg_6,
+                        coberturas=[],
+                    )
+                    for det_solicitud in cot_det.det_solicitudes
+                ],
+            )
+            for cot_det in cotizacion.cotizaciones
+        ],
+    )
+
+
+def _apply_filters(statement, filters: Optional[CotizacionFilterParams]):
+    # Sucursal y distribuidor se filtran por clave con un IN sobre su id; los
+    # filtros de cotización y det_solicitud van en un mismo EXISTS, así una
+    # cotización objeto entra solo si una misma det_solicitud cumple todos.
+    if filters is None:
+        return statement
+    if filters.convenio_id is not None:
+        statement = statement.where(CotizacionObjeto.convenio_id == filters.convenio_id)
+    if filters.suc_clave is not None:
+        statement = statement.where(
+            CotizacionObjeto.sucursal_id.in_(
+                select(Sucursal.id).where(Sucursal.clave == filters.suc_clave)
+            )
+        )
+    if filters.distribuidor_clave is not None:
+        statement = statement.where(
+            CotizacionObjeto.distribuidor_id.in_(
+                select(Distribuidor.id).where(
+                    Distribuidor.clave == filters.distribuidor_clave
+                )
+            )
+        )
+
+    det_solicitud_conditions = []
+    if filters.plan is not None:
+        det_solicitud_conditions.append(DetSolicitud.plan == filters.plan)
+    if filters.paquete is not None:
+        det_solicitud_conditions.append(DetSolicitud.paquete == filters.paquete)
+    if filters.vigencia_desde is not None:
+        det_solicitud_conditions.append(
+            DetSolicitud.ini_vig_reportada >= filters.vigencia_desde
+        )
+    if filters.vigencia_hasta is not None:
+        det_solicitud_conditions.append(
+            DetSolicitud.ini_vig_reportada <= filters.vigencia_hasta
+        )
+
+    cotizaciones = select(Cotizacion.id).where(
+        Cotizacion.cotizacion_objeto_id == CotizacionObjeto.id
+    )
+    if filters.plan_comercial is not None:
+        cotizaciones = cotizaciones.where(
+            Cotizacion.plan_comercial == filters.plan_comercial
+        )
+    elif not det_solicitud_conditions:
+        return statement
+    if det_solicitud_conditions:
+        cotizaciones = cotizaciones.join(
+            DetSolicitud, DetSolicitud.cotizacion_id == Cotizacion.id
+        ).where(*det_solicitud_conditions)
+    return statement.where(cotizaciones.exists())
+
+
+def _paginate(statement, page: int, limit: int, cursor: Optional[str]):
+    # Se ordena por la llave primaria para que la paginación sea estable. Con
+    # cursor se filtra por id (keyset) y el costo no depende de la profundidad
+    # de la página; page/limit se conserva como alternativa. Se pide una fila
+    # de más para saber si hay página siguiente.
+    statement = statement.order_by(CotizacionObjeto.id).limit(limit + 1)
+    if cursor is not None:
+        return statement.where(
+            CotizacionObjeto.id > _decode_cotizacion_objeto_cursor(cursor)
+        )
+    return statement.offset((page - 1) * limit)
+
+
+def _split_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    if not rows:
         raise HTTPException(status_code=404, detail="No se encontraron cotizaciones")
+    return rows, next_cursor
+
+
+def count_cotizaciones(
+    db: Session,
+    filters: Optional[CotizacionFilterParams] = None,
+    mode: CountMode = CountMode.exact,
+) -> Optional[int]:
+    """
+    Total de cotizaciones objeto que cumplen ``filters`` según ``mode``.
+    """
+    return count_rows(db, _apply_filters(select(CotizacionObjeto.id), filters), mode)
+
+
+def get_all_cotizaciones(
+    db: Session,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    filters: Optional[CotizacionFilterParams] = None,
+) -> Tuple[List[CotizacionResponse], Optional[str]]:
+    statement = _paginate(
+        _apply_filters(
+            select(CotizacionObjeto).options(*_LISTING_OPTIONS),
+            filters,
+        ),
+        page,
+        limit,
+        cursor,
+    )
+    cotizaciones, next_cursor = _split_page(db.exec(statement).all(), limit)
 
     cotizacion_responses = [
         CotizacionResponse(
-            response_body=CotizacionObjetoRead(
-                id_convenio=cotizacion.convenio_id,
-                suc_clave=cotizacion.sucursal.clave if cotizacion.sucursal else None,
-                suc_nombre=cotizacion.sucursal.nombre if cotizacion.sucursal else None,
-                distribuidor_clave=(
-                    cotizacion.distribuidor.clave if cotizacion.distribuidor else None
-                ),
-                distribuidor_nombre=(
-                    cotizacion.distribuidor.nombre if cotizacion.distribuidor else None
-                ),
-                distribuidor_email=(
-                    cotizacion.distribuidor.email if cotizacion.distribuidor else None
-                ),
-                cotizaciones=[
-                    CotizacionRead(
-                        id=str(cot_det.id),
-                        plan_comercial=cot_det.plan_comercial,
-                        prima_neta=(
-                            cot_det.prima_neta
-                            if hasattr(cot_det, "prima_neta")
-                            else 0.0
-                        ),
-                        iva_notal=(
-                            cot_det.iva_notal if hasattr(cot_det, "iva_notal") else 0.0
-                        ),
-                        prima_total=(
-                            cot_det.prima_total
-                            if hasattr(cot_det, "prima_total")
-                            else 0.0
-                        ),
-                        det_solicitudes=[
-                            DetSolicitudRead(
-                                id=str(det_solicitud.id),
-                                plan=det_solicitud.plan,
-                                renovacion=det_solicitud.renovacion,
-                                tipo=det_solicitud.tipo,
-                                paquete=det_solicitud.paquete,
-                                fecha_nacimiento=det_solicitud.fecha_nacimiento,
-                                ini_vig_reportada=det_solicitud.ini_vig_reportada,
-                                fin_vig_reportada=det_solicitud.fin_vig_reportada,
-                                plazo_reportado=det_solicitud.plazo_reportado,
-                                tipo_vig=det_solicitud.tipo_vig,
-                                sum_aseg_4=det_solicitud.sum_aseg_4,
-                                sum_aseg_5=det_solicitud.sum_aseg_5,
-                                sum_aseg_6=det_solicitud.sum_aseg_6,
-                                coberturas=[],
-                            )
-                            for det_solicitud in cot_det.det_solicitudes
-                        ],
-                    )
-                    for cot_det in cotizacion.cotizaciones
-                ],
-            ),
+            response_body=_build_cotizacion_objeto_read(cotizacion),
             es_dato_valido=True,
             message_error=None,
         )
         for cotizacion in cotizaciones
     ]
-    return cotizacion_responses
+    return cotizacion_responses, next_cursor
+
+
+_COTIZACION_RESPONSES = TypeAdapter(List[CotizacionResponse])
+_COTIZACION_OBJETO_READ = TypeAdapter(CotizacionObjetoRead)
+
+_DET_SOLICITUD_READ_COLUMNS = (
+    "plan",
+    "renovacion",
+    "tipo",
+    "paquete",
+    "fecha_nacimiento",
+    "ini_vig_reportada",
+    "fin_vig_reportada",
+    "plazo_reportado",
+    "tipo_vig",
+    "sum_aseg_4",
+    "sum_aseg_5",
+    "sum_aseg_6",
+)
+
+
+def _objeto_read_select():
+    return (
+        select(
+            CotizacionObjeto.id,
+            CotizacionObjeto.convenio_id,
+            Sucursal.clave,
+            Sucursal.nombre,
+            Distribuidor.clave,
+            Distribuidor.nombre,
+            Distribuidor.email,
+        )
+        .outerjoin(Sucursal, CotizacionObjeto.sucursal_id == Sucursal.id)
+        .outerjoin(Distribuidor, CotizacionObjeto.distribuidor_id == Distribuidor.id)
+    )
+
+
+def _build_objeto_reads(
+    db: Session, objetos: List[Any]
+) -> List[Tuple[int, CotizacionObjetoRead]]:
+    # Solo se seleccionan las columnas necesarias como tuplas (sin hidratar
+    # objetos del ORM) y las respuestas se arman con ``model_construct``, sin
+    # volver a validar datos que vienen de la base.
+    cotizaciones_rows = db.execute(
+        select(
+            Cotizacion.id,
+            Cotizacion.cotizacion_objeto_id,
+            Cotizacion.plan_comercial,
+            Cotizacion.prima_neta,
+            Cotizacion.iva_total,
+            Cotizacion.prima_total,
+        )
+        .where(Cotizacion.cotizacion_objeto_id.in_([row[0] for row in objetos]))
+        .order_by(Cotizacion.id)
+    ).all()
+    det_solicitudes_rows = db.execute(
+        select(
+            DetSolicitud.id,
+            DetSolicitud.cotizacion_id,
+            *(getattr(DetSolicitud, column) for column in _DET_SOLICITUD_READ_COLUMNS),
+        )
+        .where(DetSolicitud.cotizacion_id.in_([row[0] for row in cotizaciones_rows]))
+        .order_by(DetSolicitud.id)
+    ).all()
+
+    det_solicitudes_by_cotizacion: dict = defaultdict(list)
+    for row in det_solicitudes_rows:
+        det_solicitudes_by_cotizacion[row[1]].append(
+            DetSolicitudRead.model_construct(
+                id=str(row[0]),
+                coberturas=[],
+                **dict(zip(_DET_SOLICITUD_READ_COLUMNS, row[2:])),
+            )
+        )
+    cotizaciones_by_objeto: dict = defaultdict(list)
+    for (
+        cot_id,
+        objeto_id,
+        plan_comercial,
+        prima_neta,
+        iva,
+        prima_total,
+    ) in cotizaciones_rows:
+        cotizaciones_by_objeto[objeto_id].append(
+            CotizacionRead.model_construct(
+                id=str(cot_id),
+                plan_comercial=plan_comercial,
+                prima_neta=prima_neta,
+                iva_notal=iva,
+                prima_total=prima_total,
+                det_solicitudes=det_solicitudes_by_cotizacion[cot_id],
+            )
+        )
+
+    return [
+        (
+            objeto_id,
+            CotizacionObjetoRead.model_construct(
+                id_convenio=convenio_id,
+                suc_clave=suc_clave,
+                suc_nombre=suc_nombre,
+                distribuidor_clave=distribuidor_clave,
+                distribuidor_nombre=distribuidor_nombre,
+                distribuidor_email=distribuidor_email,
+                cotizaciones=cotizaciones_by_objeto[objeto_id],
+            ),
+        )
+        for (
+            objeto_id,
+            convenio_id,
+            suc_clave,
+            suc_nombre,
+            distribuidor_clave,
+            distribuidor_nombre,
+            distribuidor_email,
+        ) in objetos
+    ]
+
+
+def get_all_cotizaciones_projection(
+    db: Session,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    filters: Optional[CotizacionFilterParams] = None,
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Igual que ``get_all_cotizaciones`` pero devuelve el JSON ya serializado.
+
+    Lee columnas sueltas en lugar de entidades del ORM; la ruta devuelve los
+    bytes tal cual, así que FastAPI tampoco valida el ``response_model``.
+    """
+    statement = _paginate(
+        _apply_filters(_objeto_read_select(), filters), page, limit, cursor
+    )
+    objetos, next_cursor = _split_page(db.execute(statement).all(), limit)
+    cotizacion_responses = [
+        CotizacionResponse.model_construct(
+            response_body=cotizacion_objeto_read,
+            message_error=None,
+            es_dato_valido=True,
+        )
+        for _, cotizacion_objeto_read in _build_objeto_reads(db, objetos)
+    ]
+    return _COTIZACION_RESPONSES.dump_json(cotizacion_responses), next_cursor
+
+
+def get_cotizacion_projection(db: Session, cotizacion_objeto_id: int) -> bytes:
+    objetos = db.execute(
+        _objeto_read_select().where(CotizacionObjeto.id == cotizacion_objeto_id)
+    ).all()
+    if not objetos:
+        raise HTTPException(status_code=404, detail="Cotización objeto no encontrada")
+    [(_, cotizacion_objeto_read)] = _build_objeto_reads(db, objetos)
+    return _response_json(_COTIZACION_OBJETO_READ.dump_json(cotizacion_objeto_read))
+
+
+def _response_json(snapshot: bytes) -> bytes:
+    # Mismo JSON que CotizacionResponse con el snapshot como response_body
+    return (
+        b'{"response_body":'
+        + snapshot
+        + b',"message_error":null,"es_dato_valido":true}'
+    )
+
+
+def _store_snapshots(db: Session, snapshots: Dict[int, bytes]) -> None:
+    db.execute(
+        update(CotizacionObjeto.__table__)
+        .where(CotizacionObjeto.__table__.c.id == bindparam("objeto_id"))
+        .values(
+            snapshot=cast(
+                bindparam("snapshot", type_=Text), CotizacionObjeto.snapshot.type
+            )
+        ),
+        [
+            {"objeto_id": objeto_id, "snapshot": snapshot.decode()}
+            for objeto_id, snapshot in snapshots.items()
+        ],
+    )
+
+
+def _rebuild_snapshots(
+    db: Session, cotizacion_objeto_ids: List[int]
+) -> Dict[int, bytes]:
+    # Se bloquean las cotizaciones objeto antes de leer sus hijos: un cambio
+    # concurrente en cotizacion/detsolicitud/cobertura dispara un UPDATE sobre
+    # la misma fila que espera a este commit y vuelve a invalidar el snapshot.
+    # Las filas bloqueadas por otra transacción se arman pero no se guardan.
+    locked = set(
+        db.execute(
+            select(CotizacionObjeto.id)
+            .where(
+                CotizacionObjeto.id.in_(cotizacion_objeto_ids),
+                CotizacionObjeto.snapshot.is_(None),
+            )
+            .with_for_update(key_share=True, skip_locked=True)
+        ).scalars()
+    )
+    objetos = db.execute(
+        _objeto_read_select().where(CotizacionObjeto.id.in_(cotizacion_objeto_ids))
+    ).all()
+    snapshots = {
+        objeto_id: _COTIZACION_OBJETO_READ.dump_json(cotizacion_objeto_read)
+        for objeto_id, cotizacion_objeto_read in _build_objeto_reads(db, objetos)
+    }
+    if locked:
+        _store_snapshots(db, {objeto_id: snapshots[objeto_id] for objeto_id in locked})
+    db.commit()
+    return snapshots
+
+
+def _snapshots(db: Session, rows: List[Any]) -> List[bytes]:
+    stale = [objeto_id for objeto_id, snapshot in rows if snapshot is None]
+    rebuilt = _rebuild_snapshots(db, stale) if stale else {}
+    return [
+        snapshot.encode() if snapshot is not None else rebuilt[objeto_id]
+        for objeto_id, snapshot in rows
+    ]
+
+
+def _snapshot_select():
+    return select(CotizacionObjeto.id, cast(CotizacionObjeto.snapshot, Text))
+
+
+def get_all_cotizaciones_snapshot(
+    db: Session,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    filters: Optional[CotizacionFilterParams] = None,
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Igual que ``get_all_cotizaciones_projection`` pero sirve el snapshot JSONB
+    guardado en cada cotización objeto; solo se arman (y se guardan) los que
+    los triggers invalidaron.
+    """
+    statement = _paginate(
+        _apply_filters(_snapshot_select(), filters), page, limit, cursor
+    )
+    rows, next_cursor = _split_page(db.execute(statement).all(), limit)
+    content = b"[" + b",".join(map(_response_json, _snapshots(db, rows))) + b"]"
+    return content, next_cursor
+
+
+def get_cotizacion_snapshot(db: Session, cotizacion_objeto_id: int) -> bytes:
+    rows = db.execute(
+        _snapshot_select().where(CotizacionObjeto.id == cotizacion_objeto_id)
+    ).all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Cotización objeto no encontrada")
+    [snapshot] = _snapshots(db, rows)
+    return _response_json(snapshot)
+
+
+_EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+def _json_object(fields: Dict[str, Any]):
+    # Las claves van como literales: json_build_object recibe argumentos
+    # "any" y Postgres no puede inferir el tipo de un parámetro sin tipo.
+    return func.json_build_object(
+        *(
+            part
+            for key, value in fields.items()
+            for part in (literal_column(f"'{key}'"), value)
+        )
+    )
+
+
+def _json_agg_or_empty(value, order_by):
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(value, order_by)), _EMPTY_JSON_ARRAY
+    )
+
+
+def _json_agg_select():
+    # Postgres arma el árbol completo de cada cotización objeto con
+    # json_build_object/json_agg en subconsultas correlacionadas y lo devuelve
+    # como texto; Python solo concatena bytes. Las claves son las de
+    # CotizacionResponse y, como en los demás caminos, coberturas va vacío.
+    det_solicitud = _json_object(
+        {
+            "id": cast(DetSolicitud.id, Text),
+            **{
+                column: getattr(DetSolicitud, column)
+                for column in _DET_SOLICITUD_READ_COLUMNS
+            },
+            "coberturas": _EMPTY_JSON_ARRAY,
+        }
+    )
+    det_solicitudes = (
+        select(_json_agg_or_empty(det_solicitud, DetSolicitud.id))
+        .where(DetSolicitud.cotizacion_id == Cotizacion.id)
+        .scalar_subquery()
+    )
+    cotizacion = _json_object(
+        {
+            "id": cast(Cotizacion.id, Text),
+            "plan_comercial": Cotizacion.plan_comercial,
+            "prima_neta": Cotizacion.prima_neta,
+            "iva_notal": Cotizacion.iva_total,
+            "prima_total": Cotizacion.prima_total,
+            "det_solicitudes": det_solicitudes,
+        }
+    )
+    cotizaciones = (
+        select(_json_agg_or_empty(cotizacion, Cotizacion.id))
+        .where(Cotizacion.cotizacion_objeto_id == CotizacionObjeto.id)
+        .scalar_subquery()
+    )
+    response = _json_object(
+        {
+            "response_body": _json_object(
+                {
+                    "id_convenio": CotizacionObjeto.convenio_id,
+                    "suc_clave": Sucursal.clave,
+                    "suc_nombre": Sucursal.nombre,
+                    "distribuidor_clave": Distribuidor.clave,
+                    "distribuidor_nombre": Distribuidor.nombre,
+                    "distribuidor_email": Distribuidor.email,
+                    "cotizaciones": cotizaciones,
+                }
+            ),
+            "message_error": null(),
+            "es_dato_valido": true(),
+        }
+    )
+    return (
+        select(CotizacionObjeto.id, cast(response, Text))
+        .outerjoin(Sucursal, CotizacionObjeto.sucursal_id == Sucursal.id)
+        .outerjoin(Distribuidor, CotizacionObjeto.distribuidor_id == Distribuidor.id)
+    )
+
+
+def get_all_cotizaciones_json_agg(
+    db: Session,
+    page: int = 1,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    filters: Optional[CotizacionFilterParams] = None,
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Igual que ``get_all_cotizaciones_projection`` pero el JSON de cada
+    cotización objeto lo arma Postgres en una sola consulta.
+    """
+    statement = _paginate(
+        _apply_filters(_json_agg_select(), filters), page, limit, cursor
+    )
+    rows, next_cursor = _split_page(db.execute(statement).all(), limit)
+    content = b"[" + b",".join(row[1].encode() for row in rows) + b"]"
+    return content, next_cursor
+
+
+def get_cotizacion_json_agg(db: Session, cotizacion_objeto_id: int) -> bytes:
+    row = db.execute(
+        _json_agg_select().where(CotizacionObjeto.id == cotizacion_objeto_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Cotización objeto no encontrada")
+    return row[1].encode()
+
+
+def export_cotizaciones(
+    batch_size: int = 1000,
+    filters: Optional[CotizacionFilterParams] = None,
+) -> Iterator[bytes]:
+    """
+    Genera todas las cotizaciones objeto como NDJSON, una por línea.
+
+    Usa un cursor del lado del servidor (``yield_per``) y su propia sesión,
+    porque la respuesta se sigue enviando después de que la dependencia
+    ``get_db`` cerró la suya; la memoria no crece con el número de filas.
+    """
+    with Session(engine) as db:
+        statement = (
+            _apply_filters(
+                select(CotizacionObjeto).options(*_LISTING_OPTIONS),
+                filters,
+            )
+            .order_by(CotizacionObjeto.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for cotizacion in db.exec(statement):
+            line = _build_cotizacion_objeto_read(cotizacion).model_dump_json()
+            yield line.encode() + b"\n"
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def simular_primas(simulacion_in: SimulacionCreate) -> SimulacionRead:
+    """
+    Tarifica la det_solicitud base para cada combinación de ``sum_aseg_4`` y
+    edad en una sola operación vectorizada, sin crear cotizaciones.
+
+    Con tarifa, cada celda es la prima de la tarifa para esa edad y suma
+    asegurada. Sin ella se parte de las primas enviadas: escalan con la suma
+    asegurada y se recargan por edad respecto a la edad al inicio de vigencia.
+    """
+    det_solicitud = simulacion_in.det_solicitud
+    tarifas = get_tarifas()
+    if tarifas is not None:
+        tarifa = tarifas.para(det_solicitud.ini_vig_reportada)
+        primas = with_iva(
+            tarifa.primas_grid(
+                det_solicitud.plan,
+                det_solicitud.paquete,
+                _claves_cobertura(det_solicitud),
+                simulacion_in.edades,
+                simulacion_in.sum_aseg_4,
+            )
+            .sum(axis=0)
+            .T
+        )
+    else:
+        _validate_det_solicitud_coberturas(det_solicitud)
+        if det_solicitud.sum_aseg_4 <= 0:
+            raise HTTPException(
+                status_code=422, detail="La simulación requiere sum_aseg_4 mayor a cero"
+            )
+        primas = simulate(
+            [
+                cobertura.prima
+                for cobertura in det_solicitud.coberturas_prima_neta or []
+            ],
+            det_solicitud.sum_aseg_4,
+            _edad_al_inicio(det_solicitud),
+            simulacion_in.sum_aseg_4,
+            simulacion_in.edades,
+        )
+    # Las matrices salen de numpy ya como floats; no se vuelven a validar
+    return SimulacionRead.model_construct(
+        sum_aseg_4=simulacion_in.sum_aseg_4,
+        edades=simulacion_in.edades,
+        prima_neta=primas.prima_neta.tolist(),
+        iva_total=primas.iva.tolist(),
+        prima_total=primas.prima_total.tolist(),
+    )
+
+
+def rate_cotizaciones_batch(
+    db: Session, payloads: List[Any]
+) -> List[CotizacionBatchResult]:
+    """
+    Valida y tarifica un lote de cotizaciones objeto independientes.
+
+    La validación se hace en una sola pasada y los ítems válidos se tarifican
+    en el pool de procesos; el resultado conserva el orden de entrada.
+    """
+    results: List[Optional[CotizacionBatchResult]] = [None] * len(payloads)
+    valid: List[Tuple[int, CotizacionObjetoCreate]] = []
+    for index, payload in enumerate(payloads):
+        try:
+            cotizacion_objeto_in = CotizacionObjetoCreate.model_validate(payload)
+            _aplicar_tarifa(cotizacion_objeto_in)
+            _validate_coberturas(cotizacion_objeto_in)
+            SucursalService.get_sucursal_by_clave(db, cotizacion_objeto_in.suc_clave)
+            DistribuidorService.get_distribuidor_by_clave(
+                db, cotizacion_objeto_in.distribuidor_clave
+            )
+        except ValidationError as error:
+            message_error = _format_validation_error(error)
+        except HTTPException as error:
+            message_error = error.detail
+        else:
+            valid.append((index, cotizacion_objeto_in))
+            continue
+        results[index] = CotizacionBatchResult(
+            index=index, es_dato_valido=False, message_error=message_error
+        )
+
+    primas = rate_batch(
+        [_primas_tree(cotizacion_objeto_in) for _, cotizacion_objeto_in in valid],
+        executor=get_rating_pool(),
+    )
+    for (index, cotizacion_objeto_in), primas_objeto in zip(valid, primas):
+        results[index] = CotizacionBatchResult(
+            index=index,
+            es_dato_valido=True,
+            cotizaciones=[
+                CotizacionPrimasRead(
+                    plan_comercial=cotizacion.plan_comercial,
+                    prima_neta=prima_neta,
+                    iva_notal=iva,
+                    prima_total=prima_total,
+                )
+                for cotizacion, prima_neta, iva, prima_total in zip(
+                    cotizacion_objeto_in.cotizaciones,
+                    *(values.tolist() for values in primas_objeto),
+                )
+            ],
+        )
+    return results
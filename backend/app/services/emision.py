@@ -1,16 +1,905 @@
-from typing import List
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import psycopg
 from fastapi import HTTPException
+from psycopg import sql
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    Integer,
+    Text,
+    Uuid,
+    and_,
+    bindparam,
+    column,
+    func,
+    insert,
+    literal,
+    or_,
+    table,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import selectinload
+from sqlalchemy.util import await_only
 from sqlmodel import Session, select
-from sqlalchemy.orm import joinedload
-from app.models import Emision
 
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models import (
+    AseguradosAdicionales,
+    CertificadoCobertura,
+    CertificadoDetalle,
+    Cobertura,
+    Cotizacion,
+    CotizacionObjeto,
+    DetSolicitud,
+    Distribuidor,
+    Emision,
+    EmisionJob,
+    Sucursal,
+)
+from app.schemas import (
+    AseguradoAdicionalRead,
+    CertificadoRead,
+    CertificadoResponse,
+    CoberturaResponse,
+    EmisionDesdeCotizacionRequest,
+    EmisionJobRead,
+    EmisionRead,
+    EmisionRequest,
+    EmisionResponse,
+)
+from app.schemas import AseguradosAdicionales as AseguradoRequest
+from app.schemas import CertificadoDetalle as CertificadoRequest
+
+logger = logging.getLogger(__name__)
+
+# (tipo_identificacion, numero_identificacion) de un certificado
+Identificacion = Tuple[str, str]
+
+# Columna de certificadodetalle y campo de CertificadoDetalle (schema) con
+# los datos que envía el cliente
+_CERTIFICADO_FIELDS = (
+    ("tipo", "tipo"),
+    ("tipo_identificacion", "tipoIdentificacion"),
+    ("numero_identificacion", "numeroIdentificacion"),
+    ("nombre", "nombre"),
+    ("sexo", "sexo"),
+    ("etiqueta_adicional1", "etiquetaAdicional1"),
+    ("data_adicional1", "dataAdicional1"),
+    ("etiqueta_adicional2", "etiquetaAdicional2"),
+    ("data_adicional2", "dataAdicional2"),
+    ("etiqueta_adicional3", "etiquetaAdicional3"),
+    ("data_adicional3", "dataAdicional3"),
+)
+_certificado_datos = attrgetter(*(field for _, field in _CERTIFICADO_FIELDS))
+_identificacion = attrgetter("tipoIdentificacion", "numeroIdentificacion")
+_CERTIFICADO_COLUMNS = (
+    "id",
+    *(name for name, _ in _CERTIFICADO_FIELDS),
+    "emision_id",
+    "id_convenio",
+)
+# Índice único ix_certificadodetalle_id_convenio_identificacion
+_IDENTIFICACION_COLUMNS = (
+    "id_convenio",
+    "tipo_identificacion",
+    "numero_identificacion",
+)
+_STAGING_TABLE = "certificadodetalle_envio"
+_VALUES_BATCH_SIZE = 1000
+_ASEGURADO_COLUMNS = (
+    "id",
+    "parentesco",
+    "tipo_identificacion",
+    "numero_identificacion",
+    "nombre",
+    "fecha_nacimiento",
+    "sexo",
+    "edad",
+    "emision_id",
+)
+
+
+# Colecciones que GET /emision puede expandir con include=
+_INCLUDES = {
+    "certificados": Emision.certificados,
+    "asegurados": Emision.asegurados_adicionales,
+}
+
+_EMISION_READS = TypeAdapter(List[EmisionRead])
 
-def get_all_emisiones(db: Session) -> List[Emision]:
-    emisiones = db.exec(
-        select(Emision).options(
-            joinedload(Emision.certificados), joinedload(Emision.asegurados_adicionales)
+
+def parse_include(include: Optional[str]) -> Set[str]:
+    includes = {value.strip() for value in (include or "").split(",") if value.strip()}
+    invalid = includes - _INCLUDES.keys()
+    if invalid:
+        raise HTTPException(
+            status_code=422,
+            detail=f"include inválido: {', '.join(sorted(invalid))}; "
+            f"valores posibles: {', '.join(_INCLUDES)}",
         )
-    ).all()
+    return includes
+
+
+def _decode_emision_cursor(cursor: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(decode_cursor(cursor))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _certificado_read(cert: CertificadoDetalle) -> CertificadoRead:
+    return CertificadoRead.model_construct(
+        identificador=cert.id,
+        tipo=cert.tipo,
+        tipoIdentificacion=cert.tipo_identificacion,
+        numeroIdentificacion=cert.numero_identificacion,
+        nombre=cert.nombre,
+        sexo=cert.sexo,
+        etiquetaAdicional1=cert.etiqueta_adicional1,
+        dataAdicional1=cert.data_adicional1,
+        etiquetaAdicional2=cert.etiqueta_adicional2,
+        dataAdicional2=cert.data_adicional2,
+        etiquetaAdicional3=cert.etiqueta_adicional3,
+        dataAdicional3=cert.data_adicional3,
+    )
+
+
+def _asegurado_read(aseg: AseguradosAdicionales) -> AseguradoAdicionalRead:
+    return AseguradoAdicionalRead.model_construct(
+        identificador=aseg.id,
+        parentesco=aseg.parentesco,
+        tipoIdentificacion=aseg.tipo_identificacion,
+        numeroIdentificacion=aseg.numero_identificacion,
+        nombre=aseg.nombre,
+        fechaNacimiento=aseg.fecha_nacimiento,
+        sexo=aseg.sexo,
+        edad=aseg.edad,
+    )
+
+
+def get_all_emisiones(
+    db: Session,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include: Set[str] = frozenset(),
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Página de emisiones ordenada por id, con cursor (keyset).
+
+    Sin ``include`` solo se lee la tabla emision. Cada colección pedida se
+    carga con selectinload, una consulta IN por colección y página; con
+    joinedload de ambas cada emisión traería certificados x asegurados filas.
+    """
+    statement = (
+        select(Emision)
+        .options(*(selectinload(_INCLUDES[name]) for name in include))
+        .order_by(Emision.id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        statement = statement.where(Emision.id > _decode_emision_cursor(cursor))
+    emisiones = db.exec(statement).all()
+    next_cursor = None
+    if len(emisiones) > limit:
+        emisiones = emisiones[:limit]
+        next_cursor = encode_cursor(emisiones[-1].id)
     if not emisiones:
         raise HTTPException(status_code=404, detail="No se encontraron emisiones")
-    return emisiones
+
+    emision_reads = [
+        EmisionRead.model_construct(
+            identificador=emision.id,
+            idConvenio=emision.id_convenio,
+            sucClave=emision.suc_clave,
+            sucNombre=emision.suc_nombre,
+            distribuidorClave=emision.distribuidor_clave,
+            distribuidorNombre=emision.distribuidor_nombre,
+            distribuidorEmail=emision.distribuidor_email,
+            certificados=[_certificado_read(cert) for cert in emision.certificados]
+            if "certificados" in include
+            else None,
+            aseguradosAdicionales=[
+                _asegurado_read(aseg) for aseg in emision.asegurados_adicionales
+            ]
+            if "asegurados" in include
+            else None,
+        )
+        for emision in emisiones
+    ]
+    return _EMISION_READS.dump_json(emision_reads), next_cursor
+
+
+def _copy_rows(
+    db: Session, table: str, columns: Sequence[str], rows: Iterable[tuple]
+) -> None:
+    # COPY sobre la misma conexión (y transacción) que la sesión
+    statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+        sql.Identifier(table), sql.SQL(", ").join(map(sql.Identifier, columns))
+    )
+    connection = db.connection().connection.driver_connection
+    if isinstance(connection, psycopg.AsyncConnection):
+        # Con ASYNC_DATABASE la sesión corre dentro de run_sync sobre una
+        # conexión async: el COPY se espera desde el greenlet de SQLAlchemy
+        async def copy_async() -> None:
+            async with connection.cursor() as cursor:
+                async with cursor.copy(statement) as copy:
+                    for row in rows:
+                        await copy.write_row(row)
+
+        await_only(copy_async())
+        return
+    with connection.cursor() as cursor, cursor.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def _insert_values(
+    db: Session, model: Any, columns: Sequence[str], rows: List[tuple]
+) -> None:
+    # INSERT multi-fila en lotes que no pasan el límite de parámetros
+    for start in range(0, len(rows), _VALUES_BATCH_SIZE):
+        db.execute(
+            insert(model).values(
+                [
+                    dict(zip(columns, row, strict=True))
+                    for row in rows[start : start + _VALUES_BATCH_SIZE]
+                ]
+            )
+        )
+
+
+def _insert_emision_row(db: Session, emision_request: EmisionRequest) -> uuid.UUID:
+    emision_id = uuid.uuid4()
+    db.execute(
+        insert(Emision).values(
+            id=emision_id,
+            id_convenio=emision_request.idConvenio,
+            suc_clave=emision_request.sucClave,
+            suc_nombre=emision_request.sucNombre,
+            distribuidor_clave=emision_request.distribuidorClave,
+            distribuidor_nombre=emision_request.distribuidorNombre,
+            distribuidor_email=emision_request.distribuidorEmail,
+        )
+    )
+    return emision_id
+
+
+def _sin_repetidos(certificados: Sequence[Any]) -> Tuple[List[int], Dict[int, int]]:
+    """
+    Posiciones de la primera aparición de cada identificación y, para cada
+    repetida dentro del mismo envío, la posición de la primera; una sola
+    pasada con un dict.
+    """
+    primeras: Dict[Identificacion, int] = {}
+    unicos: List[int] = []
+    repetidos: Dict[int, int] = {}
+    for position, cert in enumerate(certificados):
+        primera = primeras.setdefault(_identificacion(cert), position)
+        if primera == position:
+            unicos.append(position)
+        else:
+            repetidos[position] = primera
+    return unicos, repetidos
+
+
+def _certificados_existentes(
+    db: Session, id_convenio: uuid.UUID, identificaciones: Sequence[Identificacion]
+) -> Dict[Identificacion, uuid.UUID]:
+    if not identificaciones:
+        return {}
+    enviadas = (
+        func.unnest(
+            _array("tipos", [tipo for tipo, _ in identificaciones]),
+            _array("numeros", [numero for _, numero in identificaciones]),
+        )
+        .table_valued("tipo_identificacion", "numero_identificacion")
+        .render_derived()
+    )
+    rows = db.execute(
+        select(
+            CertificadoDetalle.id,
+            CertificadoDetalle.tipo_identificacion,
+            CertificadoDetalle.numero_identificacion,
+        ).join_from(
+            enviadas,
+            CertificadoDetalle,
+            and_(
+                CertificadoDetalle.id_convenio == id_convenio,
+                CertificadoDetalle.tipo_identificacion
+                == enviadas.c.tipo_identificacion,
+                CertificadoDetalle.numero_identificacion
+                == enviadas.c.numero_identificacion,
+            ),
+        )
+    ).all()
+    return {
+        (row.tipo_identificacion, row.numero_identificacion): row.id for row in rows
+    }
+
+
+def _insert_certificado_rows(db: Session, rows: List[tuple]) -> Set[uuid.UUID]:
+    """
+    Inserta las filas que no chocan con el índice único de identificación y
+    devuelve los ids insertados.
+
+    Los envíos grandes pasan por una tabla temporal cargada con COPY, porque
+    COPY no admite ON CONFLICT; los chicos van en INSERT multi-fila.
+    """
+    if len(rows) < settings.EMISION_COPY_THRESHOLD:
+        insertados: Set[uuid.UUID] = set()
+        for start in range(0, len(rows), _VALUES_BATCH_SIZE):
+            insertados.update(
+                db.execute(
+                    pg_insert(CertificadoDetalle)
+                    .values(
+                        [
+                            dict(zip(_CERTIFICADO_COLUMNS, row, strict=True))
+                            for row in rows[start : start + _VALUES_BATCH_SIZE]
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=_IDENTIFICACION_COLUMNS)
+                    .returning(CertificadoDetalle.id)
+                ).scalars()
+            )
+        return insertados
+
+    db.execute(
+        text(
+            f"CREATE TEMP TABLE {_STAGING_TABLE} "
+            f"(LIKE {CertificadoDetalle.__tablename__}) ON COMMIT DROP"
+        )
+    )
+    _copy_rows(db, _STAGING_TABLE, _CERTIFICADO_COLUMNS, rows)
+    staging = table(_STAGING_TABLE, *(column(name) for name in _CERTIFICADO_COLUMNS))
+    insertados = set(
+        db.execute(
+            pg_insert(CertificadoDetalle)
+            .from_select(_CERTIFICADO_COLUMNS, select(*staging.c))
+            .on_conflict_do_nothing(index_elements=_IDENTIFICACION_COLUMNS)
+            .returning(CertificadoDetalle.id)
+        ).scalars()
+    )
+    db.execute(text(f"DROP TABLE {_STAGING_TABLE}"))
+    return insertados
+
+
+def _insert_certificados(
+    db: Session,
+    emision_id: uuid.UUID,
+    id_convenio: uuid.UUID,
+    certificados: Sequence[CertificadoRequest],
+) -> List[Tuple[uuid.UUID, bool]]:
+    """
+    Inserta los certificados omitiendo los que el convenio ya tiene y
+    devuelve, en el orden recibido, el id de cada uno y si es nuevo.
+
+    Un certificado ya emitido responde con el id existente; uno repetido en
+    el mismo envío, con el de su primera aparición. Sin duplicados solo se
+    agrega el ON CONFLICT; la búsqueda de los existentes se hace únicamente
+    para las filas que chocaron.
+    """
+    unicos, repetidos = _sin_repetidos(certificados)
+    ids = {position: uuid.uuid4() for position in unicos}
+    insertados = _insert_certificado_rows(
+        db,
+        [
+            (
+                ids[position],
+                *_certificado_datos(certificados[position]),
+                emision_id,
+                id_convenio,
+            )
+            for position in unicos
+        ],
+    )
+    existentes = _certificados_existentes(
+        db,
+        id_convenio,
+        [
+            _identificacion(certificados[position])
+            for position in unicos
+            if ids[position] not in insertados
+        ],
+    )
+
+    resultado: List[Tuple[uuid.UUID, bool]] = []
+    for position, cert in enumerate(certificados):
+        primera = repetidos.get(position, position)
+        if ids[primera] in insertados:
+            resultado.append((ids[primera], primera == position))
+        else:
+            resultado.append((existentes[_identificacion(cert)], False))
+    return resultado
+
+
+def _insert_asegurados(
+    db: Session, emision_id: uuid.UUID, asegurados: Sequence[AseguradoRequest]
+) -> None:
+    rows = [
+        (
+            uuid.uuid4(),
+            aseg.parentesco,
+            aseg.tipoIdentificacion,
+            aseg.numeroIdentificacion,
+            aseg.nombre,
+            aseg.fechaNacimiento,
+            aseg.sexo,
+            aseg.edad,
+            emision_id,
+        )
+        for aseg in asegurados
+    ]
+    if len(rows) >= settings.EMISION_COPY_THRESHOLD:
+        _copy_rows(db, AseguradosAdicionales.__tablename__, _ASEGURADO_COLUMNS, rows)
+    elif rows:
+        _insert_values(db, AseguradosAdicionales, _ASEGURADO_COLUMNS, rows)
+
+
+def _insert_emision(
+    db: Session, emision_request: EmisionRequest
+) -> Tuple[uuid.UUID, List[Tuple[uuid.UUID, bool]]]:
+    """
+    Inserta la emisión sin un objeto ORM por fila: INSERT multi-fila o, desde
+    EMISION_COPY_THRESHOLD filas, COPY.
+
+    Los ids se generan aquí para no tener que leerlos de vuelta; la emisión,
+    los certificados y los asegurados se confirman en la misma transacción.
+    """
+    emision_id = _insert_emision_row(db, emision_request)
+    certificados = _insert_certificados(
+        db, emision_id, emision_request.idConvenio, emision_request.certificados
+    )
+    _insert_asegurados(db, emision_id, emision_request.aseguradosAdicionales or [])
+    db.commit()
+    return emision_id, certificados
+
+
+def _certificado_response(
+    certificado_id: uuid.UUID, nuevo: bool
+) -> CertificadoResponse:
+    return CertificadoResponse.model_construct(
+        identificador=str(certificado_id),
+        estado="nuevo" if nuevo else "duplicado",
+        primaNeta=0.0,  # Estos valores deben ser calculados
+        ivaTotal=0.0,  # según la lógica de negocio
+        primaTotal=0.0,  # aquí van los valores reales
+        vigenciaInicial="",  # valores de ejemplo
+        vigenciaFinal="",
+        planCertificado="",
+        paquete="",
+        coberturas=[],  # Este debe contener los datos reales de coberturas
+    )
+
+
+def create_emision(db: Session, emision_request: EmisionRequest) -> EmisionResponse:
+    emision_id, certificados = _insert_emision(db, emision_request)
+
+    # Crear la respuesta; con model_construct porque los valores ya son del
+    # tipo correcto y una emisión colectiva puede traer 100.000 certificados
+    certificados_response = [
+        _certificado_response(certificado_id, nuevo)
+        for certificado_id, nuevo in certificados
+    ]
+    nuevos = sum(nuevo for _, nuevo in certificados)
+
+    emision_response = EmisionResponse(
+        identificador=str(emision_id),
+        mensajeError=None,
+        confirmacionEmitida=None,
+        idConvenio=emision_request.idConvenio,
+        sucClave=emision_request.sucClave,
+        sucNombre=emision_request.sucNombre,
+        distribuidorClave=emision_request.distribuidorClave,
+        distribuidorNombre=emision_request.distribuidorNombre,
+        distribuidorEmail=emision_request.distribuidorEmail,
+        certificadosNuevos=nuevos,
+        certificadosDuplicados=len(certificados) - nuevos,
+        certificados=certificados_response,
+    )
+
+    return emision_response
+
+
+def _array(name: str, values: List[Any], item_type: Any = Text):
+    return bindparam(name, values, type_=ARRAY(item_type))
+
+
+def create_emision_from_cotizacion(
+    db: Session, cotizacion_id: int, emision_request: EmisionDesdeCotizacionRequest
+) -> EmisionResponse:
+    """
+    Emite una cotización guardada: un certificado por det_solicitud, con su
+    plan, paquete, vigencias y primas, y sus coberturas.
+
+    Los datos de la cotización no pasan por Python: la emisión, los
+    certificados y las coberturas son un INSERT ... SELECT cada uno. Del
+    cliente solo vienen los datos de cada asegurado, que se cruzan con las
+    det_solicitudes (en orden de id) con unnest ... WITH ORDINALITY.
+    """
+    det_solicitudes = db.exec(
+        select(func.count(DetSolicitud.id))
+        .select_from(Cotizacion)
+        .outerjoin(DetSolicitud, DetSolicitud.cotizacion_id == Cotizacion.id)
+        .where(Cotizacion.id == cotizacion_id)
+        .group_by(Cotizacion.id)
+    ).first()
+    if det_solicitudes is None:
+        raise HTTPException(status_code=404, detail="Cotización no encontrada")
+    certificados = emision_request.certificados
+    if det_solicitudes != len(certificados):
+        raise HTTPException(
+            status_code=422,
+            detail=f"La cotización tiene {det_solicitudes} det_solicitudes y se "
+            f"enviaron {len(certificados)} certificados",
+        )
+
+    emision_id = uuid.uuid4()
+    emision = db.execute(
+        insert(Emision)
+        .from_select(
+            [
+                "id",
+                "id_convenio",
+                "suc_clave",
+                "suc_nombre",
+                "distribuidor_clave",
+                "distribuidor_nombre",
+                "distribuidor_email",
+            ],
+            select(
+                literal(emision_id, Uuid),
+                CotizacionObjeto.convenio_id,
+                Sucursal.clave,
+                Sucursal.nombre,
+                Distribuidor.clave,
+                Distribuidor.nombre,
+                Distribuidor.email,
+            )
+            .select_from(Cotizacion)
+            .join(
+                CotizacionObjeto, CotizacionObjeto.id == Cotizacion.cotizacion_objeto_id
+            )
+            .join(Sucursal, Sucursal.id == CotizacionObjeto.sucursal_id)
+            .join(Distribuidor, Distribuidor.id == CotizacionObjeto.distribuidor_id)
+            .where(Cotizacion.id == cotizacion_id),
+        )
+        .returning(
+            Emision.id_convenio,
+            Emision.suc_clave,
+            Emision.suc_nombre,
+            Emision.distribuidor_clave,
+            Emision.distribuidor_nombre,
+            Emision.distribuidor_email,
+        )
+    ).one()
+
+    unicos, repetidos = _sin_repetidos(certificados)
+    certificado_ids = {position: uuid.uuid4() for position in unicos}
+    enviados = (
+        func.unnest(
+            _array("orden", [position + 1 for position in unicos], Integer),
+            _array("ids", [certificado_ids[position] for position in unicos], Uuid),
+            *(
+                _array(
+                    name,
+                    [getattr(certificados[position], field) for position in unicos],
+                )
+                for name, field in _CERTIFICADO_FIELDS
+            ),
+        )
+        .table_valued("orden", "id", *(name for name, _ in _CERTIFICADO_FIELDS))
+        .render_derived()
+    )
+    dets = (
+        select(
+            DetSolicitud.id,
+            DetSolicitud.plan,
+            DetSolicitud.paquete,
+            DetSolicitud.ini_vig_reportada,
+            DetSolicitud.fin_vig_reportada,
+            DetSolicitud.prima_neta,
+            DetSolicitud.iva_total,
+            DetSolicitud.prima_total,
+            func.row_number().over(order_by=DetSolicitud.id).label("orden"),
+        )
+        .where(DetSolicitud.cotizacion_id == cotizacion_id)
+        .subquery()
+    )
+    certificado_rows = db.execute(
+        pg_insert(CertificadoDetalle)
+        .from_select(
+            [
+                *_CERTIFICADO_COLUMNS,
+                "det_solicitud_id",
+                "plan",
+                "paquete",
+                "ini_vig",
+                "fin_vig",
+                "prima_neta",
+                "iva_total",
+                "prima_total",
+            ],
+            select(
+                enviados.c.id,
+                *(enviados.c[name] for name, _ in _CERTIFICADO_FIELDS),
+                literal(emision_id, Uuid),
+                literal(emision.id_convenio, Uuid),
+                dets.c.id,
+                dets.c.plan,
+                dets.c.paquete,
+                dets.c.ini_vig_reportada,
+                dets.c.fin_vig_reportada,
+                dets.c.prima_neta,
+                dets.c.iva_total,
+                dets.c.prima_total,
+            ).join_from(enviados, dets, dets.c.orden == enviados.c.orden),
+        )
+        .on_conflict_do_nothing(index_elements=_IDENTIFICACION_COLUMNS)
+        .returning(
+            CertificadoDetalle.id,
+            CertificadoDetalle.plan,
+            CertificadoDetalle.paquete,
+            CertificadoDetalle.ini_vig,
+            CertificadoDetalle.fin_vig,
+            CertificadoDetalle.prima_neta,
+            CertificadoDetalle.iva_total,
+            CertificadoDetalle.prima_total,
+        )
+    ).all()
+    certificado_by_id = {row.id: row for row in certificado_rows}
+    existentes = _certificados_existentes(
+        db,
+        emision.id_convenio,
+        [
+            _identificacion(certificados[position])
+            for position in unicos
+            if certificado_ids[position] not in certificado_by_id
+        ],
+    )
+
+    iva_rate = literal(settings.IVA_RATE)
+    cobertura_rows = db.execute(
+        insert(CertificadoCobertura)
+        .from_select(
+            [
+                "certificado_id",
+                "clave_cobertura",
+                "prima_neta",
+                "iva_total",
+                "prima_total",
+            ],
+            select(
+                CertificadoDetalle.id,
+                Cobertura.clave_cobertura,
+                Cobertura.prima,
+                Cobertura.prima * iva_rate,
+                Cobertura.prima + Cobertura.prima * iva_rate,
+            )
+            .join(
+                Cobertura,
+                Cobertura.det_solicitud_id == CertificadoDetalle.det_solicitud_id,
+            )
+            .where(CertificadoDetalle.emision_id == emision_id)
+            .order_by(Cobertura.id),
+        )
+        .returning(
+            CertificadoCobertura.certificado_id,
+            CertificadoCobertura.clave_cobertura,
+            CertificadoCobertura.prima_neta,
+            CertificadoCobertura.iva_total,
+            CertificadoCobertura.prima_total,
+        )
+    ).all()
+
+    _insert_asegurados(db, emision_id, emision_request.aseguradosAdicionales or [])
+    db.commit()
+
+    coberturas: Dict[uuid.UUID, List[CoberturaResponse]] = {}
+    for row in cobertura_rows:
+        coberturas.setdefault(row.certificado_id, []).append(
+            CoberturaResponse.model_construct(
+                claveCobertura=row.clave_cobertura,
+                primaNeta=row.prima_neta,
+                ivaTotal=row.iva_total,
+                primaTotal=row.prima_total,
+            )
+        )
+    certificados_response = []
+    for position, cert in enumerate(certificados):
+        primera = repetidos.get(position, position)
+        row = certificado_by_id.get(certificado_ids[primera])
+        if row is None:
+            # Ya emitido para el convenio: se responde con el certificado
+            # existente, sin volver a copiar la cotización
+            certificados_response.append(
+                _certificado_response(existentes[_identificacion(cert)], False)
+            )
+            continue
+        certificados_response.append(
+            CertificadoResponse.model_construct(
+                identificador=str(row.id),
+                estado="nuevo" if primera == position else "duplicado",
+                primaNeta=row.prima_neta,
+                ivaTotal=row.iva_total,
+                primaTotal=row.prima_total,
+                vigenciaInicial=row.ini_vig.isoformat(),
+                vigenciaFinal=row.fin_vig.isoformat() if row.fin_vig else "",
+                planCertificado=row.plan,
+                paquete=row.paquete,
+                coberturas=coberturas.get(row.id, []),
+            )
+        )
+    nuevos = len(certificado_rows)
+
+    return EmisionResponse(
+        identificador=str(emision_id),
+        mensajeError=None,
+        confirmacionEmitida=None,
+        idConvenio=emision.id_convenio,
+        sucClave=emision.suc_clave,
+        sucNombre=emision.suc_nombre,
+        distribuidorClave=emision.distribuidor_clave,
+        distribuidorNombre=emision.distribuidor_nombre,
+        distribuidorEmail=emision.distribuidor_email,
+        certificadosNuevos=nuevos,
+        certificadosDuplicados=len(certificados) - nuevos,
+        certificados=certificados_response,
+    )
+
+
+def encolar_emision(db: Session, emision_request: EmisionRequest) -> EmisionJobRead:
+    """
+    Guarda la emisión ya validada como trabajo pendiente; la inserta
+    app/emision_worker.py.
+    """
+    job = EmisionJob(
+        payload=emision_request.model_dump(mode="json"),
+        total_certificados=len(emision_request.certificados),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return EmisionJobRead.model_validate(job, from_attributes=True)
+
+
+def get_emision_job(db: Session, job_id: uuid.UUID) -> EmisionJobRead:
+    job = db.get(EmisionJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo de emisión no encontrado")
+    return EmisionJobRead.model_validate(job, from_attributes=True)
+
+
+def reclamar_emision_job(db: Session) -> Optional[EmisionJob]:
+    """
+    Toma el trabajo pendiente más antiguo, o uno en proceso cuyo worker dejó
+    de avanzar hace más de EMISION_JOB_STALE_SECONDS.
+
+    Con FOR UPDATE SKIP LOCKED varios workers reclaman a la vez sin
+    esperarse ni tomar el mismo trabajo. El lock solo dura hasta marcarlo
+    "procesando"; desde ahí cada lote confirma su avance (ver
+    ``_avanzar_job``).
+    """
+    ahora = datetime.now(timezone.utc)
+    abandonado = ahora - timedelta(seconds=settings.EMISION_JOB_STALE_SECONDS)
+    job = db.exec(
+        select(EmisionJob)
+        .where(
+            or_(
+                EmisionJob.estado == "pendiente",
+                and_(
+                    EmisionJob.estado == "procesando",
+                    EmisionJob.actualizado_en < abandonado,
+                ),
+            )
+        )
+        .order_by(EmisionJob.creado_en)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+    if job is None:
+        db.rollback()
+        return None
+    job.estado = "procesando"
+    job.intentos += 1
+    job.actualizado_en = ahora
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _avanzar_job(db: Session, job_id: uuid.UUID, condicion: Any, **values) -> bool:
+    # Actualiza el trabajo solo si sigue como lo dejó este worker. Si otro
+    # lo retomó por abandonado, el UPDATE espera su lock, no encuentra la fila
+    # y este worker descarta su lote en lugar de duplicarlo.
+    result = db.execute(
+        update(EmisionJob)
+        .where(EmisionJob.id == job_id, condicion)
+        .values(actualizado_en=datetime.now(timezone.utc), **values)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        logger.warning("El trabajo de emisión %s lo tomó otro worker", job_id)
+        return False
+    return True
+
+
+def procesar_emision_job(db: Session, job: EmisionJob) -> None:
+    """
+    Inserta la emisión del trabajo en lotes de EMISION_JOB_CHUNK_SIZE
+    certificados, omitiendo los que el convenio ya tiene.
+
+    Cada lote y el avance del trabajo se confirman en la misma transacción,
+    así que un worker que retoma el trabajo sigue desde
+    ``certificados_procesados`` sin repetir ni perder certificados.
+    """
+    job_id = job.id
+    emision_id = job.emision_id
+    inicio = job.certificados_procesados
+    total = job.total_certificados
+    emision_request = EmisionRequest.model_validate(job.payload)
+    try:
+        if emision_id is None:
+            emision_id = _insert_emision_row(db, emision_request)
+            if not _avanzar_job(
+                db, job_id, EmisionJob.emision_id.is_(None), emision_id=emision_id
+            ):
+                return
+            _insert_asegurados(
+                db, emision_id, emision_request.aseguradosAdicionales or []
+            )
+            db.commit()
+
+        while inicio < total:
+            fin = min(inicio + settings.EMISION_JOB_CHUNK_SIZE, total)
+            if not _avanzar_job(
+                db,
+                job_id,
+                EmisionJob.certificados_procesados == inicio,
+                certificados_procesados=fin,
+            ):
+                return
+            certificados = _insert_certificados(
+                db,
+                emision_id,
+                emision_request.idConvenio,
+                emision_request.certificados[inicio:fin],
+            )
+            duplicados = sum(not nuevo for _, nuevo in certificados)
+            if duplicados:
+                db.execute(
+                    update(EmisionJob)
+                    .where(EmisionJob.id == job_id)
+                    .values(
+                        certificados_duplicados=EmisionJob.certificados_duplicados
+                        + duplicados
+                    )
+                )
+            db.commit()
+            inicio = fin
+
+        if _avanzar_job(
+            db, job_id, EmisionJob.estado == "procesando", estado="completada"
+        ):
+            db.commit()
+    except Exception as error:
+        db.rollback()
+        db.execute(
+            update(EmisionJob)
+            .where(EmisionJob.id == job_id)
+            .values(
+                estado="error",
+                error=str(error),
+                actualizado_en=datetime.now(timezone.utc),
+            )
+        )
+        db.commit()
+        raise
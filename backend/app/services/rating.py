@@ -0,0 +1,192 @@
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class Primas(NamedTuple):
+    prima_neta: np.ndarray
+    iva: np.ndarray
+    prima_total: np.ndarray
+
+
+class Rating(NamedTuple):
+    coberturas: Primas
+    det_solicitudes: Primas
+    cotizaciones: Primas
+
+
+def _sum_by(index: np.ndarray, primas: Primas, size: int) -> Primas:
+    return Primas(
+        *(np.bincount(index, weights=values, minlength=size) for values in primas)
+    )
+
+
+def rate(
+    primas: np.ndarray,
+    det_solicitud_index: np.ndarray,
+    cotizacion_index: np.ndarray,
+    cotizacion_count: Optional[int] = None,
+    iva_rate: Optional[float] = None,
+) -> Rating:
+    """
+    Calcula prima neta, IVA y prima total por cobertura, por det_solicitud y
+    por cotización en una sola pasada vectorizada.
+
+    ``det_solicitud_index[i]`` es la posición de la det_solicitud de la
+    cobertura ``i`` y ``cotizacion_index[j]`` la posición de la cotización de
+    la det_solicitud ``j``. ``cotizacion_count`` permite incluir cotizaciones
+    sin det_solicitudes.
+    """
+    if iva_rate is None:
+        iva_rate = settings.IVA_RATE
+    primas = np.asarray(primas, dtype=np.float64)
+    iva = primas * iva_rate
+    coberturas = Primas(primas, iva, primas + iva)
+    det_solicitudes = _sum_by(
+        np.asarray(det_solicitud_index, dtype=np.intp),
+        coberturas,
+        len(cotizacion_index),
+    )
+    cotizaciones = _sum_by(
+        np.asarray(cotizacion_index, dtype=np.intp),
+        det_solicitudes,
+        cotizacion_count or 0,
+    )
+    return Rating(coberturas, det_solicitudes, cotizaciones)
+
+
+def rate_tree(
+    cotizaciones: Sequence[Sequence[Sequence[float]]],
+    iva_rate: Optional[float] = None,
+) -> Rating:
+    """
+    Igual que ``rate`` pero a partir de las primas anidadas por cotización,
+    det_solicitud y cobertura.
+    """
+    det_solicitud_counts = [len(cotizacion) for cotizacion in cotizaciones]
+    cobertura_counts = [
+        len(det_solicitud)
+        for cotizacion in cotizaciones
+        for det_solicitud in cotizacion
+    ]
+    primas = np.fromiter(
+        (
+            prima
+            for cotizacion in cotizaciones
+            for det_solicitud in cotizacion
+            for prima in det_solicitud
+        ),
+        dtype=np.float64,
+        count=sum(cobertura_counts),
+    )
+    return rate(
+        primas,
+        np.repeat(np.arange(len(cobertura_counts)), cobertura_counts),
+        np.repeat(np.arange(len(det_solicitud_counts)), det_solicitud_counts),
+        cotizacion_count=len(cotizaciones),
+        iva_rate=iva_rate,
+    )
+
+
+def simulate(
+    primas: Sequence[float],
+    sum_aseg_base: float,
+    edad_base: int,
+    sumas: Sequence[float],
+    edades: Sequence[int],
+    age_loading: Optional[float] = None,
+    iva_rate: Optional[float] = None,
+) -> Primas:
+    """
+    Primas de una det_solicitud para cada combinación de suma asegurada y
+    edad, como matrices de ``len(sumas) x len(edades)``.
+
+    La prima de cada cobertura escala linealmente con la suma asegurada y se
+    recarga ``age_loading`` (compuesto) por cada año de diferencia con
+    ``edad_base``; por ser lineal, la matriz completa es el producto exterior
+    de ambos factores por la prima base.
+    """
+    if age_loading is None:
+        age_loading = settings.SIMULATION_AGE_LOADING
+    factor_suma = np.asarray(sumas, dtype=np.float64) / sum_aseg_base
+    factor_edad = (1 + age_loading) ** (
+        np.asarray(edades, dtype=np.float64) - edad_base
+    )
+    return with_iva(
+        np.outer(factor_suma, factor_edad * np.sum(primas, dtype=np.float64)),
+        iva_rate,
+    )
+
+
+def with_iva(prima_neta: np.ndarray, iva_rate: Optional[float] = None) -> Primas:
+    """IVA y prima total de un arreglo de primas netas de cualquier forma."""
+    if iva_rate is None:
+        iva_rate = settings.IVA_RATE
+    iva = prima_neta * iva_rate
+    return Primas(prima_neta, iva, prima_neta + iva)
+
+
+def _rate_chunk(
+    items: List[Sequence[Sequence[Sequence[float]]]], iva_rate: float
+) -> List[Primas]:
+    # Todo el bloque se tarifica en una sola llamada vectorizada y luego se
+    # separa por ítem.
+    rating = rate_tree([cotizacion for item in items for cotizacion in item], iva_rate)
+    bounds = np.cumsum([len(item) for item in items])[:-1]
+    return [
+        Primas(*parts)
+        for parts in zip(*(np.split(values, bounds) for values in rating.cotizaciones))
+    ]
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_rating_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Pool de procesos compartido para tarificar lotes, creado al primer uso.
+
+    Con ``RATING_POOL_WORKERS`` <= 1 no se crea pool y se tarifica en el
+    proceso actual.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None and settings.RATING_POOL_WORKERS > 1:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RATING_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _pool
+
+
+def rate_batch(
+    items: Sequence[Sequence[Sequence[Sequence[float]]]],
+    executor: Optional[Executor] = None,
+    iva_rate: Optional[float] = None,
+    chunk_size: int = 256,
+) -> List[Primas]:
+    """
+    Tarifica muchas cotizaciones objeto independientes y devuelve, en el orden
+    de entrada, las primas por cotización de cada una.
+
+    Con ``executor`` los ítems se reparten en bloques de ``chunk_size`` entre
+    sus procesos; sin él se tarifican en el proceso actual.
+    """
+    if iva_rate is None:
+        iva_rate = settings.IVA_RATE
+    items = list(items)
+    if not items:
+        return []
+    if executor is None or len(items) <= chunk_size:
+        return _rate_chunk(items, iva_rate)
+    chunks = [
+        items[start : start + chunk_size] for start in range(0, len(items), chunk_size)
+    ]
+    results = executor.map(_rate_chunk, chunks, [iva_rate] * len(chunks))
+    return [primas for chunk in results for primas in chunk]
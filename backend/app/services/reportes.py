@@ -0,0 +1,81 @@
+from typing import List, Sequence
+
+from sqlalchemy import column, func, table, text
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.schemas import ReportePrimasFilterParams, ReportePrimasRead
+
+# Vista materializada creada en la migración 7f88b34cf050; no es parte de
+# SQLModel.metadata para que create_all y autogenerate no la traten como tabla.
+reporte_primas_mensual = table(
+    "reporte_primas_mensual",
+    column("sucursal_id"),
+    column("suc_clave"),
+    column("suc_nombre"),
+    column("distribuidor_id"),
+    column("distribuidor_clave"),
+    column("distribuidor_nombre"),
+    column("mes"),
+    column("coberturas"),
+    column("prima_neta"),
+)
+
+_GROUP_COLUMNS = {
+    "sucursal": ("sucursal_id", "suc_clave", "suc_nombre"),
+    "distribuidor": ("distribuidor_id", "distribuidor_clave", "distribuidor_nombre"),
+    "mes": ("mes",),
+}
+
+
+def get_reporte_primas(
+    db: Session, agrupar_por: Sequence[str], filters: ReportePrimasFilterParams
+) -> List[ReportePrimasRead]:
+    """
+    Prima escrita agrupada por cualquier combinación de sucursal, distribuidor
+    y mes de inicio de vigencia, leída solo de la vista materializada.
+    """
+    reporte = reporte_primas_mensual.c
+    group_columns = [
+        reporte[name] for group in agrupar_por for name in _GROUP_COLUMNS[group]
+    ]
+    statement = (
+        select(
+            *group_columns,
+            func.sum(reporte.coberturas).label("coberturas"),
+            func.sum(reporte.prima_neta).label("prima_neta"),
+        )
+        .select_from(reporte_primas_mensual)
+        .group_by(*group_columns)
+        .order_by(*group_columns)
+    )
+    if filters.suc_clave is not None:
+        statement = statement.where(reporte.suc_clave == filters.suc_clave)
+    if filters.distribuidor_clave is not None:
+        statement = statement.where(
+            reporte.distribuidor_clave == filters.distribuidor_clave
+        )
+    if filters.desde is not None:
+        statement = statement.where(reporte.mes >= filters.desde.replace(day=1))
+    if filters.hasta is not None:
+        statement = statement.where(reporte.mes <= filters.hasta)
+
+    reportes = []
+    for row in db.execute(statement).mappings():
+        iva_total = float(row["prima_neta"]) * settings.IVA_RATE
+        reportes.append(
+            ReportePrimasRead(
+                **row,
+                iva_total=iva_total,
+                prima_total=float(row["prima_neta"]) + iva_total,
+            )
+        )
+    return reportes
+
+
+def refresh_reportes(db: Session) -> None:
+    """
+    Recalcula las vistas de reportes sin bloquear las lecturas.
+    """
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY reporte_primas_mensual"))
+    db.commit()
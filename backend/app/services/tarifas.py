@@ -0,0 +1,346 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.schemas import TarifasRead, TarifaVersionRead
+
+logger = logging.getLogger(__name__)
+
+_INDEX_FILE = "tarifa.json"
+_PRIMAS_FILE = "tarifa.npy"
+
+Clave = Tuple[str, str, str]
+
+
+class Tarifa:
+    """
+    Prima por (plan, paquete, clave_cobertura) x banda de edad x banda de
+    suma asegurada, vigente de ``vigente_desde`` a ``vigente_hasta``
+    (exclusivo; ``None`` hasta la siguiente versión).
+
+    Las bandas se guardan como límites inferiores ordenados. ``primas`` es un
+    arreglo de ``len(claves) x len(edades) x len(sumas)`` con NaN en las
+    celdas sin tarifa; al cargarla desde disco es un memmap de solo lectura,
+    así que todos los workers que abren el mismo archivo comparten sus
+    páginas en el page cache en lugar de tener una copia cada uno.
+    """
+
+    def __init__(
+        self,
+        primas: np.ndarray,
+        claves: Dict[Clave, int],
+        edades: Sequence[int],
+        sumas: Sequence[float],
+        vigente_desde: date = date.min,
+        vigente_hasta: Optional[date] = None,
+        version: str = "",
+    ):
+        self.primas = primas
+        self.claves = claves
+        self.edades = np.asarray(edades, dtype=np.int64)
+        self.sumas = np.asarray(sumas, dtype=np.float64)
+        self.vigente_desde = vigente_desde
+        self.vigente_hasta = vigente_hasta
+        self.version = version
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Tuple[str, str, str, int, float, float]],
+        vigente_desde: date = date.min,
+        vigente_hasta: Optional[date] = None,
+    ) -> "Tarifa":
+        """
+        Arma la tarifa a partir de filas ``(plan, paquete, clave_cobertura,
+        edad_desde, suma_desde, prima)``.
+        """
+        rows = list(rows)
+        claves = {
+            clave: position
+            for position, clave in enumerate(sorted({tuple(row[:3]) for row in rows}))
+        }
+        edades = sorted({int(row[3]) for row in rows})
+        sumas = sorted({float(row[4]) for row in rows})
+        primas = np.full((len(claves), len(edades), len(sumas)), np.nan)
+        edad_positions = {edad: position for position, edad in enumerate(edades)}
+        suma_positions = {suma: position for position, suma in enumerate(sumas)}
+        for plan, paquete, clave_cobertura, edad, suma, prima in rows:
+            primas[
+                claves[(plan, paquete, clave_cobertura)],
+                edad_positions[int(edad)],
+                suma_positions[float(suma)],
+            ] = prima
+        return cls(primas, claves, edades, sumas, vigente_desde, vigente_hasta)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Tarifa":
+        path = Path(path)
+        index = json.loads((path / _INDEX_FILE).read_text())
+        primas = np.load(path / _PRIMAS_FILE, mmap_mode="r")
+        claves = {
+            tuple(clave): position for position, clave in enumerate(index["claves"])
+        }
+        vigente_hasta = index.get("vigente_hasta")
+        return cls(
+            primas,
+            claves,
+            index["edades"],
+            index["sumas"],
+            date.fromisoformat(index["vigente_desde"]),
+            date.fromisoformat(vigente_hasta) if vigente_hasta else None,
+            version=path.name,
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Escribe la versión en el directorio ``path``, que no debe existir.
+
+        Los archivos se escriben en un directorio temporal junto a ``path`` y
+        se publican con un solo rename, así que la recarga en caliente nunca
+        ve una versión a medio escribir.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        staging.chmod(0o755)
+        np.save(staging / _PRIMAS_FILE, np.ascontiguousarray(self.primas, np.float64))
+        index = {
+            "claves": [
+                list(clave) for clave in sorted(self.claves, key=self.claves.get)
+            ],
+            "edades": self.edades.tolist(),
+            "sumas": self.sumas.tolist(),
+            "vigente_desde": self.vigente_desde.isoformat(),
+            "vigente_hasta": self.vigente_hasta and self.vigente_hasta.isoformat(),
+        }
+        (staging / _INDEX_FILE).write_text(json.dumps(index))
+        os.rename(staging, path)
+
+    def _claves(
+        self, plan: str, paquete: str, claves_cobertura: Sequence[str]
+    ) -> np.ndarray:
+        positions = []
+        for clave_cobertura in claves_cobertura:
+            position = self.claves.get((plan, paquete, clave_cobertura))
+            if position is None:
+                raise HTTPException(
+                    status_code=422,
+                    detail=(
+                        f"Sin tarifa para plan {plan}, paquete {paquete} y "
+                        f"cobertura {clave_cobertura}"
+                    ),
+                )
+            positions.append(position)
+        return np.asarray(positions, dtype=np.intp)
+
+    @staticmethod
+    def _bandas(limites: np.ndarray, valores: Sequence[float], nombre: str):
+        positions = np.searchsorted(limites, valores, side="right") - 1
+        if (positions < 0).any():
+            raise HTTPException(
+                status_code=422, detail=f"{nombre} por debajo de la tarifa"
+            )
+        return positions
+
+    def primas_grid(
+        self,
+        plan: str,
+        paquete: str,
+        claves_cobertura: Sequence[str],
+        edades: Sequence[int],
+        sumas: Sequence[float],
+    ) -> np.ndarray:
+        """
+        Primas por cobertura, edad y suma asegurada
+        (``len(claves_cobertura) x len(edades) x len(sumas)``) con un solo
+        indexado del arreglo.
+        """
+        primas = self.primas[
+            np.ix_(
+                self._claves(plan, paquete, claves_cobertura),
+                self._bandas(self.edades, edades, "Edad"),
+                self._bandas(self.sumas, sumas, "Suma asegurada"),
+            )
+        ]
+        if np.isnan(primas).any():
+            raise HTTPException(
+                status_code=422,
+                detail=f"La tarifa de plan {plan} y paquete {paquete} no cubre "
+                "la edad o suma asegurada solicitada",
+            )
+        return primas
+
+    def lookup(
+        self,
+        plan: str,
+        paquete: str,
+        claves_cobertura: Sequence[str],
+        edad: int,
+        suma: float,
+    ) -> np.ndarray:
+        """Prima de cada cobertura para una edad y suma asegurada."""
+        return self.primas_grid(plan, paquete, claves_cobertura, [edad], [suma])[
+            :, 0, 0
+        ]
+
+
+def _firma(path: Path) -> Tuple[Tuple[str, int], ...]:
+    # Versiones publicadas y la fecha de su índice; los directorios que
+    # empiezan con "." son versiones que todavía se están escribiendo.
+    return tuple(
+        sorted(
+            (entry.name, (entry / _INDEX_FILE).stat().st_mtime_ns)
+            for entry in path.iterdir()
+            if entry.is_dir() and not entry.name.startswith(".")
+        )
+    )
+
+
+class TarifaVersiones:
+    """
+    Versiones de la tarifa indexadas por su intervalo de vigencia.
+
+    Las versiones se ordenan por ``vigente_desde``; ``para(fecha)`` busca la
+    última que empieza antes de ``fecha`` con bisect y verifica su
+    ``vigente_hasta``. La instancia no cambia después de cargarse: una
+    recarga arma otra y la publica reemplazando la referencia.
+    """
+
+    def __init__(self, tarifas: Sequence[Tarifa], firma: Tuple = ()):
+        self.tarifas: List[Tarifa] = sorted(tarifas, key=lambda t: t.vigente_desde)
+        self._desde = [tarifa.vigente_desde for tarifa in self.tarifas]
+        for anterior, siguiente in zip(self.tarifas, self.tarifas[1:]):
+            if anterior.vigente_desde == siguiente.vigente_desde:
+                raise ValueError(
+                    f"Las versiones {anterior.version} y {siguiente.version} "
+                    "empiezan el mismo día"
+                )
+        self.firma = firma
+        self.cargada_en = datetime.now(timezone.utc)
+        self.segundos_carga = 0.0
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TarifaVersiones":
+        started = time.perf_counter()
+        path = Path(path)
+        firma = _firma(path)
+        versiones = cls(
+            [Tarifa.load(path / version) for version, _ in firma], firma=firma
+        )
+        versiones.segundos_carga = time.perf_counter() - started
+        return versiones
+
+    def para(self, fecha: date) -> Tarifa:
+        position = bisect_right(self._desde, fecha) - 1
+        if position >= 0:
+            tarifa = self.tarifas[position]
+            if tarifa.vigente_hasta is None or fecha < tarifa.vigente_hasta:
+                return tarifa
+        raise HTTPException(
+            status_code=422, detail=f"Sin tarifa vigente al {fecha.isoformat()}"
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return sum(tarifa.primas.nbytes for tarifa in self.tarifas)
+
+
+_tarifas: Optional[TarifaVersiones] = None
+_tarifas_lock = threading.Lock()
+_reloader: Optional[threading.Thread] = None
+
+
+def get_tarifas() -> Optional[TarifaVersiones]:
+    """
+    Versiones de la tarifa en ``TARIFF_PATH`` (un subdirectorio por versión),
+    cargadas al primer uso en cada proceso.
+
+    El primer uso también arranca el hilo que las recarga en segundo plano.
+    Sin ``TARIFF_PATH`` devuelve ``None`` y se usan las primas que envía el
+    cliente.
+    """
+    global _tarifas, _reloader
+    tarifas = _tarifas
+    if tarifas is not None or settings.TARIFF_PATH is None:
+        return tarifas
+    with _tarifas_lock:
+        if _tarifas is None:
+            _tarifas = TarifaVersiones.load(settings.TARIFF_PATH)
+        if _reloader is None and settings.TARIFF_RELOAD_INTERVAL_SECONDS > 0:
+            _reloader = threading.Thread(
+                target=_reload_loop, name="tarifas-reload", daemon=True
+            )
+            _reloader.start()
+        return _tarifas
+
+
+def reload_tarifas() -> bool:
+    """
+    Vuelve a cargar las versiones si cambió el contenido de ``TARIFF_PATH``.
+
+    La carga se hace fuera del camino de las peticiones y se publica con una
+    sola asignación: las peticiones en curso terminan con la instancia que
+    ya tenían y las nuevas toman la recién cargada.
+    """
+    global _tarifas
+    if settings.TARIFF_PATH is None:
+        return False
+    actuales = _tarifas
+    if actuales is not None and _firma(Path(settings.TARIFF_PATH)) == actuales.firma:
+        return False
+    nuevas = TarifaVersiones.load(settings.TARIFF_PATH)
+    with _tarifas_lock:
+        _tarifas = nuevas
+    logger.info(
+        "Tarifa recargada: %s",
+        ", ".join(tarifa.version for tarifa in nuevas.tarifas),
+    )
+    return True
+
+
+def get_estado_tarifas() -> TarifasRead:
+    tarifas = get_tarifas()
+    if tarifas is None:
+        raise HTTPException(status_code=404, detail="No hay tarifa configurada")
+    try:
+        version_activa: Optional[str] = tarifas.para(date.today()).version
+    except HTTPException:
+        version_activa = None
+    return TarifasRead(
+        version_activa=version_activa,
+        cargada_en=tarifas.cargada_en,
+        segundos_carga=tarifas.segundos_carga,
+        bytes=tarifas.nbytes,
+        versiones=[
+            TarifaVersionRead(
+                version=tarifa.version,
+                vigente_desde=tarifa.vigente_desde,
+                vigente_hasta=tarifa.vigente_hasta,
+                coberturas=len(tarifa.claves),
+                bandas_edad=len(tarifa.edades),
+                bandas_suma=len(tarifa.sumas),
+                bytes=tarifa.primas.nbytes,
+            )
+            for tarifa in tarifas.tarifas
+        ],
+    )
+
+
+def _reload_loop() -> None:
+    while True:
+        time.sleep(settings.TARIFF_RELOAD_INTERVAL_SECONDS)
+        try:
+            reload_tarifas()
+        except Exception:
+            logger.exception("No se pudo recargar la tarifa")
@@ -0,0 +1,242 @@
+import json
+from datetime import date
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.cotizacion import (
+    create_random_cotizacion_objeto,
+    random_cotizacion_objeto_payload,
+)
+
+
+def test_read_cotizaciones_with_cursor(client: TestClient, db: Session) -> None:
+    for _ in range(3):
+        create_random_cotizacion_objeto(db)
+    response = client.get(f"{settings.API_V1_STR}/cotizaciones/", params={"limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    seen = len(response.json())
+    while next_cursor:
+        response = client.get(
+            f"{settings.API_V1_STR}/cotizaciones/",
+            params={"limit": 2, "cursor": next_cursor},
+        )
+        assert response.status_code == 200
+        seen += len(response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+    assert seen >= 3
+
+
+def test_read_cotizaciones_cursor_matches_page(client: TestClient, db: Session) -> None:
+    for _ in range(4):
+        create_random_cotizacion_objeto(db)
+    first = client.get(f"{settings.API_V1_STR}/cotizaciones/", params={"limit": 2})
+    by_page = client.get(
+        f"{settings.API_V1_STR}/cotizaciones/", params={"limit": 2, "page": 2}
+    )
+    by_cursor = client.get(
+        f"{settings.API_V1_STR}/cotizaciones/",
+        params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+    )
+    assert by_page.status_code == 200
+    assert by_cursor.json() == by_page.json()
+
+
+def test_read_cotizaciones_invalid_cursor(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/cotizaciones/", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor inválido"
+
+
+def test_read_cotizaciones_by_vigencia(client: TestClient, db: Session) -> None:
+    create_random_cotizacion_objeto(db, ini_vig_reportada=date(2031, 3, 10))
+    create_random_cotizacion_objeto(db, ini_vig_reportada=date(2031, 4, 10))
+    response = client.get(
+        f"{settings.API_V1_STR}/cotizaciones/",
+        params={"vigencia_desde": "2031-03-01", "vigencia_hasta": "2031-03-31"},
+    )
+    assert response.status_code == 200
+    [cotizacion] = response.json()
+    det_solicitud = cotizacion["response_body"]["cotizaciones"][0]["det_solicitudes"][0]
+    assert det_solicitud["ini_vig_reportada"] == "2031-03-10"
+
+    response = client.get(
+        f"{settings.API_V1_STR}/cotizaciones/", params={"vigencia_desde": "2032-01-01"}
+    )
+    assert response.status_code == 404
+
+
+def test_read_cotizaciones_total_count(client: TestClient, db: Session) -> None:
+    cotizacion_objeto = create_random_cotizacion_objeto(db)
+    params = {"convenio_id": str(cotizacion_objeto.convenio_id)}
+    response = client.get(f"{settings.API_V1_STR}/cotizaciones/", params=params)
+    assert "X-Total-Count" not in response.headers
+
+    for count_mode in ("exact", "cached"):
+        response = client.get(
+            f"{settings.API_V1_STR}/cotizaciones/",
+            params={**params, "count_mode": count_mode},
+        )
+        assert response.headers["X-Total-Count"] == "1"
+    response = client.get(
+        f"{settings.API_V1_STR}/cotizaciones/",
+        params={**params, "count_mode": "estimated"},
+    )
+    assert int(response.headers["X-Total-Count"]) >= 0
+
+
+def test_read_cotizaciones_filtered(client: TestClient, db: Session) -> None:
+    cotizacion_objeto = create_random_cotizacion_objeto(db)
+    create_random_cotizacion_objeto(db)
+    params = {
+        "convenio_id": str(cotizacion_objeto.convenio_id),
+        "suc_clave": cotizacion_objeto.sucursal.clave,
+        "distribuidor_clave": cotizacion_objeto.distribuidor.clave,
+        "plan_comercial": cotizacion_objeto.cotizaciones[0].plan_comercial,
+        "plan": "2208",
+        "paquete": "1",
+    }
+    response = client.get(f"{settings.API_V1_STR}/cotizaciones/", params=params)
+    assert response.status_code == 200
+    [cotizacion] = response.json()
+    assert cotizacion["response_body"]["suc_clave"] == params["suc_clave"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/cotizaciones/", params={**params, "paquete": "2"}
+    )
+    assert response.status_code == 404
+
+
+def test_create_cotizacion(client: TestClient, db: Session) -> None:
+    data = random_cotizacion_objeto_payload(db, det_solicitudes=3, coberturas=2)
+    response = client.post(f"{settings.API_V1_STR}/cotizaciones/", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["es_dato_valido"] is True
+    body = content["response_body"]
+    assert body["suc_clave"] == data["suc_clave"]
+    assert body["distribuidor_clave"] == data["distribuidor_clave"]
+    det_solicitudes = body["cotizaciones"][0]["det_solicitudes"]
+    assert len(det_solicitudes) == 3
+    assert all(len(det["coberturas"]) == 2 for det in det_solicitudes)
+
+
+def test_create_cotizacion_sucursal_not_found(client: TestClient, db: Session) -> None:
+    data = random_cotizacion_objeto_payload(db)
+    data["suc_clave"] = "no-existe"
+    response = client.post(f"{settings.API_V1_STR}/cotizaciones/", json=data)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Sucursal no encontrada"
+
+
+def test_cotizaciones_async_database(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "ASYNC_DATABASE", True)
+    data = random_cotizacion_objeto_payload(db)
+    response = client.post(f"{settings.API_V1_STR}/cotizaciones/", json=data)
+    assert response.status_code == 200
+    assert response.json()["response_body"]["suc_clave"] == data["suc_clave"]
+
+    cotizacion_objeto = create_random_cotizacion_objeto(db)
+    response = client.get(f"{settings.API_V1_STR}/cotizaciones/{cotizacion_objeto.id}")
+    assert response.status_code == 200
+    assert response.json()["es_dato_valido"] is True
+    response = client.get(f"{settings.API_V1_STR}/cotizaciones/-1")
+    assert response.status_code == 404
+
+
+def test_read_cotizaciones_reports_stored_totals(
+    client: TestClient, db: Session
+) -> None:
+    data = random_cotizacion_objeto_payload(db, det_solicitudes=2, coberturas=3)
+    created = client.post(f"{settings.API_V1_STR}/cotizaciones/", json=data).json()
+    cotizacion_id = created["response_body"]["cotizaciones"][0]["id"]
+
+    listed = []
+    params: dict[str, Any] = {"limit": 100}
+    while True:
+        response = client.get(f"{settings.API_V1_STR}/cotizaciones/", params=params)
+        listed.extend(
+            cotizacion
+            for item in response.json()
+            for cotizacion in item["response_body"]["cotizaciones"]
+        )
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    cotizacion = next(c for c in listed if c["id"] == cotizacion_id)
+    assert cotizacion["prima_neta"] == pytest.approx(6000.0)
+    assert cotizacion["iva_notal"] == pytest.approx(6000.0 * settings.IVA_RATE)
+    assert cotizacion["prima_total"] == pytest.approx(6000.0 * (1 + settings.IVA_RATE))
+
+
+def test_prima_aggregates_follow_coberturas(db: Session) -> None:
+    cotizacion_objeto = create_random_cotizacion_objeto(
+        db, det_solicitudes=2, coberturas=2
+    )
+    [cotizacion] = cotizacion_objeto.cotizaciones
+    assert cotizacion.prima_neta == pytest.approx(4000.0)
+
+    det_solicitud = cotizacion.det_solicitudes[0]
+    det_solicitud.coberturas[0].prima = 500.0
+    db.delete(det_solicitud.coberturas[1])
+    db.commit()
+    db.refresh(det_solicitud)
+    db.refresh(cotizacion)
+    assert det_solicitud.prima_neta == pytest.approx(500.0)
+    assert det_solicitud.iva_total == pytest.approx(500.0 * settings.IVA_RATE)
+    assert cotizacion.prima_neta == pytest.approx(2500.0)
+    assert cotizacion.prima_total == pytest.approx(2500.0 * (1 + settings.IVA_RATE))
+
+
+def test_export_cotizaciones(client: TestClient, db: Session) -> None:
+    create_random_cotizacion_objeto(db, det_solicitudes=2)
+    with client.stream("GET", f"{settings.API_V1_STR}/cotizaciones/export") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    assert lines
+    assert all("cotizaciones" in line for line in lines)
+
+
+def test_simular_cotizacion(client: TestClient, db: Session) -> None:
+    data = random_cotizacion_objeto_payload(db, coberturas=2)
+    det_solicitud = data["cotizaciones"][0]["det_solicitudes"][0]
+    sumas = [150000 + 1500 * i for i in range(100)]
+    edades = list(range(18, 118))
+    response = client.post(
+        f"{settings.API_V1_STR}/cotizaciones/simulacion",
+        json={"det_solicitud": det_solicitud, "sum_aseg_4": sumas, "edades": edades},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content["prima_neta"]) == 100
+    assert all(len(row) == 100 for row in content["prima_neta"])
+    # sum_aseg_4 base (300.000) y edad al inicio de vigencia (23)
+    base = content["prima_neta"][sumas.index(300000)][edades.index(23)]
+    assert base == pytest.approx(2000.0)
+
+
+def test_create_cotizaciones_batch(client: TestClient, db: Session) -> None:
+    valid = random_cotizacion_objeto_payload(db, det_solicitudes=2, coberturas=3)
+    unknown_sucursal = random_cotizacion_objeto_payload(db)
+    unknown_sucursal["suc_clave"] = "no-existe"
+    data = [valid, {"id_convenio": "no-es-uuid"}, unknown_sucursal, valid]
+    response = client.post(f"{settings.API_V1_STR}/cotizaciones/batch", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert [item["index"] for item in content] == [0, 1, 2, 3]
+    assert [item["es_dato_valido"] for item in content] == [True, False, False, True]
+    assert "id_convenio" in content[1]["message_error"]
+    assert content[2]["message_error"] == "Sucursal no encontrada"
+    assert content[0]["cotizaciones"][0]["prima_neta"] == pytest.approx(6000.0)
+    assert content[3] == {**content[0], "index": 3}
@@ -0,0 +1,224 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.emision_worker import process_next
+from app.models import AseguradosAdicionales, CertificadoDetalle
+from app.tests.utils.cotizacion import random_cotizacion_objeto_payload
+from app.tests.utils.emision import random_emision_payload
+
+
+@pytest.mark.parametrize("copy_threshold", [1000, 1], ids=["values", "copy"])
+def test_create_emision(
+    client: TestClient,
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    copy_threshold: int,
+) -> None:
+    monkeypatch.setattr(settings, "EMISION_COPY_THRESHOLD", copy_threshold)
+    data = random_emision_payload(certificados=3, asegurados=2)
+    response = client.post(f"{settings.API_V1_STR}/emision/", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["sucClave"] == data["sucClave"]
+    emision_id = uuid.UUID(content["identificador"])
+
+    certificados = db.exec(
+        select(CertificadoDetalle).where(CertificadoDetalle.emision_id == emision_id)
+    ).all()
+    assert {str(cert.id) for cert in certificados} == {
+        cert["identificador"] for cert in content["certificados"]
+    }
+    assert sorted(cert.data_adicional1 for cert in certificados) == ["0", "1", "2"]
+    assert all(cert.data_adicional2 is None for cert in certificados)
+    asegurados = db.exec(
+        select(AseguradosAdicionales).where(
+            AseguradosAdicionales.emision_id == emision_id
+        )
+    ).all()
+    assert len(asegurados) == 2
+    assert {aseg.edad for aseg in asegurados} == {16}
+
+
+@pytest.mark.parametrize("copy_threshold", [1000, 1], ids=["values", "copy"])
+def test_create_emision_duplicados(
+    client: TestClient,
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+    copy_threshold: int,
+) -> None:
+    monkeypatch.setattr(settings, "EMISION_COPY_THRESHOLD", copy_threshold)
+    data = random_emision_payload(certificados=3)
+    data["certificados"].append({**data["certificados"][0], "dataAdicional1": "3"})
+    response = client.post(f"{settings.API_V1_STR}/emision/", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["certificadosNuevos"] == 3
+    assert content["certificadosDuplicados"] == 1
+    certificados = content["certificados"]
+    assert [cert["estado"] for cert in certificados] == [
+        "nuevo",
+        "nuevo",
+        "nuevo",
+        "duplicado",
+    ]
+    assert certificados[3]["identificador"] == certificados[0]["identificador"]
+
+    # Reenviar el mismo convenio no inserta nada y devuelve los ids existentes
+    response = client.post(f"{settings.API_V1_STR}/emision/", json=data)
+    assert response.status_code == 200
+    reenvio = response.json()
+    assert reenvio["certificadosNuevos"] == 0
+    assert reenvio["certificadosDuplicados"] == 4
+    assert {cert["estado"] for cert in reenvio["certificados"]} == {"duplicado"}
+    assert [cert["identificador"] for cert in reenvio["certificados"]] == [
+        cert["identificador"] for cert in certificados
+    ]
+    assert not db.exec(
+        select(CertificadoDetalle).where(
+            CertificadoDetalle.emision_id == uuid.UUID(reenvio["identificador"])
+        )
+    ).all()
+
+    # La misma identificación en otro convenio es un certificado nuevo
+    data["idConvenio"] = str(uuid.uuid4())
+    response = client.post(f"{settings.API_V1_STR}/emision/", json=data)
+    assert response.json()["certificadosNuevos"] == 3
+
+
+def test_create_emision_asincrona(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "EMISION_JOB_CHUNK_SIZE", 2)
+    data = random_emision_payload(certificados=5, asegurados=1)
+    response = client.post(
+        f"{settings.API_V1_STR}/emision/", params={"asincrona": True}, json=data
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["estado"] == "pendiente"
+    assert job["total_certificados"] == 5
+    job_url = f"{settings.API_V1_STR}/emision/{response.headers['Location']}"
+
+    while process_next():
+        pass
+
+    job = client.get(job_url).json()
+    assert job["estado"] == "completada"
+    assert job["certificados_procesados"] == 5
+    assert job["certificados_duplicados"] == 0
+    certificados = db.exec(
+        select(CertificadoDetalle).where(
+            CertificadoDetalle.emision_id == uuid.UUID(job["emision_id"])
+        )
+    ).all()
+    assert sorted(cert.data_adicional1 for cert in certificados) == [
+        "0",
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
+
+    response = client.get(f"{settings.API_V1_STR}/emision/jobs/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+def test_read_emisiones(client: TestClient) -> None:
+    created = set()
+    for _ in range(3):
+        data = random_emision_payload(certificados=2, asegurados=1)
+        response = client.post(f"{settings.API_V1_STR}/emision/", json=data)
+        created.add(response.json()["identificador"])
+
+    response = client.get(f"{settings.API_V1_STR}/emision/", params={"limit": 2})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert all(
+        emision["certificados"] is None and emision["aseguradosAdicionales"] is None
+        for emision in response.json()
+    )
+
+    expanded = {}
+    params = {"limit": 2, "include": "certificados,asegurados"}
+    while True:
+        response = client.get(f"{settings.API_V1_STR}/emision/", params=params)
+        assert response.status_code == 200
+        expanded.update(
+            (emision["identificador"], emision) for emision in response.json()
+        )
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert list(expanded) == sorted(expanded)
+    for identificador in created:
+        assert len(expanded[identificador]["certificados"]) == 2
+        assert len(expanded[identificador]["aseguradosAdicionales"]) == 1
+
+
+def test_read_emisiones_invalid_params(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/emision/", params={"include": "coberturas"}
+    )
+    assert response.status_code == 422
+    response = client.get(
+        f"{settings.API_V1_STR}/emision/", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+def test_create_emision_from_cotizacion(client: TestClient, db: Session) -> None:
+    data = random_cotizacion_objeto_payload(db, det_solicitudes=2, coberturas=3)
+    created = client.post(f"{settings.API_V1_STR}/cotizaciones/", json=data).json()
+    cotizacion_id = created["response_body"]["cotizaciones"][0]["id"]
+    payload = random_emision_payload(certificados=2, asegurados=1)
+    emision = {
+        "certificados": payload["certificados"],
+        "aseguradosAdicionales": payload["aseguradosAdicionales"],
+    }
+
+    response = client.post(
+        f"{settings.API_V1_STR}/emision/from-cotizacion/{cotizacion_id}", json=emision
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["idConvenio"] == data["id_convenio"]
+    assert content["sucClave"] == data["suc_clave"]
+    assert len(content["certificados"]) == 2
+    for certificado in content["certificados"]:
+        assert certificado["planCertificado"] == "2208"
+        assert certificado["paquete"] == "1"
+        assert certificado["vigenciaInicial"] == "2023-05-15"
+        assert certificado["vigenciaFinal"] == "2024-05-15"
+        assert certificado["primaNeta"] == pytest.approx(3000.0)
+        assert certificado["primaTotal"] == pytest.approx(
+            3000.0 * (1 + settings.IVA_RATE)
+        )
+        assert [c["claveCobertura"] for c in certificado["coberturas"]] == [
+            "BSC.MTE"
+        ] * 3
+        assert certificado["coberturas"][0]["ivaTotal"] == pytest.approx(
+            1000.0 * settings.IVA_RATE
+        )
+
+    certificados = db.exec(
+        select(CertificadoDetalle).where(
+            CertificadoDetalle.emision_id == uuid.UUID(content["identificador"])
+        )
+    ).all()
+    assert sorted(cert.numero_identificacion for cert in certificados) == sorted(
+        cert["numeroIdentificacion"] for cert in emision["certificados"]
+    )
+
+    emision["certificados"].pop()
+    response = client.post(
+        f"{settings.API_V1_STR}/emision/from-cotizacion/{cotizacion_id}", json=emision
+    )
+    assert response.status_code == 422
+    response = client.post(
+        f"{settings.API_V1_STR}/emision/from-cotizacion/-1", json=emision
+    )
+    assert response.status_code == 404
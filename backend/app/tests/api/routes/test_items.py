@@ -77,6 +77,22 @@ def test_read_items(
     assert response.status_code == 200
     content = response.json()
     assert len(content["data"]) >= 2
+    assert content["count"] >= 2
+
+
+def test_read_items_without_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_item(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"count_mode": "none"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["data"]
+    assert content["count"] is None
 
 
 def test_update_item(
@@ -0,0 +1,33 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.services.reportes import refresh_reportes
+from app.tests.utils.cotizacion import create_random_cotizacion_objeto
+
+
+def test_read_primas_mensual(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    cotizacion_objeto = create_random_cotizacion_objeto(
+        db, det_solicitudes=2, coberturas=3
+    )
+    refresh_reportes(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/reportes/primas/mensual",
+        headers=superuser_token_headers,
+        params={"suc_clave": cotizacion_objeto.sucursal.clave},
+    )
+    assert response.status_code == 200
+    [reporte] = response.json()
+    assert reporte["distribuidor_clave"] == cotizacion_objeto.distribuidor.clave
+    assert reporte["mes"] == "2023-05-01"
+    assert reporte["coberturas"] == 6
+    assert reporte["prima_neta"] == pytest.approx(6000.0)
+    assert reporte["prima_total"] == pytest.approx(6000.0 * (1 + settings.IVA_RATE))
+
+
+def test_read_primas_por_sucursal_requires_auth(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/reportes/primas/sucursales")
+    assert response.status_code == 401
@@ -0,0 +1,47 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services import tarifas
+from app.services.tarifas import Tarifa
+
+
+def test_read_tarifas(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    Tarifa.from_rows(
+        [("2208", "1", "BSC.MTE", 18, 0, 700.0)], vigente_desde=date(2020, 1, 1)
+    ).save(tmp_path / "2020")
+    monkeypatch.setattr(settings, "TARIFF_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "TARIFF_RELOAD_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(tarifas, "_tarifas", None)
+
+    response = client.get(
+        f"{settings.API_V1_STR}/tarifas/", headers=normal_user_token_headers
+    )
+    assert response.status_code == 403
+
+    response = client.get(
+        f"{settings.API_V1_STR}/tarifas/", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["version_activa"] == "2020"
+    assert content["bytes"] == 8
+    assert content["versiones"][0]["vigente_desde"] == "2020-01-01"
+
+    Tarifa.from_rows(
+        [("2208", "1", "BSC.MTE", 18, 0, 800.0)], vigente_desde=date(2021, 1, 1)
+    ).save(tmp_path / "2021")
+    response = client.post(
+        f"{settings.API_V1_STR}/tarifas/reload", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["version_activa"] == "2021"
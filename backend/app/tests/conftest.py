@@ -7,7 +7,22 @@ from sqlmodel import Session, delete
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
-from app.models import Item, User
+from app.models import (
+    AseguradosAdicionales,
+    CertificadoCobertura,
+    CertificadoDetalle,
+    Cobertura,
+    Convenio,
+    Cotizacion,
+    CotizacionObjeto,
+    DetSolicitud,
+    Distribuidor,
+    Emision,
+    EmisionJob,
+    Item,
+    Sucursal,
+    User,
+)
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
 
@@ -21,6 +36,21 @@ def db() -> Generator[Session, None, None]:
         session.execute(statement)
         statement = delete(User)
         session.execute(statement)
+        for model in (
+            CertificadoCobertura,
+            AseguradosAdicionales,
+            CertificadoDetalle,
+            EmisionJob,
+            Emision,
+            Cobertura,
+            DetSolicitud,
+            Cotizacion,
+            CotizacionObjeto,
+            Convenio,
+            Sucursal,
+            Distribuidor,
+        ):
+            session.execute(delete(model))
         session.commit()
 
 
@@ -0,0 +1,35 @@
+from sqlmodel import Session, func, select
+
+from app.core.counting import CountMode, count_cache, count_rows
+from app.models import Item
+from app.tests.utils.item import create_random_item
+
+
+def test_count_rows_modes(db: Session) -> None:
+    item = create_random_item(db)
+    statement = select(Item).where(Item.owner_id == item.owner_id)
+    assert count_rows(db, statement, CountMode.exact) == 1
+    assert count_rows(db, statement, CountMode.none) is None
+    estimated = count_rows(db, statement, CountMode.estimated)
+    assert isinstance(estimated, int)
+    assert estimated >= 0
+
+
+def test_count_rows_cached(db: Session) -> None:
+    count_cache.invalidate()
+    item = create_random_item(db)
+    statement = select(Item).where(Item.owner_id == item.owner_id)
+    assert count_rows(db, statement, CountMode.cached) == 1
+
+    create_random_item(db).owner_id = item.owner_id
+    db.commit()
+    assert (
+        db.exec(
+            select(func.count()).select_from(Item).where(Item.owner_id == item.owner_id)
+        ).one()
+        == 2
+    )
+    # The stored count is served until it expires
+    assert count_rows(db, statement, CountMode.cached) == 1
+    assert count_rows(db, statement, CountMode.exact) == 2
+    assert count_cache.stats()["hits"] == 1
@@ -0,0 +1,138 @@
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.sql import Select
+from sqlmodel import Session, select
+
+from app.benchmarks.seed import seed_cotizaciones
+from app.core.db import engine
+from app.models import (
+    AseguradosAdicionales,
+    CertificadoDetalle,
+    Cobertura,
+    Cotizacion,
+    CotizacionObjeto,
+    DetSolicitud,
+    Distribuidor,
+    Item,
+    Sucursal,
+)
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def _plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _used_indexes(statement: Select) -> set[str]:
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        # Con pocas filas el planificador prefiere el seq scan aunque exista el
+        # índice; desactivarlo deja ver si el índice es utilizable.
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        [[explain]] = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).all()
+    return {
+        node["Index Name"]
+        for node in _plan_nodes(explain[0]["Plan"])
+        if node["Node Type"] in INDEX_SCANS
+    }
+
+
+@pytest.fixture(scope="module")
+def seeded(db: Session) -> CotizacionObjeto:
+    [objeto_id] = seed_cotizaciones(db, 1)
+    seed_cotizaciones(db, 500, det_solicitudes=2, coberturas=2)
+    return db.get(CotizacionObjeto, objeto_id)
+
+
+@pytest.mark.parametrize(
+    "build, index",
+    [
+        (
+            lambda objeto: select(Sucursal).where(Sucursal.clave == "25148"),
+            "ix_sucursal_clave",
+        ),
+        (
+            lambda objeto: select(Distribuidor).where(Distribuidor.clave == "124587"),
+            "ix_distribuidor_clave",
+        ),
+        (
+            lambda objeto: select(CotizacionObjeto).where(
+                CotizacionObjeto.convenio_id == objeto.convenio_id,
+                CotizacionObjeto.sucursal_id == objeto.sucursal_id,
+                CotizacionObjeto.distribuidor_id == objeto.distribuidor_id,
+            ),
+            "ix_cotizacionobjeto_convenio_id_sucursal_id_distribuidor_id",
+        ),
+        (
+            lambda objeto: select(Cotizacion).where(
+                Cotizacion.cotizacion_objeto_id == objeto.id
+            ),
+            "ix_cotizacion_cotizacion_objeto_id",
+        ),
+        (
+            lambda objeto: select(DetSolicitud).where(
+                DetSolicitud.cotizacion_id.in_(  # type: ignore[attr-defined]
+                    select(Cotizacion.id).where(
+                        Cotizacion.cotizacion_objeto_id == objeto.id
+                    )
+                )
+            ),
+            "ix_detsolicitud_cotizacion_id",
+        ),
+        (
+            lambda objeto: select(Cotizacion).where(
+                Cotizacion.plan_comercial == "benchmark"
+            ),
+            "ix_cotizacion_plan_comercial_cotizacion_objeto_id",
+        ),
+        (
+            lambda objeto: select(DetSolicitud.cotizacion_id).where(
+                DetSolicitud.plan == "2208", DetSolicitud.paquete == "1"
+            ),
+            "ix_detsolicitud_plan_paquete_ini_vig_reportada",
+        ),
+        (
+            lambda objeto: select(CotizacionObjeto).where(
+                CotizacionObjeto.distribuidor_id == objeto.distribuidor_id
+            ),
+            "ix_cotizacionobjeto_distribuidor_id_sucursal_id",
+        ),
+        (
+            lambda objeto: select(Cobertura).where(Cobertura.det_solicitud_id == 1),
+            "ix_cobertura_det_solicitud_id",
+        ),
+        (
+            lambda objeto: select(CertificadoDetalle).where(
+                CertificadoDetalle.emision_id == uuid.uuid4()
+            ),
+            "ix_certificadodetalle_emision_id",
+        ),
+        (
+            lambda objeto: select(CertificadoDetalle).where(
+                CertificadoDetalle.id_convenio == objeto.convenio_id,
+                CertificadoDetalle.tipo_identificacion == "CC",
+                CertificadoDetalle.numero_identificacion == "1",
+            ),
+            "ix_certificadodetalle_id_convenio_identificacion",
+        ),
+        (
+            lambda objeto: select(AseguradosAdicionales).where(
+                AseguradosAdicionales.emision_id == uuid.uuid4()
+            ),
+            "ix_aseguradosadicionales_emision_id",
+        ),
+        (
+            lambda objeto: select(Item).where(Item.owner_id == uuid.uuid4()),
+            "ix_item_owner_id",
+        ),
+    ],
+)
+def test_lookup_uses_index(seeded: CotizacionObjeto, build: Any, index: str) -> None:
+    assert index in _used_indexes(build(seeded))
@@ -0,0 +1,253 @@
+import json
+import subprocess
+import sys
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.benchmarks.seed import seed_cotizaciones
+from app.core.config import settings
+from app.core.db import engine
+from app.models import Distribuidor, Sucursal
+from app.schemas import CotizacionObjetoCreate
+from app.services import tarifas
+from app.services.cotizaciones import (
+    _COTIZACION_RESPONSES,
+    CotizacionObjetoService,
+    CotizacionService,
+    SucursalService,
+    get_all_cotizaciones,
+    get_all_cotizaciones_json_agg,
+    get_all_cotizaciones_projection,
+    get_cotizacion_json_agg,
+    get_cotizacion_projection,
+    get_cotizacion_snapshot,
+    sucursal_cache,
+)
+from app.tests.utils.cotizacion import (
+    create_random_cotizacion_objeto,
+    create_random_sucursal,
+    random_cotizacion_objeto_payload,
+)
+from app.tests.utils.utils import random_lower_string
+
+
+@contextmanager
+def count_statements() -> Generator[list[str], None, None]:
+    statements: list[str] = []
+
+    def before_cursor_execute(*args: Any) -> None:
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_get_all_cotizaciones_statements_per_page(db: Session) -> None:
+    for _ in range(3):
+        create_random_cotizacion_objeto(db, det_solicitudes=50, coberturas=10)
+    db.expunge_all()
+    with count_statements() as statements:
+        cotizaciones, _ = get_all_cotizaciones(db, page=1, limit=3)
+    assert len(cotizaciones) == 3
+    # cotizaciones objeto + cotizaciones + det_solicitudes
+    assert len(statements) == 3
+
+
+def test_get_all_cotizaciones_projection_matches_orm(db: Session) -> None:
+    for _ in range(3):
+        create_random_cotizacion_objeto(db, det_solicitudes=2, coberturas=2)
+    db.expunge_all()
+    with count_statements() as statements:
+        content, next_cursor = get_all_cotizaciones_projection(db, page=1, limit=2)
+    assert len(statements) == 3
+    db.expunge_all()
+    cotizaciones, orm_cursor = get_all_cotizaciones(db, page=1, limit=2)
+    assert content == _COTIZACION_RESPONSES.dump_json(cotizaciones)
+    assert next_cursor == orm_cursor
+
+
+def test_get_all_cotizaciones_json_agg_matches_projection(db: Session) -> None:
+    cotizacion_objetos = [
+        create_random_cotizacion_objeto(db, det_solicitudes=2, coberturas=2)
+        for _ in range(3)
+    ]
+    with count_statements() as statements:
+        content, next_cursor = get_all_cotizaciones_json_agg(db, page=1, limit=2)
+    assert len(statements) == 1
+    projection, projection_cursor = get_all_cotizaciones_projection(db, page=1, limit=2)
+    assert json.loads(content) == json.loads(projection)
+    assert next_cursor == projection_cursor
+
+    cotizacion_objeto_id = cotizacion_objetos[0].id
+    assert json.loads(get_cotizacion_json_agg(db, cotizacion_objeto_id)) == json.loads(
+        get_cotizacion_projection(db, cotizacion_objeto_id)
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        get_cotizacion_json_agg(db, -1)
+    assert exc_info.value.status_code == 404
+
+
+def test_get_cotizaciones_by_objeto_id_statements(db: Session) -> None:
+    cotizacion_objeto = create_random_cotizacion_objeto(
+        db, det_solicitudes=50, coberturas=10
+    )
+    db.expunge_all()
+    with count_statements() as statements:
+        cotizaciones = CotizacionService.get_cotizaciones_by_objeto_id(
+            db, cotizacion_objeto.id
+        )
+        coberturas = [
+            cobertura
+            for cotizacion in cotizaciones
+            for det_solicitud in cotizacion.det_solicitudes
+            for cobertura in det_solicitud.coberturas
+        ]
+    assert len(coberturas) == 500
+    # cotizaciones + det_solicitudes + coberturas
+    assert len(statements) == 3
+
+
+def test_create_cotizacion_objeto_uses_tariff(
+    db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    tarifas.Tarifa.from_rows(
+        [
+            ("2208", "1", "BSC.MTE", 18, 0, 700.0),
+            ("2208", "1", "BSC.MTE", 18, 250_000, 900.0),
+        ]
+    ).save(tmp_path / "2020-01")
+    monkeypatch.setattr(settings, "TARIFF_PATH", str(tmp_path))
+    monkeypatch.setattr(settings, "TARIFF_RELOAD_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(tarifas, "_tarifas", None)
+
+    payload = random_cotizacion_objeto_payload(db, coberturas=2)
+    cotizacion_objeto = CotizacionObjetoService.create_cotizacion_objeto(
+        db,
+        CotizacionObjetoCreate.model_validate(payload),
+        db.exec(select(Sucursal).where(Sucursal.clave == payload["suc_clave"])).one(),
+        db.exec(
+            select(Distribuidor).where(
+                Distribuidor.clave == payload["distribuidor_clave"]
+            )
+        ).one(),
+    )
+    [cotizacion] = cotizacion_objeto.cotizaciones
+    # sum_aseg_4 = 300.000 cae en la banda de 250.000; el cliente envió 1.000
+    assert cotizacion.prima_neta == pytest.approx(1800.0)
+    assert [
+        cobertura.prima for cobertura in cotizacion.det_solicitudes[0].coberturas
+    ] == [900.0, 900.0]
+
+
+def test_create_cotizacion_objeto_stores_snapshot(db: Session) -> None:
+    payload = random_cotizacion_objeto_payload(db, det_solicitudes=2, coberturas=2)
+    cotizacion_objeto = CotizacionObjetoService.create_cotizacion_objeto(
+        db,
+        CotizacionObjetoCreate.model_validate(payload),
+        db.exec(select(Sucursal).where(Sucursal.clave == payload["suc_clave"])).one(),
+        db.exec(
+            select(Distribuidor).where(
+                Distribuidor.clave == payload["distribuidor_clave"]
+            )
+        ).one(),
+    )
+    assert cotizacion_objeto.snapshot is not None
+    with count_statements() as statements:
+        snapshot = get_cotizacion_snapshot(db, cotizacion_objeto.id)
+    assert len(statements) == 1
+    assert json.loads(snapshot) == json.loads(
+        get_cotizacion_projection(db, cotizacion_objeto.id)
+    )
+
+
+def test_snapshot_invalidated_when_child_changes(db: Session) -> None:
+    cotizacion_objeto = create_random_cotizacion_objeto(db)
+    get_cotizacion_snapshot(db, cotizacion_objeto.id)
+    db.refresh(cotizacion_objeto)
+    assert cotizacion_objeto.snapshot is not None
+
+    det_solicitud = cotizacion_objeto.cotizaciones[0].det_solicitudes[0]
+    det_solicitud.plan = "9999"
+    db.add(det_solicitud)
+    db.commit()
+    db.refresh(cotizacion_objeto)
+    assert cotizacion_objeto.snapshot is None
+
+    response = json.loads(get_cotizacion_snapshot(db, cotizacion_objeto.id))
+    cotizacion = response["response_body"]["cotizaciones"][0]
+    assert cotizacion["det_solicitudes"][0]["plan"] == "9999"
+    db.refresh(cotizacion_objeto)
+    assert cotizacion_objeto.snapshot is not None
+
+
+def test_get_sucursal_by_clave_is_cached(db: Session) -> None:
+    sucursal = create_random_sucursal(db)
+    SucursalService.get_sucursal_by_clave(db, sucursal.clave)
+    with count_statements() as statements:
+        cached = SucursalService.get_sucursal_by_clave(db, sucursal.clave)
+    assert statements == []
+    assert cached.id == sucursal.id
+    assert cached.nombre == sucursal.nombre
+
+
+def test_get_sucursal_by_clave_caches_unknown_claves(db: Session) -> None:
+    clave = random_lower_string()
+    with pytest.raises(HTTPException):
+        SucursalService.get_sucursal_by_clave(db, clave)
+    with count_statements() as statements:
+        with pytest.raises(HTTPException):
+            SucursalService.get_sucursal_by_clave(db, clave)
+    assert statements == []
+
+
+def test_sucursal_cache_invalidated_on_write(db: Session) -> None:
+    clave = random_lower_string()
+    with pytest.raises(HTTPException):
+        SucursalService.get_sucursal_by_clave(db, clave)
+    sucursal = Sucursal(clave=clave, nombre=random_lower_string())
+    db.add(sucursal)
+    db.commit()
+    assert sucursal_cache.stats()["size"] == 0
+    assert SucursalService.get_sucursal_by_clave(db, clave).id == sucursal.id
+
+
+# Se mide en un proceso aparte para que el pico de RSS no dependa de lo que
+# hayan consumido otras pruebas; se compara contra el pico tras las primeras
+# filas para verificar que la memoria no crece con el número de filas.
+MEASURE_EXPORT_RSS = """
+import itertools
+import resource
+
+from app.services.cotizaciones import export_cotizaciones
+
+rows = export_cotizaciones(batch_size=500)
+for _ in itertools.islice(rows, 100):
+    pass
+warm = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+total = 100 + sum(1 for _ in rows)
+print(total, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - warm)
+"""
+EXPORT_RSS_BUDGET_KB = 32 * 1024
+
+
+def test_export_cotizaciones_memory_is_flat(db: Session) -> None:
+    seed_cotizaciones(db, 10_000, det_solicitudes=2)
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_EXPORT_RSS],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total, growth_kb = map(int, result.stdout.split())
+    assert total >= 10_000
+    assert growth_kb < EXPORT_RSS_BUDGET_KB
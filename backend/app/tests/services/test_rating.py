@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from app.services.rating import rate, rate_tree, simulate
+
+
+def test_rate_tree_totals() -> None:
+    rating = rate_tree([[[100.0, 50.0], [10.0]], [[1.0]]], iva_rate=0.16)
+    assert rating.coberturas.iva.tolist() == pytest.approx([16.0, 8.0, 1.6, 0.16])
+    assert rating.det_solicitudes.prima_neta.tolist() == pytest.approx(
+        [150.0, 10.0, 1.0]
+    )
+    assert rating.cotizaciones.prima_neta.tolist() == pytest.approx([160.0, 1.0])
+    assert rating.cotizaciones.prima_total.tolist() == pytest.approx([185.6, 1.16])
+
+
+def test_rate_tree_empty_levels() -> None:
+    rating = rate_tree([[[], [5.0]], []], iva_rate=0.16)
+    assert rating.det_solicitudes.prima_neta.tolist() == pytest.approx([0.0, 5.0])
+    assert rating.cotizaciones.prima_neta.tolist() == pytest.approx([5.0, 0.0])
+
+
+def test_rate_matches_per_object_loop() -> None:
+    rng = np.random.default_rng(0)
+    primas = rng.uniform(100, 5000, size=1000)
+    det_solicitud_index = np.sort(rng.integers(0, 100, size=1000))
+    cotizacion_index = np.arange(100) // 10
+    rating = rate(primas, det_solicitud_index, cotizacion_index, iva_rate=0.16)
+
+    expected = [0.0] * 10
+    for prima, det_solicitud in zip(primas, det_solicitud_index):
+        expected[cotizacion_index[det_solicitud]] += prima * 1.16
+    assert rating.cotizaciones.prima_total.tolist() == pytest.approx(expected)
+
+
+def test_simulate_grid() -> None:
+    primas = simulate(
+        [100.0, 50.0],
+        sum_aseg_base=1000.0,
+        edad_base=30,
+        sumas=[500.0, 1000.0, 2000.0],
+        edades=[29, 30, 31],
+        age_loading=0.1,
+        iva_rate=0.16,
+    )
+    assert primas.prima_neta.shape == (3, 3)
+    assert primas.prima_neta[1, 1] == pytest.approx(150.0)
+    assert primas.prima_neta[0, 0] == pytest.approx(75.0 / 1.1)
+    assert primas.prima_neta[2, 2] == pytest.approx(300.0 * 1.1)
+    assert primas.prima_total.ravel().tolist() == pytest.approx(
+        (primas.prima_neta * 1.16).ravel().tolist()
+    )
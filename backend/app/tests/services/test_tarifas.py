@@ -0,0 +1,101 @@
+import csv
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.compile_tariff import compile_tariff
+from app.core.config import settings
+from app.services import tarifas
+from app.services.tarifas import Tarifa, TarifaVersiones
+
+
+def write_tariff_csv(path: Path, recargo: float = 0) -> Path:
+    source = path / f"tarifa-{recargo}.csv"
+    with open(source, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["plan", "paquete", "clave_cobertura", "edad_desde", "suma_desde", "prima"]
+        )
+        for clave_cobertura in ("BSC.MTE", "ADI.INV"):
+            for edad in (18, 30, 50):
+                for suma in (0, 200_000):
+                    prima = 100 + edad + suma / 1000 + recargo
+                    writer.writerow(["2208", "1", clave_cobertura, edad, suma, prima])
+    return source
+
+
+def test_compile_and_load_tariff(tmp_path: Path) -> None:
+    compile_tariff(
+        str(write_tariff_csv(tmp_path)), str(tmp_path / "v1"), date(2024, 1, 1)
+    )
+    tarifa = Tarifa.load(tmp_path / "v1")
+    assert isinstance(tarifa.primas, np.memmap)
+    assert tarifa.primas.shape == (2, 3, 2)
+    assert tarifa.version == "v1"
+    assert tarifa.vigente_desde == date(2024, 1, 1)
+
+    primas = tarifa.lookup("2208", "1", ["BSC.MTE", "ADI.INV"], edad=35, suma=250_000)
+    assert primas.tolist() == pytest.approx([330.0, 330.0])
+    grid = tarifa.primas_grid("2208", "1", ["BSC.MTE"], [18, 49, 80], [0, 199_999])
+    assert grid[0].tolist() == [[118.0, 118.0], [130.0, 130.0], [150.0, 150.0]]
+
+
+def test_tariff_lookup_errors(tmp_path: Path) -> None:
+    tarifa = compile_tariff(
+        str(write_tariff_csv(tmp_path)), str(tmp_path / "v1"), date(2024, 1, 1)
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        tarifa.lookup("2208", "1", ["NO.EXISTE"], edad=35, suma=0)
+    assert exc_info.value.status_code == 422
+    with pytest.raises(HTTPException):
+        tarifa.lookup("2208", "1", ["BSC.MTE"], edad=17, suma=0)
+
+
+def test_tariff_versions_by_vigencia(tmp_path: Path) -> None:
+    source = str(write_tariff_csv(tmp_path))
+    compile_tariff(source, str(tmp_path / "tarifas" / "2024"), date(2024, 1, 1))
+    compile_tariff(
+        source,
+        str(tmp_path / "tarifas" / "2025"),
+        date(2025, 1, 1),
+        vigente_hasta=date(2025, 7, 1),
+    )
+    versiones = TarifaVersiones.load(tmp_path / "tarifas")
+    assert versiones.para(date(2024, 12, 31)).version == "2024"
+    assert versiones.para(date(2025, 1, 1)).version == "2025"
+    for fecha in (date(2023, 12, 31), date(2025, 7, 1)):
+        with pytest.raises(HTTPException):
+            versiones.para(fecha)
+
+
+def test_reload_tarifas_publishes_new_version(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "TARIFF_PATH", str(tmp_path / "tarifas"))
+    monkeypatch.setattr(settings, "TARIFF_RELOAD_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(tarifas, "_tarifas", None)
+    compile_tariff(
+        str(write_tariff_csv(tmp_path)),
+        str(tmp_path / "tarifas" / "2024"),
+        date(2024, 1, 1),
+    )
+    anteriores = tarifas.get_tarifas()
+    assert anteriores is not None
+    assert tarifas.reload_tarifas() is False
+
+    compile_tariff(
+        str(write_tariff_csv(tmp_path, recargo=10)),
+        str(tmp_path / "tarifas" / "2025"),
+        date(2025, 1, 1),
+    )
+    assert tarifas.reload_tarifas() is True
+    nuevas = tarifas.get_tarifas()
+    assert nuevas is not anteriores
+    tarifa = nuevas.para(date(2025, 3, 1))
+    assert tarifa.lookup("2208", "1", ["BSC.MTE"], 18, 0).tolist() == [128.0]
+    # Quien ya tenía la instancia anterior la sigue usando sin cambios
+    assert [t.version for t in anteriores.tarifas] == ["2024"]
+    assert tarifas.get_estado_tarifas().versiones[-1].version == "2025"
@@ -0,0 +1,125 @@
+from datetime import date
+from typing import Any
+
+from sqlmodel import Session
+
+from app.models import (
+    Cobertura,
+    Convenio,
+    Cotizacion,
+    CotizacionObjeto,
+    DetSolicitud,
+    Distribuidor,
+    Sucursal,
+)
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def create_random_sucursal(db: Session) -> Sucursal:
+    sucursal = Sucursal(clave=random_lower_string(), nombre=random_lower_string())
+    db.add(sucursal)
+    db.commit()
+    db.refresh(sucursal)
+    return sucursal
+
+
+def create_random_distribuidor(db: Session) -> Distribuidor:
+    distribuidor = Distribuidor(
+        clave=random_lower_string(),
+        nombre=random_lower_string(),
+        email=random_email(),
+    )
+    db.add(distribuidor)
+    db.commit()
+    db.refresh(distribuidor)
+    return distribuidor
+
+
+def create_random_convenio(db: Session) -> Convenio:
+    convenio = Convenio(name=random_lower_string())
+    db.add(convenio)
+    db.commit()
+    db.refresh(convenio)
+    return convenio
+
+
+def create_random_cotizacion_objeto(
+    db: Session,
+    det_solicitudes: int = 1,
+    coberturas: int = 1,
+    ini_vig_reportada: date = date(2023, 5, 15),
+) -> CotizacionObjeto:
+    cotizacion_objeto = CotizacionObjeto(
+        convenio=create_random_convenio(db),
+        sucursal=create_random_sucursal(db),
+        distribuidor=create_random_distribuidor(db),
+    )
+    cotizacion = Cotizacion(
+        plan_comercial=random_lower_string(), cotizacion_objeto=cotizacion_objeto
+    )
+    for _ in range(det_solicitudes):
+        det_solicitud = DetSolicitud(
+            plan="2208",
+            renovacion=0,
+            tipo="P",
+            paquete="1",
+            fecha_nacimiento=date(2000, 2, 1),
+            ini_vig_reportada=ini_vig_reportada,
+            fin_vig_reportada=date(2024, 5, 15),
+            plazo_reportado=1,
+            tipo_vig=1,
+            sum_aseg_4=300000.0,
+            cotizacion=cotizacion,
+        )
+        for _ in range(coberturas):
+            db.add(
+                Cobertura(
+                    clave_cobertura="BSC.MTE", prima=1000.0, det_solicitud=det_solicitud
+                )
+            )
+    db.add(cotizacion_objeto)
+    db.commit()
+    db.refresh(cotizacion_objeto)
+    return cotizacion_objeto
+
+
+def random_cotizacion_objeto_payload(
+    db: Session, det_solicitudes: int = 1, coberturas: int = 1
+) -> dict[str, Any]:
+    convenio = create_random_convenio(db)
+    sucursal = create_random_sucursal(db)
+    distribuidor = create_random_distribuidor(db)
+    return {
+        "id_convenio": str(convenio.id),
+        "suc_clave": sucursal.clave,
+        "suc_nombre": sucursal.nombre,
+        "distribuidor_clave": distribuidor.clave,
+        "distribuidor_nombre": distribuidor.nombre,
+        "distribuidor_email": distribuidor.email,
+        "cotizaciones": [
+            {
+                "plan_comercial": random_lower_string(),
+                "det_solicitudes": [
+                    {
+                        "plan": "2208",
+                        "renovacion": 0,
+                        "tipo": "P",
+                        "paquete": "1",
+                        "fecha_nacimiento": "2000-02-01",
+                        "ini_vig_reportada": "2023-05-15",
+                        "fin_vig_reportada": "2024-05-15",
+                        "plazo_reportado": 1,
+                        "tipo_vig": 1,
+                        "sum_aseg_4": 300000,
+                        "sum_aseg_5": 0,
+                        "sum_aseg_6": 0,
+                        "coberturas_prima_neta": [
+                            {"clave_cobertura": "BSC.MTE", "prima": 1000.0}
+                            for _ in range(coberturas)
+                        ],
+                    }
+                    for _ in range(det_solicitudes)
+                ],
+            }
+        ],
+    }
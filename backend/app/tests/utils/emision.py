@@ -0,0 +1,41 @@
+import uuid
+from typing import Any
+
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def random_emision_payload(
+    certificados: int = 1, asegurados: int = 0
+) -> dict[str, Any]:
+    return {
+        "idConvenio": str(uuid.uuid4()),
+        "sucClave": random_lower_string(),
+        "sucNombre": random_lower_string(),
+        "distribuidorClave": random_lower_string(),
+        "distribuidorNombre": random_lower_string(),
+        "distribuidorEmail": random_email(),
+        "certificados": [
+            {
+                "tipo": "titular",
+                "tipoIdentificacion": "CC",
+                "numeroIdentificacion": random_lower_string(),
+                "nombre": random_lower_string(),
+                "sexo": "F",
+                "etiquetaAdicional1": "poliza",
+                "dataAdicional1": str(i),
+            }
+            for i in range(certificados)
+        ],
+        "aseguradosAdicionales": [
+            {
+                "parentesco": "hijo",
+                "tipoIdentificacion": "TI",
+                "numeroIdentificacion": random_lower_string(),
+                "nombre": random_lower_string(),
+                "fechaNacimiento": "2010-05-01",
+                "sexo": "M",
+                "edad": 16,
+            }
+            for _ in range(asegurados)
+        ],
+    }
@@ -7,6 +7,8 @@ export type Body_login_login_access_token = {
   client_secret?: string | null
 }
 
+export type CountMode = "exact" | "cached" | "estimated" | "none"
+
 export type HTTPValidationError = {
   detail?: Array<ValidationError>
 }
@@ -30,7 +32,7 @@ export type ItemUpdate = {
 
 export type ItemsPublic = {
   data: Array<ItemPublic>
-  count: number
+  count: number | null
 }
 
 export type Message = {
@@ -89,7 +91,7 @@ export type UserUpdateMe = {
 
 export type UsersPublic = {
   data: Array<UserPublic>
-  count: number
+  count: number | null
 }
 
 export type ValidationError = {
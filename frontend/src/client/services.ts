@@ -4,6 +4,7 @@ import { request as __request } from "./core/request"
 
 import type {
   Body_login_login_access_token,
+  CountMode,
   ItemCreate,
   ItemPublic,
   ItemUpdate,
@@ -139,6 +140,7 @@ export class LoginService {
 }
 
 export type TDataReadUsers = {
+  countMode?: CountMode
   limit?: number
   skip?: number
 }
@@ -175,13 +177,14 @@ export class UsersService {
   public static readUsers(
     data: TDataReadUsers = {},
   ): CancelablePromise<UsersPublic> {
-    const { limit = 100, skip = 0 } = data
+    const { countMode = "exact", limit = 100, skip = 0 } = data
     return __request(OpenAPI, {
       method: "GET",
       url: "/api/v1/users/",
       query: {
         skip,
         limit,
+        count_mode: countMode,
       },
       errors: {
         422: "Validation Error",
@@ -393,6 +396,7 @@ export class UtilsService {
 }
 
 export type TDataReadItems = {
+  countMode?: CountMode
   limit?: number
   skip?: number
 }
@@ -420,13 +424,14 @@ export class ItemsService {
   public static readItems(
     data: TDataReadItems = {},
   ): CancelablePromise<ItemsPublic> {
-    const { limit = 100, skip = 0 } = data
+    const { countMode = "exact", limit = 100, skip = 0 } = data
     return __request(OpenAPI, {
       method: "GET",
       url: "/api/v1/items/",
       query: {
         skip,
         limit,
+        count_mode: countMode,
       },
       errors: {
         422: "Validation Error",